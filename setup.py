@@ -19,6 +19,9 @@ setup(
     install_requires=[
         'py_utils @ git+https://github.com/Smileyquisourit/py_utils.git@dev'
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     packages=find_packages(),
     entry_points={ 'console_scripts': [
         'txt2latex = txt2latex.scripts.__main__:main',
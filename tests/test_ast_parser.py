@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the ast front-end
+# ---------------------------------------------------------
+# ./tests/test_ast_parser.py
+
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.parsers import AstParser, LogicalParser, LatexParser, ResourceLimits, TooManyNodesError
+from txt2latex.src.parsers import ast_parser
+from txt2latex.src.translator import Translator
+from txt2latex.src.instrumentation import MetricsRegistry, METRICS
+
+class ParseWithAst(unittest.TestCase):
+    """ Test Class for the ast front-end
+
+    This class test that the expressions parsed by the ast module give the
+    LatexExpression of the LogicalParser and the LatexParser, and that the
+    other expressions fall back to them.
+    """
+
+    expressions = [r"a + b*c", r"p^2 - omega_BdG^2 + 2*omega_BdG*p*zeta_BdG",
+                   r"-(p^2 - omega_BdG^2 + 2*omega_BdG*p/zeta_BdG)*(m_alpha + 2/Z_alpha*m_q - 2*Z_alpha*p + m_q*p - p^2)",
+                   r"a + (p^2 + 2*omega*(b - c))*(p^3 - (a*p^2)*(c - d) - a)", r"sqrt(x_1 + y)/2.5 - exp(-t)",
+                   r"((a))*(+b)", "a_1\n  + b_2_3"]
+    fallbacks = [r"a*-b", r"a - -b", r"f(x)", r"a^(2)", r"1e5", r"a**b", r"a + )b(", r"x · y", r"sqrt (x)"]
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.parser = AstParser(self.log)
+
+    def parse(self, expression):
+        return LatexParser(self.log).parse(LogicalParser(self.log).parse(expression))
+
+    def test_equality(self):
+        """ Test that the ast module gives the expression of the parsers """
+
+        for expression in self.expressions:
+            with self.subTest(expression=expression):
+                latex_expr = self.parser.try_parse(expression)
+                self.assertIsNotNone(latex_expr)
+                self.assertEqual(str(latex_expr), str(self.parse(expression)))
+    def test_fallback(self):
+        """ Test that the expressions not translated like Python fall back to the parsers """
+
+        for expression in self.fallbacks:
+            with self.subTest(expression=expression):
+                self.assertIsNone(self.parser.try_parse(expression))
+        self.assertEqual(str(self.parser.parse("f(x)*-b")), str(self.parse("f(x)*-b")))
+    def test_chunks(self):
+        """ Test a sum longer than the chunks of the ast module """
+
+        expression = " + ".join(["(a_1*b^2/(c - d) - sqrt(x_2+y))*p"] * 2000)
+        self.assertGreater(len(ast_parser.AstParser(self.log)._chunks(expression)), 1)
+        self.assertEqual(str(self.parser.try_parse(expression)), str(self.parse(expression)))
+    def test_limits(self):
+        """ Test the limits of the parse """
+
+        parser = AstParser(self.log, limits=ResourceLimits(max_nodes=10))
+        with self.assertRaises(TooManyNodesError):
+            parser.try_parse(" + ".join(["a"] * 20))
+    def test_translator(self):
+        """ Test the ast front-end of the translator, and its metrics """
+
+        metrics = MetricsRegistry()
+        before = METRICS.stats()["caches"]["ast_frontend"]
+        translator = Translator(self.log, metrics=metrics, frontend="ast")
+        for expression in self.expressions + ["a*-b"]:
+            self.assertEqual(translator.translate(expression), Translator(self.log, metrics=None).translate(expression))
+
+        stages = metrics.stats()["stages"]
+        self.assertEqual(stages["ast_parse"]["count"], len(self.expressions) + 1)
+        self.assertEqual(stages["logical_parse"]["count"], 1)
+        caches = METRICS.stats()["caches"]["ast_frontend"]
+        self.assertEqual(caches["hits"] - before["hits"], len(self.expressions))
+        self.assertEqual(caches["misses"] - before["misses"], 1)
+
+        with self.assertRaises(ValueError):
+            Translator(self.log, frontend="ast", normalize=True)
+        with self.assertRaises(ValueError):
+            Translator(self.log, frontend="python")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the incremental parser
+# ---------------------------------------------------------
+# ./tests/test_incremental_parser.py
+
+import random
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.parsers import LogicalParser, IncrementalLogicalParser
+from txt2latex.src.translator import Translator
+
+class ParseIncrementally(unittest.TestCase):
+    """ Test Class for the incremental parser
+
+    This class test that an expression parsed in chunks gives the same
+    logical expression as the one parsed at once.
+    """
+
+    multiple_latex_expression = r"-(p^2 - omega_BdG^2 + 2*omega_BdG*p/sqrt(zeta_BdG))*(m_alpha + 2/Z_alpha*m_q - 2*Z_alpha*p + m_q*p - p^2)"
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+
+    def construct_Chunks(self, generator:random.Random, expr:str) -> list[str]:
+        """ Cut an expression at random positions """
+
+        cuts = sorted(generator.sample(range(1,len(expr)), generator.randint(0,10)))
+        return [expr[start:end] for start, end in zip([0]+cuts, cuts+[len(expr)])]
+
+    def test_chunks(self):
+        """ Test that the chunks give the same logical expression """
+
+        expected = LogicalParser(self.log).parse(self.multiple_latex_expression)
+
+        generator = random.Random(0)
+        for _ in range(50):
+            chunks = self.construct_Chunks(generator, self.multiple_latex_expression)
+            with self.subTest(chunks=chunks):
+                parser = IncrementalLogicalParser(self.log)
+                for chunk in chunks:
+                    parser.feed(chunk)
+                self.assertEqual(parser.close(), expected)
+    def test_functionSplit(self):
+        """ Test a chunk ending in the name of a function """
+
+        parser = IncrementalLogicalParser(self.log)
+        for chunk in ["a*sq", "rt(b", ")", ""]:
+            parser.feed(chunk)
+        logical_expr = parser.close()
+        self.assertEqual(logical_expr.children[0].contents, "a*")
+        self.assertEqual(logical_expr.children[1].get_metadata('function'), "sqrt")
+    def test_errors(self):
+        """ Test the unbalanced parentheses and the use of a closed parser """
+
+        parser = IncrementalLogicalParser(self.log)
+        parser.feed("(a+b")
+        with self.assertRaisesRegex(ValueError, r"'\)' at position 5"):
+            parser.feed("))")
+
+        parser = IncrementalLogicalParser(self.log)
+        parser.feed("a+(b")
+        with self.assertRaisesRegex(ValueError, r"'\(' at position 2 is never closed"):
+            parser.close()
+
+        parser = IncrementalLogicalParser(self.log)
+        parser.feed("a+b")
+        parser.close()
+        with self.assertRaises(RuntimeError):
+            parser.feed("+c")
+        with self.assertRaises(TypeError):
+            IncrementalLogicalParser(self.log).feed(b"a+b")
+    def test_translateChunks(self):
+        """ Test the translation of an expression given in chunks, wrapped on several lines """
+
+        translator = Translator(self.log)
+        chunks = self.construct_Chunks(random.Random(1), self.multiple_latex_expression.replace(" + ", " +\n "))
+        self.assertEqual(translator.translate_chunks(iter(chunks)), translator.translate(self.multiple_latex_expression))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the line breaking renderer
+# ---------------------------------------------------------
+# ./tests/test_line_breaker.py
+
+import os
+import tempfile
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.renderers import LineBreakRenderer
+from txt2latex.src.renderers.line_breaker import ROW_BREAK
+from txt2latex.src.batch import TexDocumentWriter
+
+class BreakLines(unittest.TestCase):
+    """ Test Class for the line breaking renderer
+
+    This class test that the rows of an expression are its rendering, the
+    choice of the break points, and the environments of the rows.
+    """
+
+    expressions = [r"-a + b*(c - d_1 + e^2 - f + g_3 + h - i + j - k + l - m + n_4 - o) - sqrt(x + y + z + w) + p",
+                   " + ".join(["(a_1*b^2/(c - d) - sqrt(x_2+y))*p"] * 20), r"a - b",
+                   r"sin(a + b + c + d + e + f + g + h + i + j + k + l + m + n + o + p + q + r)*2 - 1"]
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.translator = Translator(self.log, metrics=None)
+        self.renderer = LineBreakRenderer(self.log, width=40)
+
+    def test_rows(self):
+        """ Test that the rows are the rendering of the expression """
+
+        for expression in self.expressions:
+            with self.subTest(expression=expression):
+                latex_expr = self.translator.parse(expression)
+                rows = self.renderer.rows(latex_expr)
+                self.assertEqual(" ".join(rows).replace(" ", ""), str(latex_expr).replace(" ", ""))
+                self.assertTrue(all(rows))
+    def test_breakPoints(self):
+        """ Test the top-level break points, the nested ones and the groups """
+
+        rows = self.renderer.rows(self.translator.parse(" + ".join(f"x_{i}*y_{i}" for i in range(40))))
+        self.assertGreater(len(rows), 1)
+        self.assertTrue(all(len(row) <= 40 for row in rows))
+        self.assertTrue(all(row.startswith("+ ") for row in rows[1:]))
+
+        # A top-level term longer than a row is broken in its parentheses:
+        rows = self.renderer.rows(self.translator.parse(self.expressions[0]))
+        self.assertIn("+ h - i + j - k + l - m + n_{4}", rows)
+
+        # The sums of a group or between '\left' and '\right' aren't broken:
+        rows = self.renderer.rows(self.translator.parse(self.expressions[3]))
+        self.assertEqual(rows[1], "- 1")
+        rows = self.renderer.rows(self.translator.parse("sqrt(" + " + ".join(["a"] * 40) + ")"))
+        self.assertEqual(len(rows), 1)
+    def test_render(self):
+        """ Test the rows of the environments, the translator and the document """
+
+        latex_expr = self.translator.parse(self.expressions[1])
+        rows = self.renderer.rows(latex_expr)
+        self.assertEqual(self.renderer.render(latex_expr).split(ROW_BREAK),
+                         ["&" + rows[0]] + ["&\\quad " + row for row in rows[1:]])
+        self.assertEqual(LineBreakRenderer(self.log, 40, "multline").render(latex_expr), ROW_BREAK.join(rows))
+        self.assertEqual(self.renderer.render(self.translator.parse("a - b")), "a - b")
+        translator = Translator(self.log, metrics=None, renderer=LineBreakRenderer(self.log, 40), operators="cdot")
+        self.assertIn("\\cdot", translator.translate(self.expressions[1]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "document.tex")
+            for line_break, environment in [("split", "equation"), ("multline", "equation"), ("split", "align")]:
+                writer = TexDocumentWriter(self.log, environment, workers=1, line_break=line_break, line_width=40)
+                writer.write([("long", self.expressions[1]), ("short", "a - b")], path)
+                with open(path, encoding="utf-8") as file:
+                    document = file.read()
+                with self.subTest(line_break=line_break, environment=environment):
+                    if line_break == "multline":
+                        self.assertIn("\\begin{multline}\\label{eq:long}\n  (a_{1}", document)
+                        self.assertIn("\\begin{equation}\\label{eq:short}\n  a - b\n", document)
+                    else:
+                        self.assertEqual(document.count("\\begin{split}"), 1)
+            with self.assertRaises(ValueError):
+                TexDocumentWriter(self.log, "align", line_break="multline")
+            with self.assertRaises(ValueError):
+                TexDocumentWriter(self.log, line_break="split", templates=True)
+
+if __name__ == "__main__":
+    unittest.main()
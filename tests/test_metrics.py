@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the metrics
+# ---------------------------------------------------------
+# ./tests/test_metrics.py
+
+import os
+import tempfile
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+import txt2latex
+from txt2latex.src.translator import Translator
+from txt2latex.src.renderers import AbbreviationRenderer
+from txt2latex.src.instrumentation import MetricsRegistry, METRICS
+
+class RecordMetrics(unittest.TestCase):
+    """ Test Class for the metrics
+
+    This class test the counters, the latency histograms and the cache
+    ratios recorded by the translators, and their Prometheus dump.
+    """
+
+    expressions = [r"a + b*c", "-(p^2 - omega^2)*(m_alpha + 2/Z_alpha*m_q)", "x · y"]
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.metrics = MetricsRegistry()
+        self.translator = Translator(self.log, metrics=self.metrics)
+
+    def test_counters(self):
+        """ Test the number of expressions, bytes and errors """
+
+        outputs = [self.translator.translate(expression) for expression in self.expressions]
+        with self.assertRaises(ValueError):
+            self.translator.translate("a + )b(")
+
+        stats = self.metrics.stats()
+        self.assertEqual(stats["expressions"], 4)
+        self.assertEqual(stats["bytes_in"], sum(len(expression.encode("utf-8")) for expression in self.expressions) + 7)
+        self.assertEqual(stats["bytes_out"], sum(len(output.encode("utf-8")) for output in outputs))
+        self.assertEqual(stats["errors"], {"UnbalancedParenthesesError": 1})
+    def test_histograms(self):
+        """ Test the latency histogram of each stage """
+
+        for expression in self.expressions:
+            self.translator.translate(expression)
+
+        stages = self.metrics.stats()["stages"]
+        self.assertEqual(set(stages), {"logical_parse", "latex_parse", "render"})
+        for stage in stages.values():
+            self.assertEqual(stage["count"], 3)
+            self.assertEqual(stage["buckets"][-1], (float("inf"), 3))
+            counts = [count for _, count in stage["buckets"]]
+            self.assertEqual(counts, sorted(counts))
+    def test_caches(self):
+        """ Test the hit ratios of the caches and interning tables """
+
+        translator = Translator(self.log, renderer=AbbreviationRenderer(self.log, min_size=3))
+        before = METRICS.stats()["caches"]
+        translator.translate("(a+b)*(a+b) + (a+b)")
+        caches = METRICS.stats()["caches"]
+        self.assertGreater(caches["term_patterns"]["hits"], before["term_patterns"]["hits"])
+        self.assertGreater(caches["abbreviation_interning"]["hits"], 0)
+        self.assertLessEqual(caches["abbreviation_interning"]["ratio"], 1)
+        # 'txt2latex.stats' reads the registry used by default:
+        self.assertEqual(txt2latex.stats()["caches"]["term_patterns"]["misses"], caches["term_patterns"]["misses"])
+    def test_prometheus(self):
+        """ Test the Prometheus dump of the metrics """
+
+        self.translator.translate(self.expressions[0])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.prom")
+            self.metrics.write_prometheus(path)
+            with open(path, encoding="utf-8") as file:
+                lines = file.read().splitlines()
+
+        self.assertIn("# TYPE txt2latex_stage_seconds histogram", lines)
+        self.assertIn("txt2latex_expressions_total 1", lines)
+        self.assertIn('txt2latex_stage_seconds_bucket{stage="render",le="+Inf"} 1', lines)
+        self.assertIn('txt2latex_stage_seconds_count{stage="logical_parse"} 1', lines)
+        self.assertTrue(all(line.startswith("#") or len(line.rsplit(" ", 1)) == 2 for line in lines))
+
+if __name__ == "__main__":
+    unittest.main()
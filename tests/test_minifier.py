@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the minification of the translations
+# ---------------------------------------------------------
+# ./tests/test_minifier.py
+
+import re
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.renderers import minify
+from txt2latex.src.renderers.template_cache import TemplateCache
+
+class MinifyTranslation(unittest.TestCase):
+    """ Test Class for the minification of the translations
+
+    This class test the minified translations, and that they are made of
+    the tokens of the translations (the single token groups being the same
+    as their token for TeX).
+    """
+
+    expressions = [r"-(p^2 - omega_BdG^2 + 2*omega_BdG*p/zeta_BdG)*(m_alpha + 2/Z_alpha*m_q - 2*Z_alpha*p + m_q*p - p^2)",
+                   r"sqrt(x)/2 + exp(t)*abs(y_1)/z + conj(a)*sin(b)*c", r"1/x + a/b", r"x_12^3 - sqrt(2)*a_b_c"]
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+
+    def tokens(self, f_expr:str, groups:bool=False) -> list[str]:
+        tokens = re.findall(r"\\[A-Za-z]+|\\.|\S", f_expr)
+        if groups:
+            tokens = " ".join(tokens)
+            tokens = re.sub(r"\{ (\S+) \}", r"\1", tokens).split()
+        return tokens
+
+    def test_minify(self):
+        """ Test the minified expressions """
+
+        for f_expr, expected in [("p^{2} + x_{1}", "p^2+x_1"), (r"\frac{1}{x} - \frac{a}{b}", r"\frac1x-\frac ab"),
+                                 (r"a \cdot b \cdot 2", r"a\cdot b\cdot2"), (r"\sqrt{x}y + \overline{2}", r"\sqrt xy+\overline2"),
+                                 (r"x_{12}^{a}", r"x_{12}^a"), (r"\sin\left(b\right)c", r"\sin\left(b\right)c"),
+                                 (r"\frac{ab}{c}", r"\frac{ab}{c}")]:
+            with self.subTest(f_expr=f_expr):
+                self.assertEqual(minify(f_expr), expected)
+                self.assertEqual(minify(expected), expected)
+        with self.assertRaises(TypeError):
+            minify(None)
+    def test_translator(self):
+        """ Test that the minified translations have the tokens of the translations """
+
+        for operators in ["default", "cdot", "inline-cdot"]:
+            translator = Translator(self.log, metrics=None, operators=operators)
+            minifier = Translator(self.log, metrics=None, operators=operators, minify=True,
+                                  templates=TemplateCache())
+            for expression in self.expressions * 3:
+                with self.subTest(operators=operators, expression=expression):
+                    f_expr = translator.translate(expression)
+                    minified = minifier.translate(expression)
+                    self.assertLess(len(minified), len(f_expr))
+                    self.assertEqual(self.tokens(minified, groups=True), self.tokens(f_expr, groups=True))
+                    # The only spaces end a control word followed by a letter:
+                    self.assertNotIn(" ", re.sub(r"\\[A-Za-z]+ (?=[A-Za-z])", "", minified))
+
+if __name__ == "__main__":
+    unittest.main()
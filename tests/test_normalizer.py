@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the normalisation of the logical expressions
+# ---------------------------------------------------------
+# ./tests/test_normalizer.py
+
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.baseComponent import treeWalker
+from txt2latex.src.parsers import LogicalParser, LatexParser, LogicalNormalizer
+from txt2latex.src.translator import Translator
+
+class NormalizeExpression(unittest.TestCase):
+    """ Test Class for the normalisation pass
+
+    This class test that the redundant blocks are collapsed, and that
+    the blocks needed by the precedence of the operators are kept.
+    """
+
+    multiple_logical_block = r"a + (p^2 + 2*omega*(b - c))*(p^3 - (a*p^2)*(c - d) - a)"
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.logical_parser = LogicalParser(self.log)
+        self.latex_parser = LatexParser(self.log)
+        self.normalizer = LogicalNormalizer(self.log)
+
+    def translate(self, expr:str, normalize:bool) -> str:
+        logical_expr = self.logical_parser.parse(expr)
+        if normalize:
+            logical_expr = self.normalizer.normalize(logical_expr)
+        return str(self.latex_parser.parse(logical_expr))
+
+    def test_collapse(self):
+        """ Test that the redundant blocks are collapsed """
+
+        expected = {
+            "((a*p^2))": "ap^{2}",
+            "a + (b - c)": "a + b - c",
+            "a - (b*c)": "a - bc",
+            "(a) + (b)": "a + b",
+            "(a/b) - c": r"\frac{a}{b} - c",
+            "-(a)": " - a",
+            "sqrt((a))": r"\sqrt{a}",
+        }
+        for expr, latex in expected.items():
+            with self.subTest(expr=expr):
+                self.assertEqual(self.translate(expr, True), latex)
+    def test_keep(self):
+        """ Test that the blocks needed by the precedence of the operators are kept """
+
+        for expr in ["a - (b - c)", "x/(a*b)", "(a*b)/c", "x*(a + b)", "(-a)*b", "a*(-b)", "2(a)", "(a)(b)",
+                     "(a*b)*c", "(a)*(b)", "(a/b)*c", "2*(3)", "(p*10)*3", "log((p*10) * 3*(a) * b)"]:
+            with self.subTest(expr=expr):
+                self.assertEqual(self.translate(expr, True), self.translate(expr, False))
+
+        # A '*' is rendered as a juxtaposition, the digits stay apart:
+        self.assertEqual(self.translate("2*(3)", True), "2(3)")
+        self.assertEqual(self.translate("(p*10)*3", True), "(p10)3")
+    def test_fewerNodes(self):
+        """ Test that the normalised expression has fewer nodes and is stable """
+
+        logical_expr = self.logical_parser.parse(self.multiple_logical_block)
+        nodes = treeWalker.count_nodes(logical_expr)
+        normalized = self.normalizer.normalize(logical_expr)
+        self.assertLess(treeWalker.count_nodes(normalized), nodes)
+
+        latex = str(self.latex_parser.parse(normalized))
+        self.assertEqual(latex, r"a + (p^{2} + 2omega(b - c))(p^{3} - (ap^{2})(c - d) - a)")
+        self.assertEqual(str(self.latex_parser.parse(self.normalizer.normalize(normalized))), latex)
+    def test_translator(self):
+        """ Test the normalisation stage of the translator """
+
+        translator = Translator(self.log, normalize=True)
+        self.assertEqual(translator.translate("((a*p^2))"), "ap^{2}")
+        self.assertEqual(Translator(self.log).translate("((a*p^2))"), "((ap^{2}))")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the parallel translator
+# ---------------------------------------------------------
+# ./tests/test_parallel_translator.py
+
+import random
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.parallel_translator import ParallelTranslator, _Leaf, _Skeleton, _Split
+from txt2latex.src.parsers import StructuralIndex
+
+class TranslateInParallel(unittest.TestCase):
+    """ Test Class for the parallel translator
+
+    This class test that the translation of an expression split in
+    slices is identical to the serial one.
+    """
+
+    multiple_latex_expression = r"-(p^2 - omega_BdG^2 + 2*omega_BdG*p/zeta_BdG)*(m_alpha + 2/Z_alpha*m_q - 2*Z_alpha*p + m_q*p - p^2)"
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.translator = Translator(self.log)
+
+    def construct_RandomExpression(self, generator:random.Random, size:int, depth:int=0) -> str:
+        """ Construct an expression with the edge cases of the serial parser """
+
+        terms = ["a", "b_1", "x^2", "2.5", " ", "+", "-", "*", "/", " + ", " - ", "()", "(a*)", "abs()"]
+        expression = ""
+        for _ in range(size):
+            if generator.random() < 0.1 and depth < 3:
+                function = generator.choice(["", "sqrt", "f"])
+                expression += f"{function}({self.construct_RandomExpression(generator,generator.randint(0,8),depth+1)})"
+            else:
+                expression += generator.choice(terms)
+        return expression
+
+    def test_plan(self):
+        """ Test the split of an expression at its top-level terms and inside its groups """
+
+        translator = ParallelTranslator(self.log, workers=2, chunk_size=10)
+        plan = translator._plan(self.multiple_latex_expression, StructuralIndex(self.multiple_latex_expression), 10)
+        self.assertIsInstance(plan, _Skeleton)
+        self.assertEqual(plan.text, "-(txlslot0)*(txlslot1)")
+        self.assertTrue(all(isinstance(group, _Split) for group in plan.groups))
+        self.assertEqual([chunk.text for _, chunk in plan.groups[0].chunks],
+                         ["p^2 - omega_BdG^2 ", " 2*omega_BdG*p/zeta_BdG"])
+        self.assertTrue(all(isinstance(chunk, _Leaf) for _, chunk in plan.groups[1].chunks))
+    def test_identicalTranslation(self):
+        """ Test that the parallel translation is identical to the serial one """
+
+        with ParallelTranslator(self.log, workers=2, chunk_size=4) as translator:
+            self.assertEqual(translator.translate(self.multiple_latex_expression),
+                             self.translator.translate(self.multiple_latex_expression))
+
+            generator = random.Random(0)
+            for _ in range(50):
+                expression = self.construct_RandomExpression(generator, generator.randint(1,60))
+                with self.subTest(expression=expression):
+                    self.assertEqual(translator.translate(expression), self.translator.translate(expression))
+
+if __name__ == "__main__":
+    unittest.main()
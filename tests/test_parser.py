@@ -9,8 +9,12 @@ import unittest
 from txt2latex.src.baseComponent.logicalComponent import *
 from txt2latex.src.baseComponent.latexComponent import *
 from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS, _LEVEL0_OPERATORS_DICT, _nullOperator
+from txt2latex.src.baseComponent import checks
 from txt2latex.src.parsers import logical_parser, latex_parser
 
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
 class ParseExpression(unittest.TestCase):
     """ Test Class for the parsing functionality
 
@@ -211,5 +215,166 @@ class ParseExpression(unittest.TestCase):
             latex_parser.parse_logical_expression(self.multiple_logical_block2)
         )
 
+class ParseLogicalElement(unittest.TestCase):
+    """ Test Class for the parsing of a logical element
+
+    This class test the splitting of a logical element in operators
+    and latex elements.
+    """
+
+    def setUp(self):
+        self.parser = latex_parser.LatexParser(ConsoleLogueurFactory(LogLevel(1)))
+
+    def parse(self, contents:str):
+        return self.parser._parse_logical_element(LogicalElement(contents),LatexExpression(LatexDelimitor()),_LEVEL0_OPERATORS)
+
+    def test_numericLiteral(self):
+        """ Test the parsing of the numeric literals """
+
+        expected = LatexExpression(LatexDelimitor())
+        expected.add_children(_nullOperator, LatexElement("2.5"))
+        expected.add_children(_LEVEL0_OPERATORS_DICT["*"], LatexElement("x"))
+        expected.add_children(_LEVEL0_OPERATORS_DICT["-"], LatexElement("3",superScript="2"))
+
+        latex_expr, operator = self.parse("2.5*x - 3^2")
+        self.assertEqual(expected, latex_expr)
+        self.assertIsNone(operator)
+
+        # A decimal with a script:
+        expected = LatexExpression(LatexDelimitor())
+        expected.add_children(_nullOperator, LatexElement("2.5",superScript="2"))
+        latex_expr, operator = self.parse("2.5^2")
+        self.assertEqual(expected, latex_expr)
+        self.assertEqual(str(latex_expr), "2.5^{2}")
+    def test_trailingOperator(self):
+        """ Test that the trailing operator is returned """
+
+        latex_expr, operator = self.parse("a + ")
+        self.assertEqual(len(latex_expr), 1)
+        self.assertIs(operator, _LEVEL0_OPERATORS_DICT["+"])
+
+        latex_expr, operator = self.parse("*")
+        self.assertEqual(len(latex_expr), 0)
+        self.assertIs(operator, _LEVEL0_OPERATORS_DICT["*"])
+    def test_invalidTerm(self):
+        """ Test that a term that can't be parsed raises a RuntimeError """
+
+        with self.assertRaises(RuntimeError):
+            self.parse("a + .b")
+
+class ParseFunctionCall(unittest.TestCase):
+    """ Test Class for the parsing of the function calls
+
+    This class test that the function calls are recognized by the
+    logical parser and translated with their delimitor.
+    """
+
+    function_expression = r"a + sqrt(x)*exp(y) - abs(b - c)"
+
+    def setUp(self):
+        log = ConsoleLogueurFactory(LogLevel(1))
+        self.logical_parser = logical_parser.LogicalParser(log)
+        self.latex_parser = latex_parser.LatexParser(log)
+
+    def test_logicalFunctionCall(self):
+        """ Test that the name of the function is stored in the LogicalBlock """
+
+        logical_expr = self.logical_parser.parse(self.function_expression)
+        self.assertEqual(
+            [str(child) for child in logical_expr.children],
+            ["E'a + '", "Block( E'x' )", "E'*'", "Block( E'y' )", "E' - '", "Block( E'b - c' )"]
+        )
+        self.assertEqual(
+            [child.get_metadata('function') for child in logical_expr.children if isinstance(child,LogicalBlock)],
+            ['sqrt', 'exp', 'abs']
+        )
+    def test_latexFunctionCall(self):
+        """ Test the translation of the function calls """
+
+        latex_expr = self.latex_parser.parse(self.logical_parser.parse(self.function_expression))
+        self.assertEqual(str(latex_expr), r"a + \sqrt{x}e^{y} - \left|b - c\right|")
+    def test_unknownFunction(self):
+        """ Test that an unknown name followed by a parenthesis isn't a function call """
+
+        latex_expr = self.latex_parser.parse(self.logical_parser.parse(r"xsqrt(y) + f(z)*w"))
+        self.assertEqual(str(latex_expr), r"xsqrt(y) + f(z)w")
+
+class ParseSpans(unittest.TestCase):
+    """ Test Class for the spans of the logical elements
+
+    This class test that the logical elements built by the parser
+    reference their position in the parsed expression.
+    """
+
+    def setUp(self):
+        log = ConsoleLogueurFactory(LogLevel(1))
+        self.logical_parser = logical_parser.LogicalParser(log)
+        self.latex_parser = latex_parser.LatexParser(log)
+
+    def test_elementSpans(self):
+        """ Test the spans of the elements of a parsed expression """
+
+        expression = r"a + (b - c)*sqrt(d) - e"
+        logical_expr = self.logical_parser.parse(expression)
+        elements = [logical_expr.children[0], logical_expr.children[1].children[0],
+                    logical_expr.children[2], logical_expr.children[3].children[0], logical_expr.children[4]]
+        self.assertEqual([element.span for element in elements], [(0,4), (5,10), (11,12), (17,18), (19,23)])
+        for element in elements:
+            self.assertEqual(element.contents, expression[slice(*element.span)])
+        self.assertIsNone(LogicalElement("a + b").span)
+    def test_errorPosition(self):
+        """ Test that the error raised for an invalid term gives its position """
+
+        with self.assertRaisesRegex(RuntimeError, "at position 10 of the expression"):
+            self.latex_parser.parse(self.logical_parser.parse(r"a + (b -  [c)"))
+
+class TrustedConstruction(unittest.TestCase):
+    """ Test Class for the trusted constructors of the parsers
+
+    This class test that the trusted constructors build the same components
+    as the validating ones, and that the debug switch turns the validation
+    back on.
+    """
+
+    multiple_logical_block = r"a + (p^2 + 2*omega*(b - c))*sqrt(p^3 - (a*p^2)*(c - d) - a)"
+
+    def setUp(self):
+        log = ConsoleLogueurFactory(LogLevel(1))
+        self.logical_parser = logical_parser.LogicalParser(log)
+        self.latex_parser = latex_parser.LatexParser(log)
+        self.addCleanup(checks.set_debug_checks, checks.ENABLED)
+
+    def test_constructors(self):
+        """ Test the components built by the trusted constructors """
+
+        operator = _LEVEL0_OPERATORS_DICT['+']
+        expected = LatexExpression(LatexDelimitor("(",")"))
+        expected.add_children(_nullOperator, LatexElement("a", "1"))
+        expected.add_children(operator, LatexElement("b", None, "2"))
+        expression = LatexExpression.from_children(LatexDelimitor("(",")"),
+                                                    [(_nullOperator, LatexElement.from_parts("a", "1")),
+                                                     (operator, LatexElement.from_parts("b", None, "2"))])
+        self.assertEqual(expression, expected)
+        self.assertEqual(str(expression), str(expected))
+
+        block = LogicalBlock.from_children([LogicalElement.from_contents("a + b")], function="sqrt")
+        self.assertEqual(block.get_metadata("function"), "sqrt")
+        self.assertEqual(block.children[0], LogicalElement("a + b"))
+    def test_debugChecks(self):
+        """ Test that the debug switch validates the components built by the parsers """
+
+        checks.set_debug_checks(False)
+        expected = str(self.latex_parser.parse(self.logical_parser.parse(self.multiple_logical_block)))
+        LogicalElement.from_contents("a + (b")
+
+        self.assertFalse(checks.set_debug_checks(True))
+        self.assertEqual(str(self.latex_parser.parse(self.logical_parser.parse(self.multiple_logical_block))), expected)
+        with self.assertRaises(ValueError):
+            LogicalElement.from_contents("a + (b")
+        with self.assertRaises(TypeError):
+            LatexExpression.from_children(LatexDelimitor(), [(_nullOperator, "a")])
+        with self.assertRaises(TypeError):
+            self.latex_parser._parse_logical_element("a + b", LatexExpression(LatexDelimitor()), _LEVEL0_OPERATORS)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
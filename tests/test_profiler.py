@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the profiler
+# ---------------------------------------------------------
+# ./tests/test_profiler.py
+
+import json
+import time
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.instrumentation import SamplingProfiler, profile_translations
+
+class ProfileTranslation(unittest.TestCase):
+    """ Test Class for the profiler
+
+    This class test the timing of the stages of the translations, and
+    the export of the sampled call stacks.
+    """
+
+    expressions = [r"a + b*c", r"-(p^2 - omega_BdG^2 + 2*omega_BdG*p/zeta_BdG)*(m_alpha + 2/Z_alpha*m_q)", r"a + [b"]
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.translator = Translator(self.log)
+
+    def test_stageTimings(self):
+        """ Test that each stage of each expression is timed """
+
+        report = profile_translations(self.translator, self.expressions, "cprofile", top=2)
+        self.assertEqual(len(report.records), 3)
+        self.assertEqual(self.translator.observers, [])
+        for record in report.records[:2]:
+            self.assertEqual(set(record), {"index", "size", "logical_parse", "latex_parse", "render", "total"})
+            self.assertGreaterEqual(record["total"], record["latex_parse"])
+        self.assertIn("error", report.records[2])
+
+        report = json.loads(report.to_json())
+        self.assertEqual(list(report["stages"]), ["logical_parse", "latex_parse", "render", "total"])
+        self.assertEqual(len(report["outliers"]), 2)
+    def test_collapsedStacks(self):
+        """ Test the format of the collapsed stacks """
+
+        def busy_loop():
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                pass
+
+        sampler = SamplingProfiler(0.001)
+        sampler.start()
+        busy_loop()
+        sampler.stop()
+
+        lines = sampler.collapsed().splitlines()
+        self.assertTrue(any("busy_loop (" in line.rsplit(" ",1)[0].split(";")[-1] for line in lines))
+        for line in lines:
+            stack, count = line.rsplit(" ",1)
+            self.assertGreater(int(count), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the renderers
+# ---------------------------------------------------------
+# ./tests/test_renderers.py
+
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.baseComponent.latexComponent import *
+from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS_DICT, _nullOperator
+from txt2latex.src.renderers import AbbreviationRenderer
+
+class RenderAbbreviation(unittest.TestCase):
+    """ Test Class for the abbreviation renderer
+
+    This class test that the repeated sub-expressions are detected
+    and rendered only once.
+    """
+
+    def construct_RepeatedExpression(self):
+        """ Construct the latex expression of '(a + b*c)*(a + b*c) - x/(a + b*c)' """
+
+        def factor():
+            component = LatexExpression(LatexDelimitor("(",")"))
+            component.add_children(_nullOperator, LatexElement("a"))
+            component.add_children(_LEVEL0_OPERATORS_DICT["+"], LatexElement("b"))
+            component.add_children(_LEVEL0_OPERATORS_DICT["*"], LatexElement("c"))
+            return component
+
+        self.repeatedExpression = LatexExpression(LatexDelimitor())
+        self.repeatedExpression.add_children(_nullOperator, factor())
+        self.repeatedExpression.add_children(_LEVEL0_OPERATORS_DICT["*"], factor())
+        self.repeatedExpression.add_children(_LEVEL0_OPERATORS_DICT["-"], LatexElement("x"))
+        self.repeatedExpression.add_children(_LEVEL0_OPERATORS_DICT["/"], factor())
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.construct_RepeatedExpression()
+
+    def test_whereStyle(self):
+        """ Test the abbreviation in a 'where' block """
+
+        renderer = AbbreviationRenderer(self.log, "where", min_size=4)
+        self.assertEqual(
+            renderer.render(self.repeatedExpression),
+            "A_{1}A_{1} - \\frac{x}{A_{1}},\n\\quad\\text{where}\\quad A_{1} = a + bc"
+        )
+    def test_newcommandStyle(self):
+        """ Test the abbreviation with newcommands """
+
+        renderer = AbbreviationRenderer(self.log, "newcommand", min_size=4)
+        self.assertEqual(
+            renderer.render(self.repeatedExpression),
+            "\\newcommand{\\txlA}{a + bc}\n{\\txlA}{\\txlA} - \\frac{x}{{\\txlA}}"
+        )
+    def test_minSize(self):
+        """ Test that the sub-expressions smaller than the threshold are kept """
+
+        renderer = AbbreviationRenderer(self.log, "where", min_size=5)
+        self.assertEqual(
+            renderer.render(self.repeatedExpression),
+            str(self.repeatedExpression)
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the resource limits
+# ---------------------------------------------------------
+# ./tests/test_resource_limits.py
+
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.parsers import IncrementalLogicalParser, LogicalParser, ResourceLimits, ResourceLimitError, \
+    InputTooLongError, NestingTooDeepError, TooManyNodesError, OutputTooLargeError, TranslationTimeoutError, \
+    UnbalancedParenthesesError
+from txt2latex.src.parsers.resource_limits import texttt_fallback
+from txt2latex.src.translator import Translator
+
+class LimitResources(unittest.TestCase):
+    """ Test Class for the resource limits
+
+    This class test that each limit stops a translation with its typed
+    error, and the raw-text fallback of the translator.
+    """
+
+    deep_expression = "(" * 3000 + "a" + ")" * 3000
+    long_expression = " + ".join(["a_1*b^2/(c - d)"] * 500)
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+
+    def test_limits(self):
+        """ Test the typed error raised by each limit """
+
+        cases = [(ResourceLimits(max_length=50), self.long_expression, InputTooLongError),
+                 (ResourceLimits(max_depth=100), self.deep_expression, NestingTooDeepError),
+                 (ResourceLimits(max_nodes=1000), self.long_expression, TooManyNodesError),
+                 (ResourceLimits(max_output=100), self.long_expression, OutputTooLargeError),
+                 (ResourceLimits(timeout=1e-9), self.long_expression, TranslationTimeoutError)]
+        for limits, expression, error in cases:
+            with self.subTest(limits=limits):
+                translator = Translator(self.log, limits=limits)
+                with self.assertRaises(error) as context:
+                    translator.translate(expression)
+                self.assertIsInstance(context.exception, ResourceLimitError)
+                self.assertIsInstance(context.exception, RuntimeError)
+                if limits.timeout is None:
+                    self.assertEqual(translator.translate("a+b"), Translator(self.log).translate("a+b"))
+
+        with self.assertRaises(ValueError):
+            ResourceLimits(max_depth=0)
+    def test_recursionLimit(self):
+        """ Test that a nesting deeper than the recursion limit of Python gives a typed error """
+
+        with self.assertRaises(NestingTooDeepError) as context:
+            Translator(self.log).translate(self.deep_expression)
+        self.assertIsNone(context.exception.maximum)
+    def test_fallback(self):
+        """ Test the raw-text fallback of an expression exceeding a limit """
+
+        translator = Translator(self.log, limits=ResourceLimits(max_length=10), fallback=True)
+        self.assertEqual(translator.translate("a_1 +   b^2 % {c}"), r"\texttt{a\_1 + b\textasciicircum{}2 \% \{c\}}")
+        self.assertEqual(translator.translate("a+b"), Translator(self.log).translate("a+b"))
+
+        fallback = texttt_fallback(self.long_expression, 40)
+        self.assertLessEqual(len(fallback), 40)
+        self.assertTrue(fallback.endswith(r"\ldots}"))
+    def test_unbalanced(self):
+        """ Test the error of the unbalanced parentheses """
+
+        with self.assertRaises(UnbalancedParenthesesError) as context:
+            LogicalParser(self.log).parse("a + )b(")
+        self.assertIsInstance(context.exception, ValueError)
+        self.assertEqual(context.exception.position, 4)
+    def test_incremental(self):
+        """ Test the limits of the incremental parser """
+
+        parser = IncrementalLogicalParser(self.log, limits=ResourceLimits(max_depth=3))
+        parser.feed("((a")
+        with self.assertRaises(NestingTooDeepError):
+            parser.feed("+((b")
+
+        parser = IncrementalLogicalParser(self.log, limits=ResourceLimits(max_length=8))
+        parser.feed("a+b+")
+        with self.assertRaises(InputTooLongError):
+            parser.feed("c+d+e")
+
+if __name__ == "__main__":
+    unittest.main()
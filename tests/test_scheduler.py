@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the scheduler of the batches
+# ---------------------------------------------------------
+# ./tests/test_scheduler.py
+
+import unittest
+
+from txt2latex.src.batch.scheduler import estimate_cost, schedule, COST_WEIGHTS
+
+class ScheduleBatch(unittest.TestCase):
+    """ Test Class for the scheduler of the batches
+
+    This class test the measures and the cost estimated for an expression,
+    and the tasks grouping the expressions of a window.
+    """
+
+    def test_estimate(self):
+        """ Test the measures of the expressions """
+
+        for expression, parentheses, depth in [("a + b", 0, 0), ("(a + b)*(c - d)", 2, 1),
+                                               ("sqrt((a + (b))*c)", 3, 3), ("a + )b(", 1, 0)]:
+            with self.subTest(expression=expression):
+                cost = estimate_cost(expression)
+                self.assertEqual((cost.length, cost.parentheses, cost.depth), (len(expression), parentheses, depth))
+        base, per_caracter, per_parenthesis, per_level = COST_WEIGHTS
+        self.assertEqual(estimate_cost("(a)").cost, base + 3*per_caracter + per_parenthesis + per_level)
+        with self.assertRaises(TypeError):
+            estimate_cost(None)
+    def test_schedule(self):
+        """ Test that the expensive expressions are tasks of their own, dispatched first """
+
+        costs = [100.0] * 500 + [1e6] + [100.0] * 500 + [2e5]
+        tasks = schedule(costs, workers=2)
+        self.assertEqual(tasks[0], (1e6, [500]))
+        self.assertEqual(tasks[1], (2e5, [1001]))
+        self.assertEqual([cost for cost, _ in tasks], sorted((cost for cost, _ in tasks), reverse=True))
+        self.assertEqual(sorted(index for _, indexes in tasks for index in indexes), list(range(len(costs))))
+        for cost, indexes in tasks:
+            self.assertEqual(cost, sum(costs[index] for index in indexes))
+            self.assertEqual(indexes, sorted(indexes))
+
+        # The small windows are a single task:
+        self.assertEqual(schedule([100.0] * 10, workers=4), [(1000.0, list(range(10)))])
+        self.assertEqual(schedule([], workers=4), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the serializer
+# ---------------------------------------------------------
+# ./tests/test_serializer.py
+
+import unittest
+
+from txt2latex.src.baseComponent.logicalComponent import *
+from txt2latex.src.baseComponent.latexComponent import *
+from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS_DICT, _nullOperator
+from txt2latex.src.baseComponent import serializer
+
+class SerializeTree(unittest.TestCase):
+    """ Test Class for the binary serialization
+
+    This class test that the trees of logical and latex components
+    are the same after being serialized and deserialized.
+    """
+
+    def construct_LogicalTree(self):
+        """ Construct the logical tree of 'a + (b - c)*(d)' """
+
+        block_01 = LogicalBlock(); block_01.add_children(LogicalElement(r"b - c"))
+        block_02 = LogicalBlock(); block_02.add_children(LogicalElement(r"d"))
+
+        self.logicalRoot = LogicalBlock(name='root')
+        self.logicalRoot.add_children(LogicalElement(r"a + "))
+        self.logicalRoot.add_children(block_01)
+        self.logicalRoot.add_children(LogicalElement(r"*"))
+        self.logicalRoot.add_children(block_02)
+    def construct_LatexTree(self):
+        """ Construct the latex tree of '-(p^2 - omega_BdG^2)*m_alpha' """
+
+        component_0a = LatexExpression(LatexDelimitor("(",")"))
+        component_0a.add_children(_nullOperator, LatexElement("p",superScript="2"))
+        component_0a.add_children(_LEVEL0_OPERATORS_DICT["-"], LatexElement("omega","BdG","2"))
+
+        self.latexRoot = LatexExpression(LatexDelimitor())
+        self.latexRoot.add_children(_LEVEL0_OPERATORS_DICT["-"],component_0a)
+        self.latexRoot.add_children(_LEVEL0_OPERATORS_DICT["*"],LatexElement("m","alpha"))
+
+    def setUp(self):
+        self.construct_LogicalTree()
+        self.construct_LatexTree()
+
+    def test_logicalRoundTrip(self):
+        """ Test that a logical tree is unchanged by a round trip """
+
+        loaded = serializer.loads(serializer.dumps(self.logicalRoot))
+        self.assertEqual(self.logicalRoot, loaded)
+        self.assertEqual(loaded._metadata, {'name':'root'})
+    def test_latexRoundTrip(self):
+        """ Test that a latex tree is unchanged by a round trip """
+
+        loaded = serializer.loads(serializer.dumps(self.latexRoot))
+        self.assertEqual(self.latexRoot, loaded)
+        self.assertEqual(str(self.latexRoot), str(loaded))
+
+        # The operators must be the ones loaded in memory:
+        self.assertIs(loaded.children[0][0], _LEVEL0_OPERATORS_DICT["-"])
+        self.assertIs(loaded.children[0][1].children[0][0], _nullOperator)
+    def test_deepTree(self):
+        """ Test that a tree deeper than the recursion limit can be serialized """
+
+        root = LogicalBlock(name='root')
+        block = root
+        for _ in range(10000):
+            child = LogicalBlock()
+            block.add_children(child)
+            block = child
+        block.add_children(LogicalElement("a"))
+
+        loaded = serializer.loads(serializer.dumps(root))
+        depth = 0
+        while isinstance(loaded,LogicalBlock):
+            loaded = loaded.children[0]
+            depth += 1
+        self.assertEqual(depth, 10001)
+        self.assertEqual(loaded, LogicalElement("a"))
+    def test_invalidData(self):
+        """ Test that an invalid payload is rejected """
+
+        data = serializer.dumps(self.latexRoot)
+        with self.assertRaises(ValueError):
+            serializer.loads(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            serializer.loads(data[:-1])
+        with self.assertRaises(TypeError):
+            serializer.loads("not bytes")
+
+if __name__ == "__main__":
+    unittest.main()
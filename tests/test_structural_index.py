@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the structural index
+# ---------------------------------------------------------
+# ./tests/test_structural_index.py
+
+import random
+import unittest
+
+from txt2latex.src.parsers import structural_index
+from txt2latex.src.parsers.structural_index import StructuralIndex
+
+class IndexStructure(unittest.TestCase):
+    """ Test Class for the structural index
+
+    This class test the location of the parentheses and of the top
+    level operators, with the pure-Python and the vectorised pre-pass.
+    """
+
+    expression = r"-(p^2 - 2*(a + b))*c + sqrt(x) - y"
+
+    def backends(self):
+        backends = [False]
+        if structural_index.np is not None:
+            backends.append(True)
+        return backends
+
+    def test_structure(self):
+        """ Test the index of an expression """
+
+        for use_numpy in self.backends():
+            with self.subTest(use_numpy=use_numpy):
+                index = StructuralIndex(self.expression, use_numpy=use_numpy)
+                self.assertEqual(index.parentheses, [1, 10, 16, 17, 27, 29])
+                self.assertEqual(index.matching(1), 17)
+                self.assertEqual(index.matching(16), 10)
+                self.assertEqual(index.top_level_operators, [0, 21, 31])
+                self.assertEqual(index.top_level_groups(), [(1, 17), (27, 29)])
+                self.assertEqual(index.max_depth, 2)
+    def test_unbalanced(self):
+        """ Test that the unbalanced parentheses are located """
+
+        for use_numpy in self.backends():
+            with self.subTest(use_numpy=use_numpy):
+                with self.assertRaisesRegex(ValueError, r"'\)' at position 5"):
+                    StructuralIndex("(a+b))+(c", use_numpy=use_numpy)
+                with self.assertRaisesRegex(ValueError, r"'\(' at position 2 is never closed"):
+                    StructuralIndex("a+((b)+(c)", use_numpy=use_numpy)
+    @unittest.skipIf(structural_index.np is None, "NumPy isn't installed")
+    def test_backendsAgree(self):
+        """ Test that both pre-pass give the same index """
+
+        generator = random.Random(0)
+        for _ in range(50):
+            expression, depth = "", 0
+            for _ in range(200):
+                char = generator.choice("ab+-*(()é")
+                if char == ')' and depth == 0:
+                    char = 'a'
+                depth += (char == '(') - (char == ')')
+                expression += char
+            expression += ')'*depth
+
+            python_index = StructuralIndex(expression, use_numpy=False)
+            numpy_index = StructuralIndex(expression, use_numpy=True)
+            self.assertEqual(python_index.parentheses, numpy_index.parentheses)
+            self.assertEqual(python_index.pairs, numpy_index.pairs)
+            self.assertEqual(python_index.top_level_operators, numpy_index.top_level_operators)
+            self.assertEqual(python_index.max_depth, numpy_index.max_depth)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the template cache
+# ---------------------------------------------------------
+# ./tests/test_template_cache.py
+
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.renderers import AbbreviationRenderer, TemplateCache
+from txt2latex.src.renderers.template_cache import Template
+from txt2latex.src.instrumentation import MetricsRegistry, METRICS
+
+class RenderTemplates(unittest.TestCase):
+    """ Test Class for the template cache
+
+    This class test that the expressions rendered with the plan of their
+    shape are the translations of the parsers, and the shapes that can't
+    be cached.
+    """
+
+    shape = "K_{c}*(s + z_{c})/(s^2 + 2*zeta_{c}*omega_{c}*s + omega_{c}^2) - sqrt(x_{c})*1.5"
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.translator = Translator(self.log, metrics=None)
+
+    def test_translate(self):
+        """ Test the translations of the expressions of a shape """
+
+        metrics = MetricsRegistry()
+        cache = TemplateCache()
+        translator = Translator(self.log, metrics=metrics, templates=cache)
+        before = METRICS.stats()["caches"]["render_templates"]
+        for channel in ["1", "2", "BdG", "3_a", "4"]:
+            expression = self.shape.replace("{c}", channel)
+            with self.subTest(expression=expression):
+                self.assertEqual(translator.translate(expression), self.translator.translate(expression))
+        self.assertEqual(len(cache), 1)
+
+        # The plan is compiled at the second expression, and used for the next ones:
+        caches = METRICS.stats()["caches"]["render_templates"]
+        self.assertEqual(caches["hits"] - before["hits"], 3)
+        self.assertEqual(metrics.stats()["stages"]["template"]["count"], 5)
+        self.assertEqual(metrics.stats()["stages"]["logical_parse"]["count"], 2)
+    def test_shapes(self):
+        """ Test the expressions which have the same shape, or not """
+
+        cache = TemplateCache()
+        self.assertIsNone(cache.lookup("a + sqrt(b)"))
+        self.assertIsInstance(cache.lookup("c + sqrt(d_1)"), Template)
+        self.assertIsNone(cache.lookup("c + f(d_1)"))
+        self.assertIsNone(cache.lookup("c + (d_1)"))
+        self.assertIsNone(cache.lookup("c  + sqrt(d_1)"))
+    def test_uncacheable(self):
+        """ Test the shapes whose terms aren't rendered one by one, and the invalid terms """
+
+        translator = Translator(self.log, metrics=None, templates=TemplateCache())
+        for expressions in [["a b + c", "d e + f", "g h + i"], ["a.b + c", "d.e + f", "g.h + i"],
+                            ["a + b", "c + d", "_e + f"]]:
+            for expression in expressions:
+                with self.subTest(expression=expression):
+                    try:
+                        expected = self.translator.translate(expression)
+                    except RuntimeError:
+                        with self.assertRaises(RuntimeError):
+                            translator.translate(expression)
+                        continue
+                    self.assertEqual(translator.translate(expression), expected)
+        self.assertEqual(len(translator.templates), 1)
+    def test_operators(self):
+        """ Test the plans compiled with an operator set, and the options of the translator """
+
+        translator = Translator(self.log, metrics=None, operators="inline-cdot", templates=TemplateCache())
+        for channel in ["1", "2", "3"]:
+            expression = self.shape.replace("{c}", channel)
+            self.assertEqual(translator.translate(expression),
+                             Translator(self.log, metrics=None, operators="inline-cdot").translate(expression))
+
+        with self.assertRaises(ValueError):
+            Translator(self.log, renderer=AbbreviationRenderer(self.log), templates=TemplateCache())
+        with self.assertRaises(ValueError):
+            TemplateCache(0)
+
+if __name__ == "__main__":
+    unittest.main()
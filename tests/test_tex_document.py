@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the LaTeX document writer
+# ---------------------------------------------------------
+# ./tests/test_tex_document.py
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.batch import TexDocumentWriter, BatchJournal, read_batch, read_batch_offsets
+from txt2latex.src.batch import tex_document
+from txt2latex.src.translator import Translator
+
+class WriteTexDocument(unittest.TestCase):
+    """ Test Class for the LaTeX document writer
+
+    This class test the reading of a batch of expressions, and the
+    document written from it, serially and in parallel.
+    """
+
+    batch = "energy\tp^2/(2*m) + V\n\ninvalid\ta + )b(\np^2 - omega^2\nx#1\tsqrt(a)*b\n"
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.batch_path = os.path.join(self.directory.name, "batch.txt")
+        with open(self.batch_path, "w", encoding="utf-8") as file:
+            file.write(self.batch)
+
+    def write(self, **options) -> str:
+        path = os.path.join(self.directory.name, "document.tex")
+        writer = TexDocumentWriter(self.log, **options)
+        self.assertEqual(writer.write(read_batch(self.batch_path), path), 3)
+        self.assertEqual(writer.failed, 1)
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+
+    def test_readBatch(self):
+        """ Test the ids and the expressions of a batch """
+
+        self.assertEqual(list(read_batch(self.batch_path)),
+                         [("energy", "p^2/(2*m) + V"), ("invalid", "a + )b("), (None, "p^2 - omega^2"), ("x#1", "sqrt(a)*b")])
+    def test_equation(self):
+        """ Test a document of 'equation' environments """
+
+        translate = Translator(self.log).translate
+        document = self.write(workers=1)
+        self.assertTrue(document.startswith("\\documentclass{article}\n\\usepackage{amsmath}\n\\begin{document}\n"))
+        self.assertTrue(document.endswith("\\end{document}\n"))
+        self.assertIn("\\begin{equation}\\label{eq:energy}\n  " + translate("p^2/(2*m) + V") + "\n\\end{equation}\n", document)
+        self.assertIn("\\begin{equation}\n  " + translate("p^2 - omega^2").strip() + "\n\\end{equation}\n", document)
+        self.assertIn("\\label{eq:x-1}", document)
+        self.assertIn("% Impossible to translate the expression 'invalid'", document)
+    def test_align(self):
+        """ Test a document with a single 'align' environment """
+
+        document = self.write(workers=1, environment="align")
+        body = document.split("\\begin{align}\n")[1].split("\\end{align}")[0]
+        rows = [line for line in body.splitlines() if not line.startswith("%")]
+        self.assertEqual(rows, ["  &\\frac{p^{2}}{(2m)} + V \\label{eq:energy}", "\\\\",
+                                "  &p^{2} - omega^{2} \\\\", "  &\\sqrt{a}b \\label{eq:x-1}"])
+    def test_parallel(self):
+        """ Test that the parallel generation keeps the order of the batch """
+
+        with open(self.batch_path, "w", encoding="utf-8") as file:
+            file.write("".join(f"{i}\t{'+'.join(['a', 'b_1', 'x^2'][:i % 3 + 1])}/(c - {i})\n" for i in range(300)))
+
+        documents = list()
+        for workers in (1, 2):
+            path = os.path.join(self.directory.name, f"document{workers}.tex")
+            TexDocumentWriter(self.log, workers=workers).write(read_batch(self.batch_path), path)
+            with open(path, encoding="utf-8") as file:
+                documents.append(file.read())
+        self.assertEqual(documents[0], documents[1])
+        self.assertLess(documents[0].index("eq:9}"), documents[0].index("eq:299}"))
+    def test_costReport(self):
+        """ Test that the parallel generation of huge and small expressions keeps the order, and the cost report """
+
+        huge = " + ".join(["(a_1*b^2/(c - d) - sqrt(x_2+y))*p"] * 300)
+        with open(self.batch_path, "w", encoding="utf-8") as file:
+            file.write("".join(f"{i}\t{huge if i % 50 == 7 else f'a_{i}/(c - {i})'}\n" for i in range(200)))
+
+        documents = list()
+        for workers in (1, 2):
+            path = os.path.join(self.directory.name, f"document{workers}.tex")
+            report = os.path.join(self.directory.name, f"costs{workers}.tsv")
+            TexDocumentWriter(self.log, workers=workers, cost_report=report).write(read_batch(self.batch_path), path)
+            with open(path, encoding="utf-8") as file:
+                documents.append(file.read())
+            with open(report, encoding="utf-8") as file:
+                lines = file.read().splitlines()
+            self.assertEqual(len(lines), 201)
+            self.assertEqual(lines[0].split("\t"), ["index", "id", "length", "parentheses", "depth", "estimated (s)", "actual (s)"])
+            self.assertEqual(lines[8].split("\t")[:4], ["7", "7", str(len(huge)), "900"])
+        self.assertEqual(documents[0], documents[1])
+        with self.assertRaises(TypeError):
+            TexDocumentWriter(self.log, cost_report=1)
+    def test_resume(self):
+        """ Test that a document resumed from its journal is the document written at once """
+
+        with open(self.batch_path, "w", encoding="utf-8") as file:
+            file.write("".join(f"{i}\t{'a + )b(' if i % 13 == 5 else f'x_{i}^2/(c - {i})'}\n\n" for i in range(300)))
+        self.assertEqual([equation[:2] for equation in read_batch_offsets(self.batch_path)], list(read_batch(self.batch_path)))
+        offset = list(read_batch_offsets(self.batch_path))[9][2]
+        self.assertEqual(next(read_batch_offsets(self.batch_path, offset))[0], "10")
+
+        def interrupted(equations, count):
+            for index, equation in enumerate(equations):
+                if index == count:
+                    raise KeyboardInterrupt
+                yield equation
+
+        for environment in ("equation", "align"):
+            with self.subTest(environment=environment), mock.patch.object(tex_document, "CHECKPOINT_SIZE", 64):
+                reference = os.path.join(self.directory.name, "reference.tex")
+                TexDocumentWriter(self.log, environment, workers=1).write(read_batch(self.batch_path), reference)
+                path = os.path.join(self.directory.name, f"{environment}.tex")
+                journal = BatchJournal.of_document(path)
+                with self.assertRaises(KeyboardInterrupt):
+                    TexDocumentWriter(self.log, environment, workers=1).write(
+                        interrupted(read_batch_offsets(self.batch_path), 150), path, journal=journal)
+
+                # The end of the document and a line of the journal are cut by the crash:
+                with open(path, "a", encoding="utf-8") as file:
+                    file.write("\\begin{equ")
+                with open(journal.path, "a", encoding="utf-8") as file:
+                    file.write("4096\t12")
+                checkpoint = journal.last()
+                self.assertEqual((checkpoint.records, checkpoint.identifier, checkpoint.complete), (128, "127", False))
+
+                writer = TexDocumentWriter(self.log, environment, workers=1)
+                writer.write(read_batch_offsets(self.batch_path, checkpoint.input_offset), path,
+                             journal=journal, checkpoint=checkpoint)
+                self.assertEqual((writer.written, writer.failed), (277, 23))
+                with open(reference, encoding="utf-8") as file, open(path, encoding="utf-8") as resumed:
+                    self.assertEqual(resumed.read(), file.read())
+                self.assertTrue(journal.last().complete)
+                self.assertEqual(writer.write([], path, journal=journal, checkpoint=journal.last()), 277)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the use of the parsers from several threads
+# ---------------------------------------------------------
+# ./tests/test_thread_safety.py
+
+import random
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.parsers import LockedLog
+from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS, _LEVEL0_OPERATORS_DICT, getFunctions
+
+class TranslateConcurrently(unittest.TestCase):
+    """ Test Class for the thread safety of the parsers
+
+    This class test that a single translator gives the same results
+    when its translations run concurrently from a pool of threads.
+    """
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+
+    def construct_Expressions(self, count:int) -> list[str]:
+        """ Construct expressions of various sizes and nesting depths """
+
+        generator = random.Random(0)
+        terms = ["a", "b_1", "x^2", "2.5", "omega_BdG", "p^2"]
+        operators = [" + ", " - ", "*", "/"]
+
+        def expression(depth:int) -> str:
+            parts = []
+            for i in range(generator.randint(1,6)):
+                if i:
+                    parts.append(generator.choice(operators))
+                if depth < 4 and generator.random() < 0.3:
+                    parts.append(generator.choice(["", "sqrt", "abs", "f"]) + "(" + expression(depth+1) + ")")
+                else:
+                    parts.append(generator.choice(terms))
+            return "".join(parts)
+
+        return [expression(0) for _ in range(count)]
+
+    def test_concurrentTranslations(self):
+        """ Test that concurrent translations give the serial results """
+
+        expressions = self.construct_Expressions(200)*10
+        translator = Translator(self.log)
+        expected = [translator.translate(expression) for expression in expressions]
+
+        with ThreadPoolExecutor(16) as executor:
+            results = list(executor.map(translator.translate, expressions))
+        self.assertEqual(results, expected)
+    def test_lockedLog(self):
+        """ Test that the calls to a LockedLog are serialised and follow the changes of the log """
+
+        log = LockedLog(self.log)
+        log.info("looked up")
+        messages = list()
+
+        def record(message):
+            thread = threading.Thread(target=lambda: messages.append(LockedLog._lock.acquire(blocking=False)))
+            thread.start()
+            thread.join()
+            messages.append(message)
+
+        self.log.info = record
+        log.info("recorded")
+        self.assertEqual(messages, [False, "recorded"])
+    def test_readOnlyTables(self):
+        """ Test that the shared tables can't be modified """
+
+        with self.assertRaises(TypeError):
+            _LEVEL0_OPERATORS_DICT["+"] = _LEVEL0_OPERATORS_DICT["-"]
+        with self.assertRaises(TypeError):
+            getFunctions()["sqrt"] = None
+        with self.assertRaises(AttributeError):
+            _LEVEL0_OPERATORS.append(_LEVEL0_OPERATORS[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the translator
+# ---------------------------------------------------------
+# ./tests/test_translator.py
+
+import json
+import time
+import unittest
+
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.renderers import AbbreviationRenderer
+from txt2latex.src.baseComponent import getOperatorSets
+
+class TranslateExpression(unittest.TestCase):
+    """ Test Class for the translator
+
+    This class test the translation of an expression through all the
+    stages, and the options of the translator.
+    """
+
+    multiple_latex_expression = r"-(p^2 - omega_BdG^2 + 2*omega_BdG*p/zeta_BdG)*(m_alpha + 2/Z_alpha*m_q - 2*Z_alpha*p + m_q*p - p^2)"
+    expected_multipleLatexExpression = r" - (p^{2} - omega_{BdG}^{2} + 2omega_{BdG}\frac{p}{zeta_{BdG}})(m_{alpha} + \frac{2}{Z_{alpha}}m_{q} - 2Z_{alpha}p + m_{q}p - p^{2})"
+
+    def setUp(self):
+        self.log = ConsoleLogueurFactory(LogLevel(1))
+
+    def test_translate(self):
+        """ Test the translation of an expression """
+
+        translator = Translator(self.log)
+        self.assertEqual(
+            self.expected_multipleLatexExpression,
+            translator.translate(self.multiple_latex_expression)
+        )
+        self.assertIsNone(translator.last_memory_report)
+    def test_memoryReport(self):
+        """ Test the report of the memory allocated by each stage """
+
+        translator = Translator(self.log, memory_report=True)
+        self.assertEqual(
+            self.expected_multipleLatexExpression,
+            translator.translate(self.multiple_latex_expression)
+        )
+
+        report = json.loads(translator.last_memory_report.to_json())
+        self.assertEqual(list(report["stages"]), ["logical_parse", "latex_parse", "render"])
+        self.assertEqual(report["stages"]["logical_parse"]["components"], {"LogicalBlock": 3, "LogicalElement": 4})
+        self.assertEqual(report["stages"]["latex_parse"]["components"]["LatexElement"], 16)
+        for stage in report["stages"].values():
+            self.assertGreaterEqual(stage["peak"], stage["retained"])
+    def test_preview(self):
+        """ Test that the preview is the beginning of the translation """
+
+        translator = Translator(self.log)
+        self.assertEqual(translator.preview(self.multiple_latex_expression, 500),
+                         (self.expected_multipleLatexExpression, False))
+        self.assertEqual(translator.preview(self.multiple_latex_expression, 20),
+                         (self.expected_multipleLatexExpression[:20], True))
+
+        # The fractions whose numerator is a group are previewed from their numerator:
+        expression = "(a + b + c + d + e + f + g + h)/(x + y) + z"
+        self.assertEqual(translator.preview(expression, 10), (translator.translate(expression)[:10], True))
+        for expression in ("u*sqrt(a + b - c*d + e)/c/(x + y) + z", "a/exp(x + y - z)/(u + v) - b", "(a + b/)c + d"):
+            for max_chars in range(1, 40):
+                with self.subTest(expression=expression, max_chars=max_chars):
+                    f_expr = translator.translate(expression)
+                    self.assertEqual(translator.preview(expression, max_chars),
+                                     (f_expr[:max_chars], len(f_expr) > max_chars))
+
+        # A '/' followed by another operator isn't a fraction:
+        for expression in ("(a+b)/-c+d", "abs(x)/-b-a", "(a+b)/+c", "sqrt(a + b)/ - (c + d)/e", "(a - b)/+(c)*d"):
+            for max_chars in range(1, 30):
+                with self.subTest(expression=expression, max_chars=max_chars):
+                    self.assertTrue(translator.translate(expression).startswith(translator.preview(expression, max_chars)[0]))
+
+        # Only the beginning of a huge expression is parsed:
+        huge = " + ".join([self.multiple_latex_expression]*1000)
+        expected = translator.translate(huge)[:300]
+        logical_parse = translator.logical_parser.parse
+        sizes = list()
+        translator.logical_parser.parse = lambda expr: sizes.append(len(expr)) or logical_parse(expr)
+        self.assertEqual(translator.preview(huge, 300), (expected, True))
+        self.assertLess(max(sizes), 4*300)
+    def test_previewNumerator(self):
+        """ Test that the preview of a huge numerator is much cheaper than its translation """
+
+        translator = Translator(self.log)
+        expression = "sqrt(" + " + ".join(f"a_{i}*b_{i}" for i in range(4000)) + ")/c"
+        def timing(function):
+            timings = list()
+            for _ in range(3):
+                start = time.perf_counter()
+                result = function()
+                timings.append(time.perf_counter() - start)
+            return min(timings), result
+
+        preview_time, preview = timing(lambda: translator.preview(expression, 200))
+        translate_time, f_expr = timing(lambda: translator.translate(expression))
+        self.assertEqual(preview, (f_expr[:200], True))
+        self.assertLess(preview_time, translate_time/10)
+    def test_previewArguments(self):
+        """ Test the arguments of the preview """
+
+        translator = Translator(self.log)
+        with self.assertRaises(TypeError):
+            translator.preview(self.multiple_latex_expression, "20")
+        with self.assertRaises(ValueError):
+            translator.preview(self.multiple_latex_expression, 0)
+        with self.assertRaises(ValueError):
+            translator.preview("a + (b", 3)
+    def test_operatorSets(self):
+        """ Test the rendering of a parsed expression with several operator sets """
+
+        translator = Translator(self.log)
+        latex_expr = translator.parse("2*a/(3*b) + sqrt(x*y)/2")
+        self.assertEqual(translator.render(latex_expr), r"2\frac{a}{(3b)} + \frac{\sqrt{xy}}{2}")
+        self.assertEqual(translator.render(latex_expr, "cdot"), r"2 \cdot \frac{a}{(3 \cdot b)} + \frac{\sqrt{x \cdot y}}{2}")
+        self.assertEqual(translator.render(latex_expr, "inline-cdot"), r"2 \cdot a/(3 \cdot b) + \sqrt{x \cdot y}/2")
+        self.assertEqual(translator.render(latex_expr, {'+': lambda expr1, expr2: f"{expr1} \\oplus {expr2}"}),
+                         r"2\frac{a}{(3b)} \oplus \frac{\sqrt{xy}}{2}")
+        # The expression isn't changed by the renderings:
+        self.assertEqual(str(latex_expr), translator.translate("2*a/(3*b) + sqrt(x*y)/2"))
+
+        translator = Translator(self.log, operators="inline-cdot")
+        self.assertEqual(translator.translate(self.multiple_latex_expression),
+                         r" - (p^{2} - omega_{BdG}^{2} + 2 \cdot omega_{BdG} \cdot p/zeta_{BdG}) \cdot "
+                         r"(m_{alpha} + 2/Z_{alpha} \cdot m_{q} - 2 \cdot Z_{alpha} \cdot p + m_{q} \cdot p - p^{2})")
+        translator = Translator(self.log, renderer=AbbreviationRenderer(self.log, min_size=3), operators="cdot")
+        self.assertEqual(translator.translate("(a*b+c)*(a*b+c)"), "A_{1} \\cdot A_{1},\n\\quad\\text{where}\\quad A_{1} = a \\cdot b + c")
+
+        # A factor following a fraction isn't rendered as a part of its denominator:
+        for operators, expected in [("default", r"\frac{a}{b}c"), ("cdot", r"\frac{a}{b} \cdot c"),
+                                    ("inline-cdot", r"a/b \cdot c")]:
+            with self.subTest(operators=operators):
+                self.assertEqual(translator.render(translator.parse("a/b*c"), operators), expected)
+        self.assertEqual(set(getOperatorSets()), {"default", "cdot", "inline-cdot"})
+
+        with self.assertRaises(ValueError):
+            Translator(self.log, operators="fancy")
+        with self.assertRaises(ValueError):
+            Translator(self.log, operators="inline")
+        with self.assertRaises(TypeError):
+            translator.render(latex_expr, 1)
+    def test_renderDepth(self):
+        """ Test that the default rendering of a deeply nested expression costs two frames by level """
+
+        # -*- COMMENT -*-
+        #   The expressions nested about 490 times render with the default
+        # recursion limit (330 with a third frame by level, e.g. '__str__'
+        # calling 'render'); the margin is for the frames of the test runner.
+        translator = Translator(self.log, metrics=None)
+        latex_expr = translator.parse("(" * 420 + "a" + ")" * 420)
+        self.assertEqual(str(latex_expr), "(" * 420 + "a" + ")" * 420)
+        self.assertEqual(latex_expr.render(), str(latex_expr))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the tree walker
+# ---------------------------------------------------------
+# ./tests/test_treeWalker.py
+
+import unittest
+
+from txt2latex.src.baseComponent.logicalComponent import *
+from txt2latex.src.baseComponent.latexComponent import *
+from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS_DICT, _nullOperator
+from txt2latex.src.baseComponent import treeWalker
+
+class WalkTree(unittest.TestCase):
+    """ Test Class for the traversal of the trees
+
+    This class test the iterative traversal of the trees, and the
+    functions built on it (equality, dump, count and depth).
+    """
+
+    def construct_LogicalTree(self):
+        """ Construct the logical tree of 'a + (b - (c))' """
+
+        self.block_0 = LogicalBlock(); self.block_0.add_children(LogicalElement(r"c"))
+        self.block_1 = LogicalBlock()
+        self.block_1.add_children(LogicalElement(r"b - "))
+        self.block_1.add_children(self.block_0)
+
+        self.logicalRoot = LogicalBlock(name='root')
+        self.logicalRoot.add_children(LogicalElement(r"a + "))
+        self.logicalRoot.add_children(self.block_1)
+    def construct_LatexTree(self):
+        """ Construct the latex tree of 'a + (b - c)' """
+
+        component_0 = LatexExpression(LatexDelimitor("(",")"))
+        component_0.add_children(_nullOperator, LatexElement("b"))
+        component_0.add_children(_LEVEL0_OPERATORS_DICT["-"], LatexElement("c"))
+
+        self.latexRoot = LatexExpression(LatexDelimitor())
+        self.latexRoot.add_children(_nullOperator, LatexElement("a"))
+        self.latexRoot.add_children(_LEVEL0_OPERATORS_DICT["+"], component_0)
+    def construct_deepTree(self, depth:int) -> LogicalBlock:
+        """ Construct a logical tree deeper than the recursion limit """
+
+        root = LogicalBlock(name='root')
+        block = root
+        for _ in range(depth):
+            child = LogicalBlock()
+            block.add_children(child)
+            block = child
+        block.add_children(LogicalElement("a"))
+        return root
+
+    def setUp(self):
+        self.construct_LogicalTree()
+        self.construct_LatexTree()
+
+    def test_walkOrder(self):
+        """ Test the order in which the nodes are yielded """
+
+        pre = [str(node) for node,_ in treeWalker.walk(self.block_1,"pre")]
+        post = [str(node) for node,_ in treeWalker.walk(self.block_1,"post")]
+        self.assertEqual(pre, ["Block( E'b - 'Block( E'c' ) )", "E'b - '", "Block( E'c' )", "E'c'"])
+        self.assertEqual(post, ["E'b - '", "E'c'", "Block( E'c' )", "Block( E'b - 'Block( E'c' ) )"])
+    def test_visitSkip(self):
+        """ Test that a subtree is skipped when 'enter' returns False """
+
+        entered, left = list(), list()
+        treeWalker.visit(self.logicalRoot,
+                         enter=lambda node,depth: entered.append(depth) or node is not self.block_1,
+                         leave=lambda node,depth: left.append(depth))
+        self.assertEqual(entered, [0,1,1])
+        self.assertEqual(left, [1,0])
+    def test_countAndDepth(self):
+        """ Test the number of nodes and the depth of the trees """
+
+        self.assertEqual(treeWalker.count_nodes(self.logicalRoot), 6)
+        self.assertEqual(treeWalker.tree_depth(self.logicalRoot), 4)
+        self.assertEqual(treeWalker.count_nodes(self.latexRoot), 5)
+        self.assertEqual(treeWalker.tree_depth(self.latexRoot), 3)
+    def test_dump(self):
+        """ Test the debug representation of the trees """
+
+        self.assertEqual(str(self.logicalRoot), "Block( E'a + 'Block( E'b - 'Block( E'c' ) ) )")
+        self.assertEqual(
+            repr(self.latexRoot),
+            "LatexExpression:[d{;}]::(2)[( (p0), E{a_{None}^{None}}), "
+            "(+ (p1), LatexExpression:[d{(;)}]::(2)[( (p0), E{b_{None}^{None}}), (- (p1), E{c_{None}^{None}})])]"
+        )
+    def test_deepEquality(self):
+        """ Test the comparison of trees deeper than the recursion limit """
+
+        self.assertEqual(self.construct_deepTree(50000), self.construct_deepTree(50000))
+        self.assertNotEqual(self.construct_deepTree(50000), self.construct_deepTree(50001))
+        self.assertEqual(treeWalker.tree_depth(self.construct_deepTree(50000)), 50002)
+
+if __name__ == "__main__":
+    unittest.main()
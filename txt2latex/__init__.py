@@ -9,6 +9,12 @@
 #   The way the differents parsers are defined aren't yet fixed,
 # They will surely change before the first version 1.0.0
 from .src import parsers
+from .src.translator import Translator
+from .src.parallel_translator import ParallelTranslator
+
+# Import Metrics:
+# ---------------
+from .src.instrumentation.metrics import stats
 
 # Import Logical Components:
 # --------------------------
@@ -22,4 +28,9 @@ from .src.baseComponent.latexComponent import \
     LatexElement, \
     LatexOperator, \
     LatexDelimitor, \
-    LatexExpression
\ No newline at end of file
+    LatexExpression
+
+# Import Tree Walker and Serializer:
+# ----------------------------------
+from .src.baseComponent import treeWalker
+from .src.baseComponent import serializer
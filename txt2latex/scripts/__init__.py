@@ -5,4 +5,5 @@
 # ./scripts/__init__.py
 
 from .translate import main as translate
-from .tests import main as tests
\ No newline at end of file
+from .tests import main as tests
+from .profiling import main as profile
\ No newline at end of file
@@ -9,9 +9,13 @@ import argparse
 from py_utils.Logueur import ConsoleLogueurFactory
 from py_utils.Logueur.log_level import LogLevel
 
+from txt2latex.src.instrumentation.metrics import METRICS
+
 from txt2latex.scripts import \
     translate, \
-    tests
+    tests, \
+    profile
+from txt2latex.scripts.translate import add_arguments as add_translate_arguments
 
 def main():
     """ Main entry point
@@ -26,19 +30,31 @@ def main():
     )
     subparsers = main_parser.add_subparsers(dest="cmd")
     main_parser.add_argument("-ll", "--log-level",help="The level used for filtering log message",type=int,dest="logLevel",default=1)
+    main_parser.add_argument("--metrics-file",type=str,default=None,dest="metricsFile",help="Dump the metrics of the translations in this file, in the text format of Prometheus")
 
     # Translate process:
     # ------------------
     parser_translate = subparsers.add_parser("translate",help="translate help")
 
+    add_translate_arguments(parser_translate)
+
+    # Profile process:
+    # ----------------
+    parser_profile = subparsers.add_parser("profile",help="profile the translation of an expression or a corpus")
+
     # Required arguments:
-    group_translate = parser_translate.add_mutually_exclusive_group(required=True)
-    group_translate.add_argument("expression", nargs='?', type=str, help="The expression to translate")
-    group_translate.add_argument("-f","--file",nargs=1,type=str,help="The file containing the text to translate")
+    group_profile = parser_profile.add_mutually_exclusive_group(required=True)
+    group_profile.add_argument("expression", nargs='?', type=str, help="The expression to profile")
+    group_profile.add_argument("-f","--file",nargs='+',type=str,help="The files of the corpus, containing one expression per line")
 
     # Optional arguments:
-    #TODO
-
+    parser_profile.add_argument("--mode",choices=["cprofile","sampling"],default="cprofile",help="Profile under cProfile, or with the low-overhead sampling profiler")
+    parser_profile.add_argument("--interval",type=float,default=1.0,help="The sampling interval, in milliseconds")
+    parser_profile.add_argument("--repeat",type=int,default=1,help="The number of translations of the expression given on the command line")
+    parser_profile.add_argument("--top",type=int,default=10,help="The number of slowest expressions reported")
+    parser_profile.add_argument("--collapsed",type=str,default=None,help="Write the sampled call stacks in this file, as collapsed stacks for flamegraph tools")
+    parser_profile.add_argument("--stats",type=str,default=None,help="Write the cProfile statistics in this file (cprofile mode)")
+    parser_profile.add_argument("--json",action="store_true",help="Report in JSON")
 
     # Tests process:
     # --------------
@@ -54,13 +70,22 @@ def main():
 
     log = ConsoleLogueurFactory(LogLevel(args.logLevel))
 
-    if args.cmd == "translate":
-        log.info("Starting translating process.")
-        translate(args,log)
-    elif args.cmd == "tests":
-        tests()
-    elif args.cmd == "operators":
-        raise NotImplementedError("This functionality isn't yet implemented, but will be coming soon ;)")
+    # The metrics are also written when the process fails:
+    try:
+        if args.cmd == "translate":
+            log.info("Starting translating process.")
+            translate(args,log)
+        elif args.cmd == "profile":
+            log.info("Starting profiling process.")
+            profile(args,log)
+        elif args.cmd == "tests":
+            tests()
+        elif args.cmd == "operators":
+            raise NotImplementedError("This functionality isn't yet implemented, but will be coming soon ;)")
+    finally:
+        if args.metricsFile:
+            METRICS.write_prometheus(args.metricsFile)
+            log.info(f"Metrics written to {args.metricsFile}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Wrapper for starting profiling process.
+# ---------------------------------------------------------
+# ./scripts/profiling.py
+
+"""CLI for profiling the translation of expressions.
+
+This script is a wrapper that translates an expression, or a corpus of
+expressions, under cProfile or under a sampling profiler. It reports the
+wall-clock time of each stage of the translation and the slowest expressions,
+and can export the sampled call stacks as collapsed stacks for the flamegraph
+tools.
+
+The corpus is a list of text files, containing one expression per line (the
+empty lines are ignored).
+"""
+
+import sys
+
+from py_utils import Logueur
+
+from txt2latex.src.translator import Translator
+from txt2latex.src.instrumentation import profile_translations
+
+def read_corpus(paths:list[str]) -> list[str]:
+    """ Read the expressions of the corpus, one per non-empty line. """
+
+    expressions = list()
+    for path in paths:
+        with open(path,"r",encoding="utf-8") as file:
+            expressions.extend(line.strip() for line in file if line.strip())
+    return expressions
+
+def main(args, log:Logueur):
+    """ Entry-point
+
+        Function responsible to profile the translation of the expressions.
+    """
+
+    # Get expressions:
+    # ----------------
+    if args.file:
+        expressions = read_corpus(args.file)
+        log.debug(f"Reading {len(expressions)} expressions from {len(args.file)} files")
+    else:
+        expressions = [args.expression]*args.repeat
+    if not expressions:
+        log.error("There is no expression to profile")
+        return
+
+    # Profile:
+    # --------
+    translator = Translator(log)
+    report = profile_translations(translator,expressions,args.mode,
+                                  interval=args.interval/1000,
+                                  sample=bool(args.collapsed),
+                                  top=args.top)
+
+    sys.stdout.write((report.to_json() if args.json else str(report)) + "\n")
+    sys.stdout.flush()
+
+    # Export:
+    # -------
+    if args.collapsed:
+        with open(args.collapsed,"w",encoding="utf-8") as file:
+            file.write(report.collapsed + "\n")
+        log.info(f"Collapsed stacks written to '{args.collapsed}'")
+    if args.stats and report.stats is not None:
+        report.stats.dump_stats(args.stats)
+        log.info(f"cProfile statistics written to '{args.stats}'")
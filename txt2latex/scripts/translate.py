@@ -8,19 +8,75 @@
 
 This script is a wrapper that allows translating text into a LaTeX equation. 
 It takes as an argument either a path to a txt file containing the text to be 
-translated, or the text itself. Additionally, an argument allows specifying 
+translated ('-' for the standard input, e.g. a pipe), or the text itself. The
+file is parsed while it is read. Additionally, an argument allows specifying 
 whether what is to be transcribed is a matrix or not (in upcoming version).
 """
 
 import sys
 import argparse
+import contextlib
+from typing import Iterator, Optional
 
 from py_utils import Logueur
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
 
-from txt2latex.src.parsers import LogicalParser
-from txt2latex.src.parsers import LatexParser
+from txt2latex.src.translator import Translator
+from txt2latex.src.baseComponent.loadOperator import getOperatorSets
+from txt2latex.src.parallel_translator import ParallelTranslator
+from txt2latex.src.renderers import AbbreviationRenderer, LineBreakRenderer
+from txt2latex.src.batch import TexDocumentWriter, BatchJournal, read_batch, read_batch_offsets
+from txt2latex.src.parsers import ResourceLimits
 
 multiple_logical_block = r"a + (p^2 + 2*omega*(b - c))*(p^3 - (a*p^2)*(c - d) - a)"
+CHUNK_SIZE = 1 << 16
+
+def read_chunks(path:str) -> Iterator[str]:
+    """ Read a file ('-' for the standard input) by chunks of CHUNK_SIZE caracters. """
+    with (contextlib.nullcontext(sys.stdin) if path == '-' else open(path,encoding="utf-8")) as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+def read_limits(args) -> Optional[ResourceLimits]:
+    """ Build the limits of the translations from the arguments, None when no limit is given. """
+    limits = dict(max_length=args.maxLength,max_depth=args.maxDepth,max_nodes=args.maxNodes,
+                  max_output=args.maxOutput,timeout=args.timeout)
+    if all(value is None for value in limits.values()):
+        return None
+    return ResourceLimits(**limits)
+
+def add_arguments(parser:argparse.ArgumentParser) -> None:
+    """ Register the arguments of the translating process on a parser (the 'translate' sub-command or the parser of this script). """
+
+    # Required arguments:
+    group_translate = parser.add_mutually_exclusive_group(required=True)
+    group_translate.add_argument("expression", nargs='?', type=str, help="The expression to translate")
+    group_translate.add_argument("-f","--file",nargs=1,type=str,help="The file containing the text to translate ('-' for the standard input)")
+
+    # Optional arguments:
+    parser.add_argument("--abbreviate",choices=["where","newcommand"],default=None,help="Abbreviate the repeated sub-expressions, in a 'where' block or with newcommands")
+    parser.add_argument("--abbreviate-min-size",type=int,default=10,dest="abbreviateMinSize",help="The minimal number of nodes of an abbreviated sub-expression")
+    parser.add_argument("--memory-report",choices=["text","json"],default=None,dest="memoryReport",help="Report the memory allocated by each stage of the translation on stderr")
+    parser.add_argument("--normalize",action="store_true",help="Collapse the redundant parentheses of the expression before translating it")
+    parser.add_argument("--frontend",choices=["logical","ast"],default="logical",help="Parse the expression with the ast module of Python first ('ast'), falling back to the parsers of txt2latex")
+    parser.add_argument("--operators",choices=list(getOperatorSets()),default="default",help="The operator set formatting the operators ('cdot' for '\\cdot' products, 'inline-cdot' for inline fractions and '\\cdot' products)")
+    parser.add_argument("--minify",action="store_true",help="Minify the translation for a math renderer in a browser (KaTeX, MathJax): no braces around the single caracter scripts and arguments, no unneeded spaces")
+    parser.add_argument("--tex-document",type=str,default=None,dest="texDocument",help="Write the translations in this LaTeX document, the file given with -f containing one expression per line (optionally preceded by its id and a tab, used as label)")
+    parser.add_argument("--template-cache",action="store_true",dest="templateCache",help="Render the expressions of the LaTeX document whose shape was already translated (other names and numbers) without parsing them")
+    parser.add_argument("--cost-report",type=str,default=None,dest="costReport",help="Write the estimated cost and the actual time of the translation of each expression of the LaTeX document in this file (tab separated)")
+    parser.add_argument("--line-break",choices=["split","multline"],default=None,dest="lineBreak",help="Break the translations longer than --line-width in the rows of a 'split' or a 'multline' environment, at their '+' and '-' operators")
+    parser.add_argument("--line-width",type=int,default=100,dest="lineWidth",help="The target width of the rows of --line-break, in caracters of LaTeX source")
+    parser.add_argument("--resume",action="store_true",help="Resume the LaTeX document of a batch file from the last checkpoint of its journal (written next to it), skipping the expressions already written")
+    parser.add_argument("--environment",choices=["equation","align"],default="equation",help="The environment of the equations of the LaTeX document")
+    parser.add_argument("--workers",type=int,default=None,help="Translate a huge expression on this number of processes, by splitting it at its top-level terms")
+    parser.add_argument("--max-length",type=int,default=None,dest="maxLength",help="The maximal number of caracters of an expression")
+    parser.add_argument("--max-depth",type=int,default=None,dest="maxDepth",help="The maximal nesting depth of the parentheses of an expression")
+    parser.add_argument("--max-nodes",type=int,default=None,dest="maxNodes",help="The maximal number of nodes of the trees built by the parsers")
+    parser.add_argument("--max-output",type=int,default=None,dest="maxOutput",help="The maximal number of caracters of a translation")
+    parser.add_argument("--timeout",type=float,default=None,help="The maximal time of a translation, in seconds")
+    parser.add_argument("--fallback",action="store_true",help="Write an expression exceeding a limit as raw text, in \\texttt{}, instead of failing")
+
 
 def main(args, log:Logueur):
     """ Entry-point
@@ -28,35 +84,93 @@ def main(args, log:Logueur):
         Function responsible to parse an expression and translate it to a latex expression.
     """
 
+    limits = read_limits(args)
+    fallback, frontend, operators, minify = args.fallback, args.frontend, args.operators, args.minify
+    line_break, line_width = args.lineBreak, args.lineWidth
+
+    # Write a LaTeX document:
+    # -----------------------
+    if args.texDocument:
+        if args.abbreviate or args.memoryReport or frontend != "logical" or operators != "default" or minify:
+            log.fatal("The LaTeX document can't be written with --abbreviate, --memory-report, --frontend, --operators or --minify")
+            raise ValueError("The LaTeX document can't be written with --abbreviate, --memory-report, --frontend, --operators or --minify")
+        if args.templateCache and line_break:
+            log.fatal("The template cache can't be used with --line-break")
+            raise ValueError("The template cache can't be used with --line-break")
+        # -*- COMMENT -*-
+        #   The document of a batch file is journaled next to it, for resuming it
+        # from its last checkpoint (the standard input can't be read again).
+        journal, checkpoint = None, None
+        if args.file and args.file[0] != '-':
+            journal = BatchJournal.of_document(args.texDocument)
+            checkpoint = journal.last() if args.resume else None
+            equations = read_batch_offsets(args.file[0],checkpoint.input_offset if checkpoint else 0)
+        elif args.resume:
+            log.fatal("Only the LaTeX document of a batch file can be resumed")
+            raise ValueError("Only the LaTeX document of a batch file can be resumed")
+        else:
+            equations = read_batch(args.file[0]) if args.file else [(None,args.expression)]
+        writer = TexDocumentWriter(log,args.environment,args.workers,normalize=args.normalize,log_level=args.logLevel,
+                                   limits=limits,fallback=fallback,templates=args.templateCache,
+                                   line_break=line_break,line_width=line_width,
+                                   cost_report=args.costReport)
+        writer.write(equations,args.texDocument,journal=journal,checkpoint=checkpoint)
+        sys.stdout.write(f"{writer.written} equations written to {args.texDocument} ({writer.failed} failed)\n")
+        sys.stdout.flush()
+        return
+
     # Get expression:
     # ---------------
     if args.file:
-        # read the expression
-        #expression_to_translate = ...
-        log.fatal("Reading the expression from a file isn't supported yet !")
-        raise NotImplementedError("Reading the expression from a file isn't implemented yet, but it will be comming soon ;)")
+        log.debug(f"Reading expression from the file: {args.file[0]}")
+        chunks = read_chunks(args.file[0])
+        # The parallel translation splits the whole expression, the ast module parses it at once
+        expression_to_translate = "".join(chunks) if args.workers or frontend != "logical" else None
     else:
         expression_to_translate = args.expression
         log.debug(f"Reading expression from the command line: {expression_to_translate}")
 
     
-    # Create parsers:
-    # ---------------
-    logical_parser = LogicalParser(log)
-    latex_parser = LatexParser(log)
+    # Create translator:
+    # ------------------
+    if args.workers:
+        if (args.abbreviate or args.memoryReport or args.normalize or limits or fallback or frontend != "logical"
+                or operators != "default" or line_break or minify):
+            log.fatal("The parallel translation can't be used with --abbreviate, --memory-report, --normalize, --frontend, --operators, --line-break, --minify or the limits")
+            raise ValueError("The parallel translation can't be used with --abbreviate, --memory-report, --normalize, --frontend, --operators, --line-break, --minify or the limits")
+        translator = ParallelTranslator(log,workers=args.workers,log_level=args.logLevel)
+    else:
+        if args.abbreviate and line_break:
+            log.fatal("The abbreviations can't be used with --line-break")
+            raise ValueError("The abbreviations can't be used with --line-break")
+        renderer = None
+        if args.abbreviate:
+            renderer = AbbreviationRenderer(log,args.abbreviate,args.abbreviateMinSize)
+        elif line_break:
+            renderer = LineBreakRenderer(log,line_width,line_break)
+        translator = Translator(log,renderer=renderer,memory_report=bool(args.memoryReport),normalize=args.normalize,
+                                limits=limits,fallback=fallback,frontend=frontend,operators=operators,
+                                minify=minify)
 
     sys.stdout.write("Starting tanslate process...\n")
     sys.stdout.flush()
     
-    logical_expr = logical_parser.parse(expression_to_translate)
-    log.info("Expression translated successfully to a logical expression")
-
-    latex_expr = latex_parser.parse(logical_expr)
-    log.info("Logical expression translated successfully to a latex expression")
+    if args.workers:
+        with translator:
+            f_expr = translator.translate(expression_to_translate)
+    elif expression_to_translate is None:
+        f_expr = translator.translate_chunks(chunks)
+    else:
+        f_expr = translator.translate(expression_to_translate)
 
-    sys.stdout.write(f"I've found the following expression:\n{latex_expr}")
+    sys.stdout.write(f"I've found the following expression:\n{f_expr}")
     sys.stdout.flush()
 
+    if args.memoryReport:
+        report = translator.last_memory_report
+        sys.stderr.write((report.to_json() if args.memoryReport == "json" else str(report)) + "\n")
+        sys.stderr.flush()
+
 
 if __name__ == "__main__":
 
@@ -66,14 +180,13 @@ if __name__ == "__main__":
     # This enable the user to use directly the translate functionality
 
     # Create parser:
-    parser_translate = argparse.ArgumentParser("translate",help="translate help")
-    group_translate = parser_translate.add_mutually_exclusive_group(required=True)
-    group_translate.add_argument("expression", nargs='?', type=str, help="The expression to translate")
-    group_translate.add_argument("-f","--file",nargs=1,type=str,help="The file containing the text to translate")
+    parser_translate = argparse.ArgumentParser("translate",description="Translate a text expression to a latex expression")
+    parser_translate.add_argument("-ll", "--log-level",help="The level used for filtering log message",type=int,dest="logLevel",default=1)
+    add_arguments(parser_translate)
 
     # Parse arg:
     args = parser_translate.parse_args()
     args.cmd = "translate"
-    
+
     # Start process:
-    main(args)
\ No newline at end of file
+    main(args,ConsoleLogueurFactory(LogLevel(args.logLevel)))
\ No newline at end of file
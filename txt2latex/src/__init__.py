@@ -5,4 +5,8 @@
 # ./src/__init__.py
 
 from .baseComponent import *
-from .parsers import *
\ No newline at end of file
+from .parsers import *
+from .renderers import *
+from .translator import Translator
+from .parallel_translator import ParallelTranslator
+from .batch import *
\ No newline at end of file
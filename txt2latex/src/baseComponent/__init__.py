@@ -6,4 +6,5 @@
 
 from .latexComponent import *
 from .logicalComponent import *
-from .loadOperator import _nullOperator, _LEVEL0_OPERATORS, _LEVEL0_OPERATORS_DICT
\ No newline at end of file
+from .loadOperator import _nullOperator, _LEVEL0_OPERATORS, _LEVEL0_OPERATORS_DICT, getOperatorSets
+from .checks import set_debug_checks
\ No newline at end of file
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Switch of the validation of the trusted constructors
+# ---------------------------------------------------------
+# ./src/baseComponent/checks.py
+
+""" The debug switch of the validation of the components built by the parsers.
+
+The parsers build their components with trusted constructors (like
+'LatexExpression.from_children'), which skip the validation of their
+arguments: the parsers can't give them invalid ones. The constructors
+used by the users keep validating their arguments.
+
+For debugging the parsers, the validation can be turned back on
+everywhere, with 'set_debug_checks(True)' or by setting the environment
+variable TXT2LATEX_DEBUG_CHECKS (to anything but '0').
+"""
+
+# Import statement:
+# =================
+import os
+
+
+# Constant definition:
+# ====================
+# Read by the trusted constructors and the parsers, at each call:
+ENABLED = os.environ.get("TXT2LATEX_DEBUG_CHECKS","") not in ("","0")
+
+
+# Function definition:
+# ====================
+def set_debug_checks(enabled:bool) -> bool:
+    """ Turn on or off the validation in the trusted constructors and the parsers.
+
+    Arguments:
+    enabled : bool
+        Whether the arguments are validated everywhere.
+
+    Return:
+    bool
+        The previous state of the switch.
+    """
+
+    global ENABLED
+    previous, ENABLED = ENABLED, bool(enabled)
+    return previous
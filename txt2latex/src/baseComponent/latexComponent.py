@@ -4,7 +4,9 @@
 # ---------------------------------------------------------
 # ./src/baseComponent/latexComponent.py
 
-from typing import Union, Optional
+from typing import Callable, Mapping, Optional, Union
+
+from . import checks, treeWalker
 
 class LatexElement(): 
     """A LaTeX element
@@ -28,6 +30,23 @@ class LatexElement():
         self.subScript:Optional[str] = subScript
         self.superScript:Optional[str] = superScript
 
+    @classmethod
+    def from_parts(cls, mainContent:str, subScript:Optional[str]=None, superScript:Optional[str]=None) -> 'LatexElement':
+        """ Build an element without validating its parts.
+
+        This constructor is the one of the parsers, which guarantee that the parts
+        are strings (or None). They are validated like in the constructor when the
+        debug checks are enabled (see 'checks').
+        """
+
+        if checks.ENABLED:
+            return cls(mainContent,subScript,superScript)
+        element = cls.__new__(cls)
+        element.mainContent = mainContent
+        element.subScript = subScript
+        element.superScript = superScript
+        return element
+
     def __eq__(self, other:'LatexElement') -> bool:
         
         # Type Check:
@@ -220,6 +239,37 @@ class LatexExpression():
         # --------------------
         self.children:list[tuple[LatexOperator,Union[LatexElement,LatexExpression]]] = list()
         self.delimitor = delimitor
+
+    @classmethod
+    def from_children(cls, delimitor:LatexDelimitor,
+                      children:list[tuple[LatexOperator,Union[LatexElement,'LatexExpression']]]) -> 'LatexExpression':
+        """ Build an expression from its children, without validating them.
+
+        This constructor is the one of the parsers, which guarantee the types of
+        the delimitor and of the children. The list of the children is used by the
+        expression, without being copied. The arguments are validated like in the
+        constructor and 'add_children' when the debug checks are enabled (see 'checks').
+
+        Arguments:
+        delimitor : LatexDelimitor
+            The delimitor of the expression.
+        children : list[tuple[LatexOperator,LatexElement|LatexExpression]]
+            The operator and the child of each child of the expression.
+
+        Return:
+        LatexExpression
+            The expression, owning the list of its children.
+        """
+
+        if checks.ENABLED:
+            expression = cls(delimitor)
+            for operator, child in children:
+                expression.add_children(operator,child)
+            return expression
+        expression = cls.__new__(cls)
+        expression.children = children
+        expression.delimitor = delimitor
+        return expression
     def __eq__(self, other: 'LatexExpression') -> bool:
         
         # Type Check:
@@ -227,29 +277,15 @@ class LatexExpression():
         if not isinstance(other,LatexExpression):
             return False
         
-        # Test delimitor:
-        # ---------------
-        if self.delimitor != other.delimitor:
-            return False
-        
-        # Test len of children:
-        # ---------------------
-        if len(self.children) != len(other.children):
-            return False
-        
-        # Test Children:
-        # --------------
-        for child1,child2 in zip(self.children,other.children):
-            if child1 != child2:
-                return False
-            
-        return True
+        # Test the trees node by node:
+        # ----------------------------
+        return treeWalker.trees_equal(self,other)
     def __len__(self) -> int:
         return len(self.children)
     
     def __repr__(self) -> str:
-        return f"LatexExpression:[d{self.delimitor}]::({len(self.children)}){self.children}"
-    def __str__(self) -> str:
+        return treeWalker.dump(self)
+    def render(self, operators:Optional[Mapping[str,Callable[[str,str],str]]]=None) -> str:
         """ Format the LaTeX expression based on the priority of operators.
 
         The children of this instance are flattened into a single list, alternating operators and
@@ -264,6 +300,12 @@ class LatexExpression():
         expression or a LaTeX element. As the formatting progresses, certain elements are formatted 
         into strings, until there is only one string left, which is then formatted with the LaTeX delimiter
         of the instance and returned to the user.
+
+        The operators of the expression only give their symbol and priority: their formatting can be
+        chosen when rendering, by giving an operator set (see 'getOperatorSets'), which maps the symbol
+        of an operator to the function formatting it. The operators missing from the set (or all of
+        them, without set) are formatted by their own formatting function. The same expression can
+        thus be rendered in several styles, without parsing it again.
         """
 
         if len(self.children) == 0:
@@ -276,6 +318,9 @@ class LatexExpression():
         for operator,element in self.children.copy():
             max_operatorPriority = max(max_operatorPriority,operator.priority)
             flattened_children.append(operator)
+            # The sub-expressions are rendered with the same operator set:
+            if operators and isinstance(element,LatexExpression):
+                element = element.render(operators)
             flattened_children.append(element)
 
         #if self.debug:
@@ -319,7 +364,11 @@ class LatexExpression():
                 #    stdout.write(f"[__str__]\tResulting flattened children: {flattened_children}\n")
 
                 # format the 3 elements:
-                f_expr = operator.formate(expr1,expr2)
+                formatting = operators.get(operator.operator) if operators else None
+                if formatting is None:
+                    f_expr = operator.formate(expr1,expr2)
+                else:
+                    f_expr = formatting(str(expr1),str(expr2))
                 #if self.debug:
                 #    stdout.write(f"[__str__]\tResulting expression: {f_expr}\n\t---\n")
 
@@ -352,6 +401,12 @@ class LatexExpression():
             f_expr = str(flattened_children[0])
         
         return self.delimitor.format(f_expr)
+    # -*- COMMENT -*-
+    #   The default rendering is '__str__' itself, not a call to 'render': the
+    # sub-expressions are rendered by 'str' in the formatting of the operators,
+    # and an extra frame by nesting level would lower the deepest renderable
+    # expression by a third.
+    __str__ = render
 
     def add_children(self, operator:LatexOperator,
                      children:Union['LatexExpression',LatexElement]) -> None:
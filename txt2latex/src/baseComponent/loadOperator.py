@@ -4,7 +4,7 @@
 # ---------------------------------------------------------
 # ./src/baseComponent/loadOperator.py
 
-"""Script for defining the operators used and loading them in memory
+r"""Script for defining the operators used and loading them in memory
 
 This script defines a number of common operators and contains different functions
 for creating operators based on arguments or a JSON file. The idea is that
@@ -28,13 +28,34 @@ Common Operator:
 '-' (1) -> '{expr1} - {expr2}'
 '*' (1) -> '{expr1} {expr2}'
 '/' (2) -> '\frac{expr1}{expr2}'
+
+The functions (in the form 'name(expr)') are defined in the same way, each
+name being associated with the LaTeX delimitor surrounding its argument:
+'sqrt' -> '\sqrt{expr}'
+'exp'  -> 'e^{expr}'
+'abs'  -> '\left|expr\right|'
+'sin'  -> '\sin\left(expr\right)' (as well as the other trigonometric functions)
+'log'  -> '\ln\left(expr\right)' (the natural logarithm, as in Matlab)
+
+The formatting of the operators can also be chosen when rendering an expression,
+with an operator set mapping the symbol of an operator to its formatting function
+(see LatexExpression.render), the parsed expression being the same for all of them:
+'default'     -> the formatting of the operators above
+'cdot'        -> '*' formatted as '{expr1} \cdot {expr2}'
+'inline-cdot' -> '*' formatted as above, and '/' as '{expr1}/{expr2}'
+The inline fractions are only offered with the '\cdot' products: juxtaposed
+after an inline fraction, a factor would read as a part of its denominator
+('a/b*c' as 'a/bc', instead of 'a/b \cdot c').
 """
 
 #TODO: add level 1 and level 2 and level 3
 #TODO: add selection from level
 #TODO: add test for all 4 levels
 
-from .latexComponent import LatexOperator
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+from .latexComponent import LatexOperator, LatexDelimitor
 
 # Level 0:
 # --------
@@ -57,9 +78,37 @@ _nullOperator.add_formatting(_nullOperatorFormat)
 _multOperator.add_formatting(_multOperatorFormat)
 _fracOperator.add_formatting(_fracOperatorFormat)
 
-_LEVEL0_OPERATORS = [_plusOperator, _minusOperator, _multOperator, _fracOperator]
-_LEVEL0_OPERATORS_DICT = {'+':_plusOperator, '-':_minusOperator,
-                          '*':_multOperator, '/':_fracOperator}
+def _cdotOperatorFormat(expr1,expr2):
+    return rf"{expr1} \cdot {expr2}"
+
+def _inlineFracOperatorFormat(expr1,expr2):
+    return f"{expr1}/{expr2}"
+
+_LEVEL0_OPERATORS = (_plusOperator, _minusOperator, _multOperator, _fracOperator)
+_LEVEL0_OPERATORS_DICT = MappingProxyType({'+':_plusOperator, '-':_minusOperator,
+                                           '*':_multOperator, '/':_fracOperator})
+
+_LEVEL0_OPERATOR_SETS = MappingProxyType({
+    'default':MappingProxyType({}),
+    'cdot':MappingProxyType({'*':_cdotOperatorFormat}),
+    'inline-cdot':MappingProxyType({'*':_cdotOperatorFormat, '/':_inlineFracOperatorFormat}),
+})
+
+def _functionDelimitor(latexName:str) -> LatexDelimitor:
+    return LatexDelimitor(latexName + r"\left(", r"\right)")
+
+_LEVEL0_FUNCTIONS_DICT = MappingProxyType({
+    'sqrt':LatexDelimitor(r"\sqrt{","}"),
+    'exp':LatexDelimitor("e^{","}"),
+    'abs':LatexDelimitor(r"\left|",r"\right|"),
+    'conj':LatexDelimitor(r"\overline{","}"),
+    'log':_functionDelimitor(r"\ln"),
+    'log10':_functionDelimitor(r"\log_{10}"),
+    'log2':_functionDelimitor(r"\log_{2}"),
+    'sin':_functionDelimitor(r"\sin"), 'cos':_functionDelimitor(r"\cos"), 'tan':_functionDelimitor(r"\tan"),
+    'asin':_functionDelimitor(r"\arcsin"), 'acos':_functionDelimitor(r"\arccos"), 'atan':_functionDelimitor(r"\arctan"),
+    'sinh':_functionDelimitor(r"\sinh"), 'cosh':_functionDelimitor(r"\cosh"), 'tanh':_functionDelimitor(r"\tanh"),
+})
 
 
 # Level 1:
@@ -74,5 +123,11 @@ def create_fromArgs():
     pass
 
 #TODO
-def getOperators() -> list[LatexOperator]:
-    return _LEVEL0_OPERATORS
\ No newline at end of file
+def getOperators() -> tuple[LatexOperator,...]:
+    return _LEVEL0_OPERATORS
+
+def getFunctions() -> Mapping[str,LatexDelimitor]:
+    return _LEVEL0_FUNCTIONS_DICT
+
+def getOperatorSets() -> Mapping[str,Mapping[str,Callable[[str,str],str]]]:
+    return _LEVEL0_OPERATOR_SETS
\ No newline at end of file
@@ -14,12 +14,21 @@ formatting of Matlab symbolic expressions.
 
 from typing import Union, Optional
 
+from . import checks, treeWalker
+
 class LogicalElement():
     """Class representing a logical element.
 
     An instance of this class represents a simple logical element, i.e. without
     other groups (content enclosed in parentheses).
+
+    An element built by a parser references the parsed expression with a span
+    (see 'from_span'): its contents are only copied from the expression when
+    they are first read, and the span gives its position in the expression.
     """
+
+    __slots__ = ("_source","_start","_end","_contents")
+
     def __init__(self,expr:str) -> None:
 
         # Type checking:
@@ -32,7 +41,68 @@ class LogicalElement():
         if '(' in expr or ')' in expr:
             raise ValueError(f"Expression shall not contains the following caracters. '(' or ')'. I received {expr}")
         
-        self.contents:str = expr
+        self._source:Optional[str] = None
+        self._start:int = 0
+        self._end:int = len(expr)
+        self._contents:Optional[str] = expr
+
+    @classmethod
+    def from_span(cls, source:str, start:int, end:int) -> 'LogicalElement':
+        """ Build an element referencing the caracters source[start:end].
+
+        The span isn't validated: it must come from a parser, which guarantees
+        that it doesn't contain any parenthesis (it is checked when the debug
+        checks are enabled, see 'checks').
+
+        Arguments:
+        source : str
+            The parsed expression.
+        start, end : int
+            The bounds of the element in the expression.
+
+        Return:
+        LogicalElement
+            The element, whose contents are materialised when first read.
+        """
+
+        if checks.ENABLED and ('(' in source[start:end] or ')' in source[start:end]):
+            raise ValueError(f"Expression shall not contains the following caracters. '(' or ')'. I received {source[start:end]}")
+
+        element = cls.__new__(cls)
+        element._source = source
+        element._start = start
+        element._end = end
+        element._contents = None
+        return element
+    @classmethod
+    def from_contents(cls, contents:str) -> 'LogicalElement':
+        """ Build an element from its contents, without scanning them for parentheses.
+
+        This constructor is the one of the parsers, which guarantee that the
+        contents don't contain any parenthesis. They are validated like in the
+        constructor when the debug checks are enabled (see 'checks').
+        """
+
+        if checks.ENABLED:
+            return cls(contents)
+        element = cls.__new__(cls)
+        element._source = None
+        element._start = 0
+        element._end = len(contents)
+        element._contents = contents
+        return element
+
+    @property
+    def contents(self) -> str:
+        if self._contents is None:
+            self._contents = self._source[self._start:self._end]
+        return self._contents
+    @property
+    def span(self) -> Optional[tuple[int,int]]:
+        """ The bounds of the element in the parsed expression, None if it wasn't built from a span. """
+        if self._source is None:
+            return None
+        return self._start, self._end
     
     def __eq__(self,other:'LogicalElement') -> bool:
 
@@ -62,28 +132,36 @@ class LogicalBlock():
         self.children:list[Union['LogicalBlock',LogicalElement]] = list()
         self._metadata:dict[any:any] = metadatas
 
+    @classmethod
+    def from_children(cls, children:list[Union[LogicalElement,'LogicalBlock']], **metadatas:dict) -> 'LogicalBlock':
+        """ Build a block from its children, without validating them.
+
+        This constructor is the one of the parsers, which guarantee the types of
+        the children. The list of the children is used by the block, without being
+        copied. The children are validated like in 'add_children' when the debug
+        checks are enabled (see 'checks').
+        """
+
+        if checks.ENABLED:
+            block = cls(**metadatas)
+            for child in children:
+                block.add_children(child)
+            return block
+        block = cls.__new__(cls)
+        block.children = children
+        block._metadata = metadatas
+        return block
+
     def __eq__(self, other:'LogicalBlock') -> bool:
         
         # Test class:
         if not isinstance(other,LogicalBlock):
             return False
         
-        # Test len of children:
-        if len(self.children) != len(other.children):
-            return False
-        
-        # Test children:
-        for child1,child2 in zip(self.children,other.children):
-            if child1 != child2:
-                return False
-            
-        return True
+        # Test the trees node by node:
+        return treeWalker.trees_equal(self,other)
     def __str__(self) -> str:
-        s = "Block( "
-        for child in self.children:
-            s += str(child)
-        s += " )"
-        return s
+        return treeWalker.dump(self)
 
     def add_children(self,children:Union[LogicalElement,'LogicalBlock']) -> None:
 
@@ -117,4 +195,4 @@ class LogicalBlock():
         
         # Get metadata:
         # -------------
-        return self._metadata.get(key,default=default)
\ No newline at end of file
+        return self._metadata.get(key,default)
\ No newline at end of file
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Compact binary serialization of the components trees
+# ---------------------------------------------------------
+# ./src/baseComponent/serializer.py
+
+"""Compact and versioned binary format for the components trees.
+
+This module allows converting a tree of logical components (LogicalBlock,
+LogicalElement) or of LaTeX components (LatexExpression, LatexElement) to
+bytes and back, without relying on pickle. Both functions are iterative,
+so the depth of the tree is only limited by the memory available.
+
+Format (version 1), all integers are little-endian:
+- header   : magic b"T2LX", version (u8), tree kind (u8), 2 padding bytes,
+             number of symbols, operators and records, size of the symbols
+             blob (4 x u32)
+- offsets  : (number of symbols + 1) x u32, offsets of each symbol in the blob
+- operators: number of operators x (symbol index (i32), priority (i32))
+- records  : number of records x 5 x u32, the nodes of the tree in pre-order
+- blob     : the utf-8 encoded symbols, concatenated
+
+A record is composed of the kind of the node (low byte) and the index + 1 of
+the operator preceding it in its parent (0 if none), the span of the node
+(number of records of its subtree, itself included) and 3 fields depending
+on the kind of the node:
+- LogicalBlock     : number of metadata, -, -
+- metadata         : key index, value index, -
+- LogicalElement   : contents index, -, -
+- LatexExpression  : opening caracter index, closing caracter index, -
+- LatexElement     : mainContent index, subScript index + 1, superScript index + 1
+
+The metadata of a LogicalBlock are stored in the records following the block.
+The spans allow skipping a whole subtree without decoding it.
+"""
+
+# Import statement:
+# =================
+import struct
+import sys
+from array import array
+from typing import Union
+
+from .latexComponent import LatexElement, LatexOperator, LatexDelimitor, LatexExpression
+from .logicalComponent import LogicalElement, LogicalBlock
+from .loadOperator import _nullOperator, getOperators
+
+
+# Constant definition:
+# ====================
+_MAGIC = b"T2LX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBxxIIII")
+_RECORD_SIZE = 5
+
+_TREE_LOGICAL = 1
+_TREE_LATEX = 2
+
+_KIND_LOGICAL_BLOCK = 1
+_KIND_METADATA = 2
+_KIND_LOGICAL_ELEMENT = 3
+_KIND_LATEX_EXPRESSION = 4
+_KIND_LATEX_ELEMENT = 5
+
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+_CLOSE = object()
+
+
+# Functions definitions:
+# ======================
+def dumps(tree:Union[LogicalBlock,LatexExpression]) -> bytes:
+    """ Serialize a tree of components to bytes.
+
+    The tree is traversed in pre-order with an explicit stack, each node
+    being written as a fixed size record. The strings are interned in a
+    symbol table, so an identifier repeated many times is only stored once.
+
+    Arguments:
+    tree : LogicalBlock | LatexExpression
+        The root of the tree to serialize.
+
+    Return:
+    bytes
+        The serialized tree.
+
+    Raise:
+    TypeError : When the tree (or one of its node or metadata) can't be serialized
+    """
+
+    # Type Check:
+    # -----------
+    if isinstance(tree,LogicalBlock):
+        tree_kind = _TREE_LOGICAL
+    elif isinstance(tree,LatexExpression):
+        tree_kind = _TREE_LATEX
+    else:
+        raise TypeError(f"The tree to serialize must be a LogicalBlock or a LatexExpression, instead I've received a '{type(tree)}'")
+
+    # Initialisation:
+    # ---------------
+    symbols:dict[str,int] = dict()
+    operators:dict[int,int] = dict()
+    operators_table = array('i')
+    records = array('I')
+
+    def intern(symbol:str) -> int:
+        idx = symbols.get(symbol)
+        if idx is None:
+            idx = symbols[symbol] = len(symbols)
+        return idx
+
+    def operator_id(operator:LatexOperator) -> int:
+        idx = operators.get(id(operator))
+        if idx is None:
+            if not isinstance(operator,LatexOperator):
+                raise TypeError(f"Can't serialize an operator of type '{type(operator)}'")
+            idx = operators[id(operator)] = len(operators) + 1
+            operators_table.extend((intern(operator.operator),operator.priority))
+        return idx
+
+    # Traverse the tree:
+    # ------------------
+    stack = [(None,tree)]
+    while stack:
+        operator, node = stack.pop()
+
+        # End of a subtree, patch its span:
+        if operator is _CLOSE:
+            records[node*_RECORD_SIZE+1] = len(records)//_RECORD_SIZE - node
+            continue
+
+        op = operator_id(operator) if operator is not None else 0
+
+        if isinstance(node,LogicalElement):
+            records.extend((_KIND_LOGICAL_ELEMENT,1,intern(node.contents),0,0))
+
+        elif isinstance(node,LatexElement):
+            records.extend((
+                _KIND_LATEX_ELEMENT | op << 8, 1,
+                intern(node.mainContent),
+                0 if node.subScript is None else intern(node.subScript)+1,
+                0 if node.superScript is None else intern(node.superScript)+1,
+            ))
+
+        elif isinstance(node,LogicalBlock):
+            idx = len(records)//_RECORD_SIZE
+            records.extend((_KIND_LOGICAL_BLOCK,0,len(node._metadata),0,0))
+            for key,value in node._metadata.items():
+                if not isinstance(value,str):
+                    raise TypeError(f"Only string metadata can be serialized, instead I've received a '{type(value)}' for the key '{key}'")
+                records.extend((_KIND_METADATA,1,intern(key),intern(value),0))
+            stack.append((_CLOSE,idx))
+            stack.extend((None,child) for child in reversed(node.children))
+
+        elif isinstance(node,LatexExpression):
+            idx = len(records)//_RECORD_SIZE
+            records.extend((
+                _KIND_LATEX_EXPRESSION | op << 8, 0,
+                intern(node.delimitor.openingCaracter),
+                intern(node.delimitor.closingCaracter),
+                0,
+            ))
+            stack.append((_CLOSE,idx))
+            stack.extend(reversed(node.children))
+
+        else:
+            raise TypeError(f"Can't serialize a node of type '{type(node)}'")
+
+    # Build the symbols blob:
+    # -----------------------
+    encoded = [symbol.encode("utf-8") for symbol in symbols]
+    offsets = array('I',(0,))
+    total = 0
+    for chunk in encoded:
+        total += len(chunk)
+        offsets.append(total)
+
+    if not _NATIVE_LITTLE_ENDIAN:
+        offsets.byteswap()
+        operators_table.byteswap()
+        records.byteswap()
+
+    header = _HEADER.pack(_MAGIC,_VERSION,tree_kind,len(symbols),len(operators),
+                          len(records)//_RECORD_SIZE,total)
+
+    return b"".join((header,offsets.tobytes(),operators_table.tobytes(),
+                     records.tobytes(),*encoded))
+
+def loads(data:Union[bytes,bytearray,memoryview]) -> Union[LogicalBlock,LatexExpression]:
+    """ Deserialize a tree of components from bytes.
+
+    The fixed size sections of the payload are read through memoryviews
+    without copying them, and the tree is rebuilt in a single loop over
+    the records, using the spans to know when a subtree is finished.
+    The operators are resolved to the operators already loaded in memory
+    when possible, to keep their formatting function.
+
+    Arguments:
+    data : bytes | bytearray | memoryview
+        The payload produced by 'dumps'.
+
+    Return:
+    LogicalBlock | LatexExpression
+        The root of the deserialized tree.
+
+    Raise:
+    TypeError : When the argument isn't of the correct type
+    ValueError : When the payload isn't a valid serialized tree
+    """
+
+    # Type Check:
+    # -----------
+    if not isinstance(data,(bytes,bytearray,memoryview)):
+        raise TypeError(f"The data to deserialize must be a bytes-like object, instead I've received a '{type(data)}'")
+
+    # Read the header:
+    # ----------------
+    view = memoryview(data).cast('B')
+    if len(view) < _HEADER.size:
+        raise ValueError("The data to deserialize is too short to be a serialized tree")
+    magic, version, tree_kind, n_symbols, n_operators, n_records, blob_size = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise ValueError(f"The data to deserialize doesn't start with the expected magic number, I've received {bytes(magic)}")
+    if version != _VERSION:
+        raise ValueError(f"Unsupported serialization version {version}, only the version {_VERSION} is supported")
+
+    offset = _HEADER.size
+    offsets = _read_array(view,offset,'I',n_symbols+1)
+    offset += (n_symbols+1)*4
+    operators_table = _read_array(view,offset,'i',n_operators*2)
+    offset += n_operators*8
+    records = _read_array(view,offset,'I',n_records*_RECORD_SIZE)
+    offset += n_records*_RECORD_SIZE*4
+    if len(view) != offset + blob_size:
+        raise ValueError(f"The data to deserialize has an unexpected size ({len(view)} instead of {offset + blob_size})")
+
+    # Decode the symbols and operators:
+    # ---------------------------------
+    blob = view[offset:]
+    symbols = [str(blob[offsets[i]:offsets[i+1]],"utf-8") for i in range(n_symbols)]
+
+    known_operators = {(op.operator,op.priority):op for op in (_nullOperator,*getOperators())}
+    operators = [None]
+    for i in range(n_operators):
+        key = (symbols[operators_table[2*i]],operators_table[2*i+1])
+        operators.append(known_operators.get(key) or LatexOperator(*key))
+
+    # Rebuild the tree:
+    # -----------------
+    delimitors:dict[tuple[int,int],LatexDelimitor] = dict()
+    latex_tree = tree_kind == _TREE_LATEX
+    root = None
+    parent = None
+    end = n_records
+    stack:list[tuple[Union[LogicalBlock,LatexExpression,None],int]] = list()
+    fields = iter(records.tolist())
+    for i, (kind_op, span, a, b, c) in enumerate(zip(fields,fields,fields,fields,fields)):
+        while i >= end:
+            parent, end = stack.pop()
+
+        kind = kind_op & 0xFF
+        if kind == _KIND_LATEX_ELEMENT:
+            node = LatexElement(symbols[a],
+                                None if b == 0 else symbols[b-1],
+                                None if c == 0 else symbols[c-1])
+        elif kind == _KIND_LOGICAL_ELEMENT:
+            node = LogicalElement(symbols[a])
+        elif kind == _KIND_METADATA:
+            if not isinstance(parent,LogicalBlock):
+                raise ValueError(f"Metadata found outside of a LogicalBlock (record {i})")
+            parent._metadata[symbols[a]] = symbols[b]
+            continue
+        elif kind == _KIND_LATEX_EXPRESSION:
+            delimitor = delimitors.get((a,b))
+            if delimitor is None:
+                delimitor = delimitors[(a,b)] = LatexDelimitor(symbols[a],symbols[b])
+            node = LatexExpression(delimitor)
+        elif kind == _KIND_LOGICAL_BLOCK:
+            node = LogicalBlock()
+        else:
+            raise ValueError(f"Unknown kind of node {kind} (record {i})")
+
+        # Attach the node to its parent:
+        if parent is None:
+            if root is not None:
+                raise ValueError(f"The serialized tree has more than one root (record {i})")
+            root = node
+        elif latex_tree:
+            parent.children.append((operators[kind_op >> 8],node))
+        else:
+            parent.children.append(node)
+
+        if kind == _KIND_LOGICAL_BLOCK or kind == _KIND_LATEX_EXPRESSION:
+            stack.append((parent,end))
+            parent, end = node, i+span
+
+    if root is None:
+        raise ValueError("The serialized tree is empty")
+
+    return root
+
+def _read_array(view:memoryview,offset:int,typecode:str,count:int):
+    """ Read an array of 32 bits integers from a memoryview.
+
+    On little-endian platforms, the returned object is a cast of the memoryview
+    given in argument, so no copy is done. On other platforms, the integers are
+    copied in an array and swapped.
+    """
+    end = offset + count*4
+    if end > len(view):
+        raise ValueError("The data to deserialize is truncated")
+    if _NATIVE_LITTLE_ENDIAN:
+        return view[offset:end].cast(typecode)
+    values = array(typecode,view[offset:end])
+    values.byteswap()
+    return values
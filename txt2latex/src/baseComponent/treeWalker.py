@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Iterative traversal of the components trees
+# ---------------------------------------------------------
+# ./src/baseComponent/treeWalker.py
+
+"""Set of functions for traversing the components trees.
+
+This module contains the functions used to traverse a tree of logical
+components (LogicalBlock, LogicalElement) or of LaTeX components
+(LatexExpression, LatexElement). All of them use an explicit stack instead
+of recursive calls, so they run with a constant Python stack depth whatever
+the depth of the tree is.
+
+The nodes of a tree are either inner nodes (LogicalBlock, LatexExpression),
+which have children, or leaves (LogicalElement, LatexElement). For a
+LatexExpression, only the expressions and elements are considered as
+children, the operators being attributes of the links between the nodes.
+"""
+
+# Import statement:
+# =================
+from typing import Callable, Iterator, Optional, Union
+
+# -*- COMMENT -*-
+#   The component modules import this module for their comparison and their
+# representation: the classes are read from the modules when the functions
+# are called, so the modules can be imported in any order.
+from . import latexComponent, logicalComponent
+
+
+# Type definition:
+# ================
+Node = Union['logicalComponent.LogicalBlock','logicalComponent.LogicalElement',
+             'latexComponent.LatexExpression','latexComponent.LatexElement']
+
+
+# Functions definitions:
+# ======================
+def children_of(node:Node) -> list[Node]:
+    """ Return the children of a node, or an empty list for a leaf. """
+    if isinstance(node,logicalComponent.LogicalBlock):
+        return node.children
+    if isinstance(node,latexComponent.LatexExpression):
+        return [child for _,child in node.children]
+    return []
+
+def walk(tree:Node, order:str="pre") -> Iterator[tuple[Node,int]]:
+    """ Iterate over the nodes of a tree.
+
+    Arguments:
+    tree : Node
+        The root of the tree to traverse.
+    order : str
+        'pre' to yield a node before its children, 'post' to yield it after.
+
+    Return:
+    Iterator[tuple[Node,int]]
+        The nodes with their depth (the root being at depth 0).
+
+    Raise:
+    ValueError : When the order isn't 'pre' or 'post'
+    """
+
+    if order not in ("pre","post"):
+        raise ValueError(f"The order must be 'pre' or 'post', instead I've received '{order}'")
+    post_order = order == "post"
+
+    stack = [(tree,0,False)]
+    while stack:
+        node, depth, expanded = stack.pop()
+        if expanded:
+            yield node, depth
+            continue
+
+        if post_order:
+            stack.append((node,depth,True))
+        else:
+            yield node, depth
+
+        children = children_of(node)
+        if children:
+            stack.extend((child,depth+1,False) for child in reversed(children))
+
+def visit(tree:Node, enter:Optional[Callable[[Node,int],Optional[bool]]]=None,
+          leave:Optional[Callable[[Node,int],None]]=None) -> None:
+    """ Traverse a tree and call the visitor callbacks on each node.
+
+    'enter' is called before the children of a node are visited. If it returns
+    False, the children of the node (and the 'leave' callback) are skipped.
+    'leave' is called after all the children of a node have been visited.
+
+    Arguments:
+    tree : Node
+        The root of the tree to traverse.
+    enter : Callable[[Node,int],bool|None] | None
+        The callback called with the node and its depth when entering it.
+    leave : Callable[[Node,int],None] | None
+        The callback called with the node and its depth when leaving it.
+    """
+
+    stack = [(tree,0,False)]
+    while stack:
+        node, depth, expanded = stack.pop()
+        if expanded:
+            leave(node,depth)
+            continue
+
+        if enter is not None and enter(node,depth) is False:
+            continue
+        if leave is not None:
+            stack.append((node,depth,True))
+
+        children = children_of(node)
+        if children:
+            stack.extend((child,depth+1,False) for child in reversed(children))
+
+def count_nodes(tree:Node) -> int:
+    """ Return the number of nodes (inner nodes and leaves) of a tree. """
+    count = 0
+    stack = [tree]
+    while stack:
+        count += 1
+        stack.extend(children_of(stack.pop()))
+    return count
+
+def tree_depth(tree:Node) -> int:
+    """ Return the number of levels of a tree (1 for a tree without children). """
+    return max(depth for _,depth in walk(tree)) + 1
+
+def trees_equal(tree1:Node, tree2:Node) -> bool:
+    """ Compare two trees node by node.
+
+    Two inner nodes are equal if they are of the same kind, have the same
+    number of children and, for LaTeX expressions, the same delimitor and
+    the same operators. Leaves are compared with their own '__eq__'.
+    """
+
+    stack = [(tree1,tree2)]
+    while stack:
+        node1, node2 = stack.pop()
+        if node1 is node2:
+            continue
+
+        if isinstance(node1,logicalComponent.LogicalBlock):
+            if not isinstance(node2,logicalComponent.LogicalBlock) or len(node1.children) != len(node2.children):
+                return False
+            stack.extend(zip(node1.children,node2.children))
+
+        elif isinstance(node1,latexComponent.LatexExpression):
+            if not isinstance(node2,latexComponent.LatexExpression) or len(node1.children) != len(node2.children):
+                return False
+            if node1.delimitor != node2.delimitor:
+                return False
+            for (operator1,child1),(operator2,child2) in zip(node1.children,node2.children):
+                if operator1 != operator2:
+                    return False
+                stack.append((child1,child2))
+
+        elif node1 != node2:
+            return False
+
+    return True
+
+def dump(tree:Node) -> str:
+    """ Return the debug representation of a tree.
+
+    A LogicalBlock is dumped as 'Block( <children> )' and a LatexExpression
+    as 'LatexExpression:[d<delimitor>]::(<n>)[(<operator>, <child>), ...]'.
+    """
+
+    parts = list()
+    stack:list[Union[str,Node]] = [tree]
+    while stack:
+        item = stack.pop()
+
+        if isinstance(item,str):
+            parts.append(item)
+
+        elif isinstance(item,logicalComponent.LogicalBlock):
+            stack.append(" )")
+            stack.extend(reversed(item.children))
+            stack.append("Block( ")
+
+        elif isinstance(item,latexComponent.LatexExpression):
+            stack.append("]")
+            for idx in range(len(item.children)-1,-1,-1):
+                operator, child = item.children[idx]
+                stack.append(")")
+                stack.append(child)
+                stack.append(f"({operator!r}, ")
+                if idx:
+                    stack.append(", ")
+            stack.append(f"LatexExpression:[d{item.delimitor!r}]::({len(item.children)})[")
+
+        elif isinstance(item,latexComponent.LatexElement):
+            parts.append(repr(item))
+
+        else:
+            parts.append(str(item))
+
+    return "".join(parts)
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# 
+# ---------------------------------------------------------
+# ./src/batch/__init__.py
+
+from .journal import BatchJournal, Checkpoint
+from .reader import read_batch, read_batch_offsets
+from .tex_document import TexDocumentWriter
\ No newline at end of file
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Journal of the progress of a LaTeX document
+# ---------------------------------------------------------
+# ./src/batch/journal.py
+
+""" A class journaling the progress of the writing of a LaTeX document.
+
+This module contains the journal of a batch translated in a LaTeX document,
+written next to the document. Each line of the journal is a checkpoint: the
+offset in the batch file of the expressions translated, the size of the
+document they were written in and the state of the document (the number of
+equations written and failed, the id of the last one). A run stopped before
+its end can be resumed from the last checkpoint, the document being truncated
+to its size at this checkpoint.
+
+The journal is only appended to, a line being written at once after the
+document is flushed to the disk: a line cut by a crash is ignored, and the
+last complete line always describes a written part of the document.
+"""
+
+# Import statement:
+# =================
+import os
+from typing import Optional
+
+
+# Constant definition:
+# ====================
+JOURNAL_SUFFIX = ".journal"
+# The number of expressions written between two checkpoints:
+CHECKPOINT_SIZE = 1 << 10
+_FIELDS = 7
+
+
+# Class definition:
+# =================
+class Checkpoint():
+    """ Checkpoint class
+
+    An instance of this class is a line of a journal: the byte offset in the
+    batch file following the last expression written ('input_offset'), the
+    size of the document in bytes ('output_offset'), the number of expressions
+    read, written and failed, whether an 'align' row is left open and the id
+    of the last expression. A checkpoint is 'complete' when the document is
+    finished.
+    """
+
+    __slots__ = ("input_offset","output_offset","records","written","failed","open_row","identifier","complete")
+
+    def __init__(self, input_offset:int, output_offset:int, records:int, written:int, failed:int,
+                 open_row:bool=False, identifier:Optional[str]=None, complete:bool=False) -> None:
+        self.input_offset = input_offset
+        self.output_offset = output_offset
+        self.records = records
+        self.written = written
+        self.failed = failed
+        self.open_row = open_row
+        self.identifier = identifier
+        self.complete = complete
+
+    def __repr__(self) -> str:
+        return (f"Checkpoint(input_offset={self.input_offset}, output_offset={self.output_offset}, "
+                f"records={self.records}, complete={self.complete})")
+
+    def format(self) -> str:
+        """ Return the line of the checkpoint in a journal (tab separated). """
+        return (f"{self.input_offset}\t{self.output_offset}\t{self.records}\t{self.written}\t{self.failed}\t"
+                f"{int(self.open_row)}{int(self.complete)}\t{self.identifier or ''}\n")
+
+    @classmethod
+    def parse(cls, line:str) -> Optional['Checkpoint']:
+        """ Parse a line of a journal, None when it isn't a complete checkpoint. """
+
+        fields = line.split("\t")
+        if not line.endswith("\n") or len(fields) != _FIELDS:
+            return None
+        try:
+            input_offset, output_offset, records, written, failed = map(int,fields[:5])
+        except ValueError:
+            return None
+        flags, identifier = fields[5], fields[6].rstrip("\n")
+        if flags not in ("00","01","10","11"):
+            return None
+        return cls(input_offset,output_offset,records,written,failed,
+                   flags[0] == "1",identifier or None,flags[1] == "1")
+
+
+class BatchJournal():
+    """ BatchJournal class
+
+    An instance of this class reads and appends the checkpoints of a journal.
+    The checkpoints are appended by 'record', between 'open' and 'close'.
+    """
+
+    def __init__(self, path:str) -> None:
+        """ Constructor of BatchJournal """
+
+        # Type Check:
+        # -----------
+        if not isinstance(path,str):
+            raise TypeError(f"The path of the journal must be a string, instead I've received a '{type(path)}'")
+
+        self.path = path
+        self._file = None
+
+    @classmethod
+    def of_document(cls, path:str) -> 'BatchJournal':
+        """ Return the journal of a document, next to it. """
+        return cls(path + JOURNAL_SUFFIX)
+
+    def last(self) -> Optional[Checkpoint]:
+        """ Return the last complete checkpoint of the journal, None when there is none. """
+
+        if not os.path.exists(self.path):
+            return None
+        checkpoint = None
+        with open(self.path,encoding="utf-8",newline="") as file:
+            for line in file:
+                checkpoint = Checkpoint.parse(line) or checkpoint
+        return checkpoint
+
+    def open(self, resume:bool=False) -> None:
+        """ Open the journal, emptied unless the run is resumed. """
+
+        # A line cut by a crash is ended, for the next checkpoint to be on its own line:
+        cut = False
+        if resume and os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path,"rb") as file:
+                file.seek(-1,os.SEEK_END)
+                cut = file.read(1) != b"\n"
+        self._file = open(self.path,"a" if resume else "w",encoding="utf-8",newline="")
+        if cut:
+            self._file.write("\n")
+
+    def record(self, checkpoint:Checkpoint) -> None:
+        """ Append a checkpoint, the part of the document it describes being already on the disk. """
+        self._file.write(checkpoint.format())
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Reading of a batch of expressions
+# ---------------------------------------------------------
+# ./src/batch/reader.py
+
+""" A function reading a batch of expressions to translate.
+
+This module contains a function that reads a batch file, containing one
+expression per line. A line can start with the id of its expression,
+separated from it by a tab (the id is used, for instance, for the labels
+of the equations of a document):
+
+    energy<TAB>p^2/(2*m) + V
+    p^2 - omega^2
+
+The empty lines are skipped. The expressions can also be read with the
+byte offset in the file following each of them, for resuming the reading
+after an expression (see 'read_batch_offsets').
+"""
+
+# Import statement:
+# =================
+import contextlib
+import os
+import sys
+from typing import Iterator, Optional
+
+
+# Function definition:
+# ====================
+def read_batch(path:str) -> Iterator[tuple[Optional[str],str]]:
+    """ Read the expressions of a batch file.
+
+    The file is read line by line, while the expressions are consumed.
+
+    Arguments:
+    path : str
+        The path of the batch file, '-' for the standard input.
+
+    Return:
+    Iterator[tuple[str|None,str]]
+        The id (None when the line has none) and the expression of each line.
+
+    Raise:
+    TypeError : When the argument isn't of the correct type
+    """
+
+    # Type Check:
+    # -----------
+    if not isinstance(path,str):
+        raise TypeError(f"The path of the batch must be a string, instead I've received a '{type(path)}'")
+
+    with (contextlib.nullcontext(sys.stdin) if path == '-' else open(path,encoding="utf-8")) as file:
+        for line in file:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            if '\t' in line:
+                identifier, expression = line.split('\t',1)
+                yield identifier.strip() or None, expression
+            else:
+                yield None, line
+
+def read_batch_offsets(path:str, offset:int=0) -> Iterator[tuple[Optional[str],str,int]]:
+    """ Read the expressions of a batch file with their offset, from a byte offset.
+
+    Arguments:
+    path : str
+        The path of the batch file (the standard input can't be read from an offset).
+    offset : int
+        The byte offset of the first line to read, following an expression.
+
+    Return:
+    Iterator[tuple[str|None,str,int]]
+        The id, the expression and the byte offset of the line following each line.
+
+    Raise:
+    TypeError : When the argument isn't of the correct type
+    ValueError : When the offset is outside of the file
+    """
+
+    # Type Check:
+    # -----------
+    if not isinstance(path,str) or path == '-':
+        raise TypeError(f"The path of the batch must be the path of a file, instead I've received '{path}'")
+    if not isinstance(offset,int) or not 0 <= offset <= os.path.getsize(path):
+        raise ValueError(f"The offset must be in the batch file, instead I've received '{offset}'")
+
+    # -*- COMMENT -*-
+    #   The file is read in binary, its lines being decoded one by one: the
+    # offset of a line is the sum of the sizes of the lines before it.
+    with open(path,"rb") as file:
+        file.seek(offset)
+        for raw_line in file:
+            offset += len(raw_line)
+            line = raw_line.decode("utf-8").rstrip("\r\n")
+            if not line.strip():
+                continue
+            if '\t' in line:
+                identifier, expression = line.split('\t',1)
+                yield identifier.strip() or None, expression, offset
+            else:
+                yield None, line, offset
\ No newline at end of file
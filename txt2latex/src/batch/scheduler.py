@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Scheduling of the translations of a batch
+# ---------------------------------------------------------
+# ./src/batch/scheduler.py
+
+""" Functions estimating the cost of the expressions of a batch and scheduling them.
+
+This module contains the cost model of the translation of an expression,
+estimated by a single scan of the expression from its length, its number
+of parentheses and its maximal nesting depth, and the scheduler grouping
+the expressions of a batch in tasks for a process pool:
+- the expensive expressions are tasks of their own
+- the others are grouped in tasks of similar estimated cost
+- the tasks are dispatched the most expensive first, so a large expression
+  doesn't wait behind many small ones, and the estimated cost of the tasks
+  is balanced between the workers (each worker taking the next task when
+  it is free)
+"""
+
+# Import statement:
+# =================
+import re
+from itertools import accumulate
+from typing import Optional
+
+
+# Constant definition:
+# ====================
+# -*- COMMENT -*-
+#   The weights of the cost model, in microseconds: for each expression, each
+# caracter, each parenthesis and each nesting level. They are fitted on the
+# translation of random expressions, and can be tuned with the report of the
+# estimated and actual times of a batch (see TexDocumentWriter).
+COST_WEIGHTS = (30.0, 0.5, 40.0, 5.0)
+# The number of expressions scheduled at once, and the number of tasks of each worker:
+WINDOW_SIZE = 1 << 12
+TASKS_PER_WORKER = 4
+# The minimal estimated cost of a task, in microseconds (the cost of sending it to a worker):
+MIN_TASK_COST = 5000.0
+# The columns of the report of the estimated and actual times (tab separated):
+COST_REPORT_HEADER = "index\tid\tlength\tparentheses\tdepth\testimated (s)\tactual (s)\n"
+_PARENTHESIS = re.compile(r"[()]")
+_DEPTH_STEPS = {'(':1, ')':-1}
+
+
+# Class definition:
+# =================
+class ExpressionCost():
+    """ ExpressionCost class
+
+    An instance of this class holds the measures of an expression, and the
+    estimated cost of its translation in microseconds.
+    """
+
+    __slots__ = ("length","parentheses","depth","cost")
+
+    def __init__(self, length:int, parentheses:int, depth:int, cost:float) -> None:
+        self.length = length
+        self.parentheses = parentheses
+        self.depth = depth
+        self.cost = cost
+
+    def __repr__(self) -> str:
+        return f"ExpressionCost(length={self.length}, parentheses={self.parentheses}, depth={self.depth}, cost={self.cost})"
+
+
+# Function definition:
+# ====================
+def estimate_cost(expr:str, weights:tuple[float,float,float,float]=COST_WEIGHTS) -> ExpressionCost:
+    """ Estimate the cost of the translation of an expression.
+
+    The parentheses are found and their depth accumulated in C (by the 're' module
+    and 'itertools'): the scan costs a small fraction of the translation.
+
+    Arguments:
+    expr : str
+        The expression to translate.
+    weights : tuple[float,float,float,float]
+        The cost of an expression, of a caracter, of a parenthesis and of a
+        nesting level, in microseconds.
+
+    Return:
+    ExpressionCost
+        The measures and the estimated cost of the expression.
+
+    Raise:
+    TypeError : When the argument isn't of the correct type
+    """
+
+    # Type Check:
+    # -----------
+    if not isinstance(expr,str):
+        raise TypeError(f"The expression to estimate must be a string, instead I've received a '{type(expr)}'")
+
+    parentheses = expr.count('(')
+    depth = max(0,max(accumulate(map(_DEPTH_STEPS.__getitem__,_PARENTHESIS.findall(expr))),default=0))
+    base, per_caracter, per_parenthesis, per_level = weights
+    return ExpressionCost(len(expr),parentheses,depth,
+                          base + per_caracter*len(expr) + per_parenthesis*parentheses + per_level*depth)
+
+def schedule(costs:list[float], workers:int, min_task_cost:float=MIN_TASK_COST) -> list[tuple[float,list[int]]]:
+    """ Group the expressions of a window in tasks, the most expensive task first.
+
+    The expressions whose cost is at least the target cost of a task (a fraction
+    of the cost of the window without its most expensive expressions, and at
+    least 'min_task_cost') are tasks of their own. The others are grouped, in
+    their order, in tasks of about the target cost.
+
+    Arguments:
+    costs : list[float]
+        The estimated cost of each expression of the window.
+    workers : int
+        The number of workers translating the tasks.
+    min_task_cost : float
+        The minimal estimated cost of a task of several expressions.
+
+    Return:
+    list[tuple[float,list[int]]]
+        The estimated cost and the indexes of the expressions of each task, by
+        decreasing cost.
+    """
+
+    # The target cost of the groups is the one of the expressions left by the expensive ones:
+    tasks_count, total = TASKS_PER_WORKER*max(workers,1), sum(costs)
+    target = max(total / tasks_count,min_task_cost)
+    target = max((total - sum(cost for cost in costs if cost >= target)) / tasks_count,min_task_cost)
+    tasks:list[tuple[float,list[int]]] = list()
+    group:list[int] = list()
+    group_cost = 0.0
+    for index, cost in enumerate(costs):
+        if cost >= target:
+            tasks.append((cost,[index]))
+            continue
+        group.append(index)
+        group_cost += cost
+        if group_cost >= target:
+            tasks.append((group_cost,group))
+            group, group_cost = list(), 0.0
+    if group:
+        tasks.append((group_cost,group))
+
+    tasks.sort(key=lambda task: task[0],reverse=True)
+    return tasks
+
+def format_cost_report(index:int, identifier:Optional[str], cost:ExpressionCost, seconds:float) -> str:
+    """ Format the line of an expression in the report of the estimated and actual times of a batch. """
+    return f"{index}\t{identifier or ''}\t{cost.length}\t{cost.parentheses}\t{cost.depth}\t{cost.cost*1e-6:.6g}\t{seconds:.6g}\n"
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Writing of a LaTeX document of equations
+# ---------------------------------------------------------
+# ./src/batch/tex_document.py
+
+""" A class writing a batch of translated expressions in a LaTeX document.
+
+This module contains a class that translates a batch of expressions and
+streams them in a complete LaTeX document, each expression being an
+equation labelled with its id:
+- 'equation': each expression is in its own 'equation' environment
+- 'align': the expressions are the rows of a single 'align' environment
+
+The expressions longer than a row can be broken in the rows of a 'split'
+environment (in the equation, or the row of the 'align' environment), or
+of a 'multline' environment replacing the 'equation' one.
+
+The expressions are translated in a process pool, by windows of the input:
+the expressions of a window are grouped in tasks of similar estimated cost,
+dispatched the most expensive first (see scheduler), and the window is
+written in the order of the input as soon as it is translated.
+"""
+
+# Import statement:
+# =================
+import collections
+import contextlib
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+from py_utils import Logueur
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.baseComponent import latexComponent
+from txt2latex.src.parsers import ResourceLimits
+from txt2latex.src.renderers import LineBreakRenderer, TemplateCache
+from txt2latex.src.renderers.line_breaker import LINE_ENVIRONMENTS, LINE_WIDTH, ROW_BREAK
+from txt2latex.src.translator import Translator
+from .journal import BatchJournal, Checkpoint, CHECKPOINT_SIZE
+from .scheduler import ExpressionCost, estimate_cost, schedule, format_cost_report, WINDOW_SIZE, COST_REPORT_HEADER
+
+
+# Constant definition:
+# ====================
+ENVIRONMENTS = ("equation", "align")
+BATCH_SIZE = 64
+BUFFER_SIZE = 1 << 20
+_LABEL_FORBIDDEN = re.compile(r"[^A-Za-z0-9:._+-]")
+
+
+# Worker definition:
+# ==================
+# -*- COMMENT -*-
+#   The translator of a worker is built once, when the worker starts. The
+# errors of the translations are sent back as messages, so an invalid
+# expression doesn't stop the document.
+_worker_translator:Optional[Translator] = None
+
+def _init_worker(log_level:int, functions:Optional[dict[str,latexComponent.LatexDelimitor]], normalize:bool,
+                 limits:Optional[ResourceLimits]=None, fallback:bool=False, templates:bool=False,
+                 line_break:Optional[str]=None, line_width:int=LINE_WIDTH) -> None:
+    global _worker_translator
+    log = ConsoleLogueurFactory(LogLevel(log_level))
+    _worker_translator = Translator(log,functions,normalize=normalize,limits=limits,fallback=fallback,
+                                    renderer=LineBreakRenderer(log,line_width,line_break) if line_break else None,
+                                    templates=TemplateCache() if templates else None)
+
+def _translate_batch(expressions:list[str], translator:Optional[Translator]=None) -> list[tuple[bool,str,float]]:
+    """ Translate a batch of expressions, returning for each one whether it succeeded, its translation or error and its time. """
+    translator = translator or _worker_translator
+    results = list()
+    for expression in expressions:
+        start = time.perf_counter()
+        try:
+            f_expr = translator.translate(expression)
+        except (RuntimeError,ValueError) as error:
+            results.append((False,str(error),time.perf_counter() - start))
+        else:
+            results.append((True,f_expr,time.perf_counter() - start))
+    return results
+
+
+# Class definition:
+# =================
+class TexDocumentWriter():
+    """ TexDocumentWriter class
+
+    An instance of this class writes a batch of expressions in a LaTeX
+    document. Some configuration is possible when constructing an instance:
+    - environment: the environment of the equations, 'equation' or 'align'
+    - workers: the number of processes translating the expressions, the
+      number of CPUs by default (with one worker, the expressions are
+      translated in the main process)
+    - functions, normalize, limits, fallback: the options of the translators
+    - templates: if True, each translator renders the expressions of the
+      shapes it has already translated with a TemplateCache
+    - line_break: the environment of the rows of the expressions longer than
+      'line_width' caracters, 'split' or 'multline' (see LineBreakRenderer),
+      None for writing each expression on a single line
+    - cost_report: the path of a report of the estimated cost (see
+      scheduler) and of the actual time of the translation of each
+      expression, for tuning the cost model (tab separated)
+
+    The expressions that can't be translated are written as a comment, and
+    counted in the 'failed' attribute after 'write'.
+    """
+
+    def __init__(self, log:Logueur, environment:str="equation", workers:Optional[int]=None,
+                 functions:Optional[dict[str,latexComponent.LatexDelimitor]]=None,
+                 normalize:bool=False, log_level:int=1, limits:Optional[ResourceLimits]=None,
+                 fallback:bool=False, templates:bool=False, line_break:Optional[str]=None,
+                 line_width:int=LINE_WIDTH, cost_report:Optional[str]=None) -> None:
+        """ Constructor of TexDocumentWriter """
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if environment not in ENVIRONMENTS:
+            raise ValueError(f"The environment must be one of {ENVIRONMENTS}, instead I've received '{environment}'")
+        if workers is not None and (not isinstance(workers,int) or workers < 1):
+            raise ValueError(f"The number of workers must be a positive int, instead I've received '{workers}'")
+        if line_break is not None and line_break not in LINE_ENVIRONMENTS:
+            raise ValueError(f"The line break must be one of {LINE_ENVIRONMENTS}, instead I've received '{line_break}'")
+        if line_break == "multline" and environment == "align":
+            raise ValueError("The 'multline' line break can't be used in an 'align' environment")
+        if line_break is not None and templates:
+            raise ValueError("The template cache can't be used with a line break")
+        if not isinstance(line_width,int) or line_width < 1:
+            raise ValueError(f"The line width must be a positive int, instead I've received '{line_width}'")
+        if cost_report is not None and not isinstance(cost_report,str):
+            raise TypeError(f"The path of the cost report must be a string, instead I've received a '{type(cost_report)}'")
+
+        # Initialize instance:
+        # --------------------
+        self.log = log
+        self.environment = environment
+        self.workers = workers or os.cpu_count() or 1
+        self.functions = functions
+        self.normalize = normalize
+        self.log_level = log_level
+        self.limits = limits
+        self.fallback = fallback
+        self.templates = templates
+        self.line_break = line_break
+        self.line_width = line_width
+        self.cost_report = cost_report
+        self.written = 0
+        self.failed = 0
+
+    # Formatting:
+    # -----------
+    def preamble(self) -> str:
+        lines = [r"\documentclass{article}", r"\usepackage{amsmath}"]
+        if self.environment == "align":
+            lines.append(r"\allowdisplaybreaks")
+        lines.append(r"\begin{document}")
+        if self.environment == "align":
+            lines.append(r"\begin{align}")
+        return "\n".join(lines) + "\n"
+    def ending(self) -> str:
+        return (r"\end{align}" + "\n" if self.environment == "align" else "") + r"\end{document}" + "\n"
+
+    def format_equation(self, identifier:Optional[str], f_expr:str) -> str:
+        """ Format a translated expression in the environment of the instance, labelled with its id.
+
+        The rows of an 'align' environment are returned without their line break,
+        which is only written between two rows. An expression broken in rows (see
+        'line_break') is in a 'split' environment, or in its own 'multline' one.
+        """
+
+        label = f"\\label{{eq:{_LABEL_FORBIDDEN.sub('-',identifier)}}}" if identifier else ""
+        f_expr = f_expr.strip()
+        if self.line_break and ROW_BREAK in f_expr:
+            f_expr = f_expr.replace("\n","\n  ")
+            if self.line_break == "multline":
+                return f"\\begin{{multline}}{label}\n  {f_expr}\n\\end{{multline}}\n"
+            f_expr = f"\\begin{{split}}\n  {f_expr}\n\\end{{split}}"
+        if self.environment == "align":
+            return f"  &{f_expr} {label}".rstrip()
+        return f"\\begin{{equation}}{label}\n  {f_expr}\n\\end{{equation}}\n"
+    def format_error(self, identifier:Optional[str], index:int, message:str) -> str:
+        name = f"'{identifier}'" if identifier else f"number {index}"
+        return f"% Impossible to translate the expression {name}: " + message.replace("\n"," ") + "\n"
+
+    # Translation:
+    # ------------
+    def _windows(self, equations:Iterable[tuple[Optional[str],str]], size:int) \
+                 -> Iterator[list[tuple[Optional[str],str]]]:
+        window = list()
+        for equation in equations:
+            window.append(equation)
+            if len(window) == size:
+                yield window
+                window = list()
+        if window:
+            yield window
+
+    def _translations(self, equations:Iterable[tuple[Optional[str],str]]) \
+                        -> Iterator[tuple[tuple[Optional[str],str],Optional[ExpressionCost],tuple[bool,str,float]]]:
+        """ Translate the equations, yielding them in their order with their estimated cost and their result.
+
+        The equations are yielded as given (with their offset, when they are read
+        with 'read_batch_offsets'). The cost is only estimated for scheduling the equations on several workers,
+        or for the cost report (else it is None).
+        """
+
+        if self.workers == 1:
+            renderer = LineBreakRenderer(self.log,self.line_width,self.line_break) if self.line_break else None
+            translator = Translator(self.log,self.functions,normalize=self.normalize,
+                                    limits=self.limits,fallback=self.fallback,renderer=renderer,
+                                    templates=TemplateCache() if self.templates else None)
+            for window in self._windows(equations,BATCH_SIZE):
+                expressions = [equation[1] for equation in window]
+                costs = [estimate_cost(expression) if self.cost_report else None for expression in expressions]
+                yield from zip(window,costs,_translate_batch(expressions,translator))
+            return
+
+        # -*- COMMENT -*-
+        #   The tasks of a window are submitted the most expensive first, and the
+        # next window is submitted before the results of the previous one are
+        # written: the workers don't wait for the input, while at most two windows
+        # are in memory.
+        self.log.info(f"Starting translating the equations on {self.workers} processes")
+        with ProcessPoolExecutor(self.workers,mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(self.log_level,self.functions,self.normalize,
+                                           self.limits,self.fallback,self.templates,
+                                           self.line_break,self.line_width)) as executor:
+            pending = collections.deque()
+            try:
+                for window in self._windows(equations,WINDOW_SIZE):
+                    costs = [estimate_cost(equation[1]) for equation in window]
+                    tasks = [(indexes,executor.submit(_translate_batch,[window[index][1] for index in indexes]))
+                             for _, indexes in schedule([cost.cost for cost in costs],self.workers)]
+                    pending.append((window,costs,tasks))
+                    if len(pending) >= 2:
+                        yield from self._window_results(*pending.popleft())
+                while pending:
+                    yield from self._window_results(*pending.popleft())
+            finally:
+                for _, _, tasks in pending:
+                    for _, future in tasks:
+                        future.cancel()
+
+    def _window_results(self, window:list[tuple[Optional[str],str]], costs:list[ExpressionCost],
+                        tasks:list[tuple[list[int],Future]]) \
+                        -> Iterator[tuple[tuple[Optional[str],str],ExpressionCost,tuple[bool,str,float]]]:
+        """ Wait for the tasks of a window, yielding its equations in their order. """
+        results:list = [None] * len(window)
+        for indexes, future in tasks:
+            for index, result in zip(indexes,future.result()):
+                results[index] = result
+        yield from zip(window,costs,results)
+
+    def _checkpoint(self, document, journal:BatchJournal, equation:tuple, records:int,
+                    open_row:bool, complete:bool=False) -> None:
+        """ Flush the document to the disk, and record the checkpoint of the equations written. """
+        document.flush()
+        os.fsync(document.fileno())
+        journal.record(Checkpoint(equation[2],document.tell(),records,self.written,self.failed,
+                                  open_row,equation[0],complete))
+
+    def write(self, equations:Iterable[tuple[Optional[str],str]], path:str,
+              journal:Optional[BatchJournal]=None, checkpoint:Optional[Checkpoint]=None) -> int:
+        """ Translate a batch of expressions and write them in a LaTeX document.
+
+        With a journal, a checkpoint is recorded every CHECKPOINT_SIZE equations
+        and at the end of the document: the equations must then be read with
+        their offset in the batch file ('read_batch_offsets'). A run is resumed
+        from a checkpoint of its journal, the equations starting at the offset of
+        the checkpoint: the document is truncated to its size at the checkpoint,
+        and the next equations are appended to it.
+
+        Arguments:
+        equations : Iterable[tuple[str|None,str]]
+            The id (or None) and the expression of each equation (e.g. from 'read_batch'),
+            followed by the offset of the equation with a journal.
+        path : str
+            The path of the document to write.
+        journal : BatchJournal | None
+            The journal of the document (e.g. 'BatchJournal.of_document(path)').
+        checkpoint : Checkpoint | None
+            The checkpoint from which the run is resumed (e.g. 'journal.last()').
+
+        Return:
+        int
+            The number of equations written.
+
+        Raise:
+        TypeError : When the path isn't of the correct type
+        ValueError : When the document is shorter than the checkpoint, or the equations
+            have no offset
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(path,str):
+            raise TypeError(f"The path of the document must be a string, instead I've received a '{type(path)}'")
+        if checkpoint is not None and (not os.path.exists(path) or os.path.getsize(path) < checkpoint.output_offset):
+            raise ValueError(f"The document {path} is shorter than the checkpoint, it can't be resumed")
+
+        # Resume the document:
+        # --------------------
+        self.written, self.failed = 0, 0
+        align, open_row = self.environment == "align", False
+        start = 0
+        if checkpoint is not None:
+            self.written, self.failed = checkpoint.written, checkpoint.failed
+            open_row, start = checkpoint.open_row, checkpoint.records
+            if checkpoint.complete:
+                self.log.info(f"The document {path} is already complete ({self.written} equations)")
+                return self.written
+            self.log.info(f"Resuming the document {path} after {start} expressions (at {checkpoint.identifier or start})")
+
+        # Write the document:
+        # -------------------
+        # -*- COMMENT -*-
+        #   The document is written through a large buffer. An 'align' row is
+        # left open until the next one, the line break separating two rows (a
+        # comment in between ends the line of the previous row). The journal is
+        # appended after the document is flushed to the disk, every CHECKPOINT_SIZE
+        # equations: a crash loses at most the equations since the last checkpoint.
+        estimated, actual = 0.0, 0.0
+        equation = (None,"",checkpoint.input_offset) if checkpoint is not None else None
+        with open(path,"r+" if checkpoint else "w",encoding="utf-8",buffering=BUFFER_SIZE) as document, \
+             (open(self.cost_report,"a" if checkpoint else "w",encoding="utf-8",buffering=BUFFER_SIZE)
+              if self.cost_report else contextlib.nullcontext()) as report:
+            if journal is not None:
+                journal.open(resume=checkpoint is not None)
+            try:
+                if checkpoint is not None:
+                    document.seek(checkpoint.output_offset)
+                    document.truncate()
+                else:
+                    document.write(self.preamble())
+                    if report is not None:
+                        report.write(COST_REPORT_HEADER)
+                for index, (equation, cost, (success, result, seconds)) in enumerate(self._translations(equations),start):
+                    identifier = equation[0]
+                    if report is not None:
+                        report.write(format_cost_report(index,identifier,cost,seconds))
+                        estimated, actual = estimated + cost.cost*1e-6, actual + seconds
+                    if success:
+                        if align and self.written:
+                            document.write(" \\\\\n" if open_row else "\\\\\n")
+                        document.write(self.format_equation(identifier,result))
+                        self.written += 1
+                        open_row = align
+                    else:
+                        self.log.error(f"Impossible to translate the expression {identifier or index}: {result}")
+                        document.write(("\n" if open_row else "") + self.format_error(identifier,index,result))
+                        self.failed += 1
+                        open_row = False
+                    if journal is not None:
+                        if len(equation) < 3:
+                            raise ValueError("The equations written with a journal must have their offset")
+                        if (index + 1) % CHECKPOINT_SIZE == 0:
+                            self._checkpoint(document,journal,equation,index + 1,open_row)
+                document.write(("\n" if open_row else "") + self.ending())
+                if journal is not None and equation is not None:
+                    self._checkpoint(document,journal,equation,self.written + self.failed,False,complete=True)
+            finally:
+                if journal is not None:
+                    journal.close()
+
+        self.log.info(f"{self.written} equations written to {path} ({self.failed} failed)")
+        if self.cost_report:
+            self.log.info(f"Cost report written to {self.cost_report}: {estimated:.3f} s estimated, {actual:.3f} s measured")
+        return self.written
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# 
+# ---------------------------------------------------------
+# ./src/instrumentation/__init__.py
+
+from .memory_report import MemoryReport
+from .profiler import StageTimer, SamplingProfiler, ProfileReport, profile_translations
+from .metrics import MetricsRegistry, METRICS, stats
\ No newline at end of file
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Report of the memory allocated by a translation
+# ---------------------------------------------------------
+# ./src/instrumentation/memory_report.py
+
+""" A class for reporting the memory allocated by each stage of a translation.
+
+This module contains a class observing the stages of a translation with
+'tracemalloc'. For each stage, it reports the peak and retained memory,
+the sites that allocated the most and the number of components built.
+"""
+
+# Import statement:
+# =================
+import json
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator
+
+from txt2latex.src.baseComponent import latexComponent, logicalComponent, treeWalker
+
+
+# Functions definitions:
+# ======================
+def _count_components(result) -> dict[str,int]:
+    """ Count the components of the result of a stage, by class.
+
+    The nodes of a tree are counted once each, the operators and delimitors
+    once for each distinct instance. A string result is counted as its size.
+    """
+
+    if isinstance(result,str):
+        return {"str (bytes)": len(result.encode("utf-8"))}
+    if not isinstance(result,(logicalComponent.LogicalBlock,latexComponent.LatexExpression)):
+        return {}
+
+    counts:dict[str,int] = dict()
+    shared:dict[int,object] = dict()
+    for node,_ in treeWalker.walk(result):
+        name = type(node).__name__
+        counts[name] = counts.get(name,0) + 1
+        if isinstance(node,latexComponent.LatexExpression):
+            shared[id(node.delimitor)] = node.delimitor
+            for operator,_ in node.children:
+                shared[id(operator)] = operator
+
+    for component in shared.values():
+        name = type(component).__name__
+        counts[name] = counts.get(name,0) + 1
+    return counts
+
+def _format_size(size:int) -> str:
+    """ Format a number of bytes in a human-readable way. """
+    for unit in ("B","KiB","MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+# Class definition:
+# =================
+class MemoryReport():
+    """ MemoryReport class
+
+    An instance of this class observes the stages of a translation (see
+    Translator) and records, for each of them:
+    - peak: the peak of memory allocated during the stage, in bytes
+    - retained: the memory still allocated at the end of the stage, in bytes
+    - top_sites: the lines of code that allocated the most memory
+    - components: the number of components of the result, by class
+
+    The report can be formatted as a human-readable table with 'str', or
+    as JSON with 'to_json'.
+    """
+
+    def __init__(self, input_size:int=0, top:int=10) -> None:
+        """ Constructor of MemoryReport """
+
+        # Type Check:
+        # -----------
+        if not isinstance(top,int) or top < 0:
+            raise ValueError(f"The number of top sites must be a positive int, instead I've received '{top}'")
+
+        self.input_size = input_size
+        self.top = top
+        self.stages:dict[str,dict] = dict()
+        self._filters = (tracemalloc.Filter(False,tracemalloc.__file__),
+                         tracemalloc.Filter(False,__file__))
+
+    @contextmanager
+    def translation(self) -> Iterator[None]:
+        """ Trace the memory allocations during a whole translation. """
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name:str) -> Iterator[dict]:
+        """ Trace the memory allocations during a stage of a translation. """
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+
+        # -*- COMMENT -*-
+        #   The snapshot is taken before resetting the peak, so the memory used
+        # by the snapshot itself isn't counted in the stage.
+        info:dict = dict()
+        before = tracemalloc.take_snapshot().filter_traces(self._filters)
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        try:
+            yield info
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(self._filters)
+            if started:
+                tracemalloc.stop()
+
+            top_sites = list()
+            for stat in after.compare_to(before,"lineno")[:self.top]:
+                frame = stat.traceback[0]
+                top_sites.append({"site": f"{frame.filename}:{frame.lineno}",
+                                  "size": stat.size_diff, "count": stat.count_diff})
+
+            self.stages[name] = {
+                "peak": peak - start,
+                "retained": current - start,
+                "top_sites": top_sites,
+                "components": _count_components(info.get("result")),
+            }
+
+    def to_dict(self) -> dict:
+        return {"input_size": self.input_size, "stages": self.stages}
+    def to_json(self, indent:int=2) -> str:
+        return json.dumps(self.to_dict(),indent=indent)
+
+    def __str__(self) -> str:
+        lines = [f"Memory report (input of {_format_size(self.input_size)})"]
+        for name, stage in self.stages.items():
+            lines.append(f"- {name}: peak {_format_size(stage['peak'])}, retained {_format_size(stage['retained'])}")
+            if stage["components"]:
+                counts = ", ".join(f"{component}: {count}" for component,count in stage["components"].items())
+                lines.append(f"    components: {counts}")
+            for site in stage["top_sites"]:
+                lines.append(f"    {_format_size(site['size']):>10} in {site['count']:>7} blocks  {site['site']}")
+        return "\n".join(lines)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Runtime metrics of the translations
+# ---------------------------------------------------------
+# ./src/instrumentation/metrics.py
+
+""" A registry of the metrics of the translations of a process.
+
+This module contains the registry recording, for each translation (see
+Translator), the metrics of the translations of the process:
+- the number of expressions translated, of bytes read and written, and
+  of errors by type
+- the latency of each stage, in a histogram
+- the hits and misses of the caches and interning tables
+
+The registry used by the translators by default is METRICS. Its metrics
+can be read with 'stats' (also exported as 'txt2latex.stats'), or dumped
+in the text format of Prometheus with 'write_prometheus'.
+"""
+
+# Import statement:
+# =================
+import bisect
+import collections
+import os
+import threading
+import time
+from typing import Optional
+
+
+# Constant definition:
+# ====================
+# The upper bounds of the buckets of the latency histograms, in seconds:
+LATENCY_BUCKETS = tuple(float(f"{base}e{exponent}") for exponent in range(-6,1) for base in (1,2,5)) + (10.0,)
+# The number of recorded translations aggregated at once:
+PENDING_SIZE = 1 << 12
+
+
+# Class definition:
+# =================
+class Histogram():
+    """ Histogram class
+
+    An instance of this class counts the observed values in buckets, each
+    bucket counting the values lower than or equal to its upper bound (and
+    greater than the bound of the previous one), the last bucket counting
+    the values greater than all the bounds.
+    """
+
+    __slots__ = ("bounds","counts","sum","count")
+
+    def __init__(self, bounds:tuple[float,...]=LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value:float) -> None:
+        self.counts[bisect.bisect_left(self.bounds,value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float,int]]:
+        """ Return the cumulative count of each upper bound, the last one being infinite. """
+        total, buckets = 0, list()
+        for bound, count in zip((*self.bounds,float("inf")),self.counts):
+            total += count
+            buckets.append((bound,total))
+        return buckets
+
+
+class CacheCounter():
+    """ CacheCounter class
+
+    An instance of this class counts the hits and misses of a cache, or of
+    an interning table. The hot paths increment the attributes directly,
+    without lock: with several threads, a few increments may be lost.
+    """
+
+    __slots__ = ("hits","misses")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def ratio(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+class MetricsRegistry():
+    """ MetricsRegistry class
+
+    An instance of this class records the metrics of the translations. The
+    metrics of a translation are recorded at its end, at once, by appending
+    them to a queue (an atomic operation, without lock): recording them
+    costs well under a microsecond. The queue is aggregated under the lock
+    of the registry when it is full, or when the metrics are read.
+
+    The registry holds the metrics of a single process: the translations
+    done in worker processes are recorded in the registry of each worker.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """ Reset all the metrics, the counters of the caches being kept (but zeroed). """
+        with self._lock:
+            self.start = time.time()
+            self._pending:collections.deque = collections.deque()
+            self.expressions = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.errors:dict[str,int] = dict()
+            self.stages:dict[str,Histogram] = dict()
+            caches = getattr(self,"caches",dict())
+            for counter in caches.values():
+                counter.hits = counter.misses = 0
+            self.caches:dict[str,CacheCounter] = caches
+
+    # Recording:
+    # ----------
+    def record_translation(self, bytes_in:int, bytes_out:int, timings:dict[str,float]) -> None:
+        """ Record a successful translation, with the time of each of its stages in seconds. """
+        self._pending.append((bytes_in,bytes_out,timings))
+        if len(self._pending) >= PENDING_SIZE:
+            self._aggregate()
+    def record_error(self, error:BaseException, bytes_in:int=0) -> None:
+        """ Record a translation that failed with the given error. """
+        self._pending.append((bytes_in,None,type(error).__name__))
+        if len(self._pending) >= PENDING_SIZE:
+            self._aggregate()
+
+    def _aggregate(self) -> None:
+        """ Aggregate the recorded translations in the counters and histograms. """
+        with self._lock:
+            pending, stages, errors = self._pending, self.stages, self.errors
+            count, size_in, size_out = 0, 0, 0
+            while pending:
+                bytes_in, bytes_out, result = pending.popleft()
+                count += 1
+                size_in += bytes_in
+                if bytes_out is None:
+                    errors[result] = errors.get(result,0) + 1
+                    continue
+                size_out += bytes_out
+                for name, value in result.items():
+                    histogram = stages.get(name)
+                    if histogram is None:
+                        histogram = stages[name] = Histogram()
+                    histogram.observe(value)
+            self.expressions += count
+            self.bytes_in += size_in
+            self.bytes_out += size_out
+
+    def cache(self, name:str) -> CacheCounter:
+        """ Return the counter of the cache of the given name, creating it if needed. """
+        with self._lock:
+            counter = self.caches.get(name)
+            if counter is None:
+                counter = self.caches[name] = CacheCounter()
+            return counter
+    def record_lookups(self, name:str, hits:int, misses:int) -> None:
+        """ Record the lookups of a cache or interning table, counted by its owner. """
+        counter = self.cache(name)
+        with self._lock:
+            counter.hits += hits
+            counter.misses += misses
+
+    # Export:
+    # -------
+    def stats(self) -> dict:
+        """ Return a snapshot of the metrics, with the throughput since the start (or the last reset). """
+
+        self._aggregate()
+        with self._lock:
+            elapsed = max(time.time() - self.start,1e-9)
+            return {
+                "uptime": elapsed,
+                "expressions": self.expressions,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "errors": dict(self.errors),
+                "throughput": {"expressions": self.expressions / elapsed, "bytes_in": self.bytes_in / elapsed},
+                "stages": {name: {"count": histogram.count, "sum": histogram.sum,
+                                  "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                                  "buckets": histogram.cumulative()}
+                           for name, histogram in self.stages.items()},
+                "caches": {name: {"hits": counter.hits, "misses": counter.misses, "ratio": counter.ratio()}
+                           for name, counter in self.caches.items()},
+            }
+
+    def to_prometheus(self, prefix:str="txt2latex") -> str:
+        """ Format the metrics in the text format of Prometheus. """
+
+        stats = self.stats()
+        lines = list()
+        def metric(name:str, kind:str, description:str, samples:list[tuple[str,object]]) -> None:
+            lines.extend((f"# HELP {prefix}_{name} {description}", f"# TYPE {prefix}_{name} {kind}"))
+            lines.extend(f"{prefix}_{name}{labels} {value}" for labels, value in samples)
+
+        metric("expressions_total","counter","The number of expressions translated.",[("",stats["expressions"])])
+        metric("input_bytes_total","counter","The number of bytes of the expressions.",[("",stats["bytes_in"])])
+        metric("output_bytes_total","counter","The number of bytes of the translations.",[("",stats["bytes_out"])])
+        metric("errors_total","counter","The number of failed translations, by type of error.",
+               [(f'{{type="{name}"}}',count) for name, count in sorted(stats["errors"].items())])
+
+        samples = list()
+        for name, stage in stats["stages"].items():
+            for bound, count in stage["buckets"]:
+                samples.append((f'_bucket{{stage="{name}",le="{"+Inf" if bound == float("inf") else repr(bound)}"}}',count))
+            samples.extend(((f'_sum{{stage="{name}"}}',stage["sum"]), (f'_count{{stage="{name}"}}',stage["count"])))
+        metric("stage_seconds","histogram","The latency of the stages of the translations.",samples)
+
+        for kind in ("hits","misses"):
+            metric(f"cache_{kind}_total","counter",f"The number of {kind} of the caches and interning tables.",
+                   [(f'{{cache="{name}"}}',cache[kind]) for name, cache in sorted(stats["caches"].items())])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path:str) -> None:
+        """ Dump the metrics in a file, in the text format of Prometheus (replaced atomically). """
+
+        # Type Check:
+        # -----------
+        if not isinstance(path,str):
+            raise TypeError(f"The path of the metrics must be a string, instead I've received a '{type(path)}'")
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary,"w",encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+        os.replace(temporary,path)
+
+
+# -*- COMMENT -*-
+#   The registry of the process, used by the translators by default.
+METRICS = MetricsRegistry()
+
+def stats() -> dict:
+    """ Return a snapshot of the metrics of the translations of the process (see MetricsRegistry.stats). """
+    return METRICS.stats()
+def utf8_size(expr:str) -> int:
+    """ Return the number of bytes of a string encoded in UTF-8, without encoding the ASCII strings. """
+    return len(expr) if expr.isascii() else len(expr.encode("utf-8"))
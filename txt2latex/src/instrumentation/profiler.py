@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Profiling of the translations
+# ---------------------------------------------------------
+# ./src/instrumentation/profiler.py
+
+""" Set of classes for profiling the translation of expressions.
+
+This module contains the classes used for diagnosing slow translations:
+- StageTimer: observes the stages of the translations (see Translator) and
+  records their wall-clock time
+- SamplingProfiler: samples the call stack of a thread at a regular interval,
+  and exports the samples as collapsed stacks (the input format of the
+  flamegraph tools)
+- ProfileReport: the result of 'profile_translations', which translates a
+  corpus of expressions under cProfile or under the sampling profiler
+"""
+
+# Import statement:
+# =================
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+
+# Constant definition:
+# ====================
+STAGES = ("template","ast_parse","logical_parse","normalize","latex_parse","render")
+PROFILING_MODES = ("cprofile","sampling")
+
+
+# Class definition:
+# =================
+class StageTimer():
+    """ StageTimer class
+
+    An instance of this class observes the translations and records,
+    for each of them, the wall-clock time of each stage and of the whole
+    translation (under the 'total' key), in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.records:list[dict[str,float]] = list()
+        self._current:Optional[dict[str,float]] = None
+
+    @contextmanager
+    def translation(self) -> Iterator[None]:
+        self._current = dict()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current["total"] = time.perf_counter() - start
+            self.records.append(self._current)
+            self._current = None
+
+    @contextmanager
+    def stage(self, name:str) -> Iterator[dict]:
+        start = time.perf_counter()
+        try:
+            yield dict()
+        finally:
+            if self._current is not None:
+                self._current[name] = time.perf_counter() - start
+
+
+class SamplingProfiler():
+    """ SamplingProfiler class
+
+    An instance of this class samples the call stack of the thread that
+    started it, from a background thread, every 'interval' seconds. The
+    overhead on the profiled thread is limited to the sampling itself.
+    """
+
+    def __init__(self, interval:float=0.001) -> None:
+
+        # Type Check:
+        # -----------
+        if not isinstance(interval,(int,float)) or interval <= 0:
+            raise ValueError(f"The interval must be a positive number, instead I've received '{interval}'")
+
+        self.interval = interval
+        self.samples:dict[str,int] = dict()
+        self._labels:dict[object,str] = dict()
+        self._thread:Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._thread_id:Optional[int] = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})".replace(";",",")
+        return label
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = list()
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key,0) + 1
+
+    def start(self) -> None:
+        """ Start sampling the current thread. """
+        if self._thread is not None:
+            raise RuntimeError("The sampling profiler is already started")
+        self._thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,name="txt2latex-sampler",daemon=True)
+        self._thread.start()
+    def stop(self) -> None:
+        """ Stop sampling. """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def collapsed(self) -> str:
+        """ Return the samples as collapsed stacks, one 'frame;frame;... count' per line. """
+        return "\n".join(f"{stack} {count}" for stack,count in sorted(self.samples.items()))
+
+
+class ProfileReport():
+    """ ProfileReport class
+
+    An instance of this class holds the result of the profiling of a corpus:
+    the timings of each expression, the statistics of cProfile (in 'cprofile'
+    mode) and the collapsed stacks (when sampled).
+    """
+
+    def __init__(self, mode:str, records:list[dict], stats:Optional[pstats.Stats],
+                 collapsed:Optional[str], top:int=10) -> None:
+        self.mode = mode
+        self.records = records
+        self.stats = stats
+        self.collapsed = collapsed
+        self.top = top
+
+    def stage_totals(self) -> dict[str,dict[str,float]]:
+        """ Return the total, mean and max time of each stage, in seconds. """
+        totals = dict()
+        for name in (*STAGES,"total"):
+            timings = [record[name] for record in self.records if name in record]
+            if timings:
+                totals[name] = {"total": sum(timings), "mean": sum(timings)/len(timings), "max": max(timings)}
+        return totals
+    def outliers(self) -> list[dict]:
+        """ Return the 'top' slowest expressions. """
+        return sorted(self.records,key=lambda record: record.get("total",0),reverse=True)[:self.top]
+
+    def to_dict(self) -> dict:
+        return {"mode": self.mode, "expressions": len(self.records),
+                "stages": self.stage_totals(), "outliers": self.outliers()}
+    def to_json(self, indent:int=2) -> str:
+        return json.dumps(self.to_dict(),indent=indent)
+
+    def __str__(self) -> str:
+        totals = self.stage_totals()
+        lines = [f"Profiled {len(self.records)} expressions ({self.mode} mode)", "",
+                 f"{'stage':<15}{'total (s)':>12}{'mean (ms)':>12}{'max (ms)':>12}"]
+        for name, timing in totals.items():
+            lines.append(f"{name:<15}{timing['total']:>12.4f}{timing['mean']*1e3:>12.3f}{timing['max']*1e3:>12.3f}")
+
+        lines.extend(["", "Slowest expressions:",
+                      f"{'index':>7}{'size':>10}{'total (ms)':>12}" + "".join(f"{name+' (ms)':>19}" for name in STAGES)])
+        for record in self.outliers():
+            lines.append(f"{record['index']:>7}{record['size']:>10}{record.get('total',0)*1e3:>12.3f}"
+                         + "".join(f"{record.get(name,0)*1e3:>19.3f}" for name in STAGES)
+                         + (f"  error: {record['error']}" if "error" in record else ""))
+
+        if self.stats is not None:
+            stream = io.StringIO()
+            self.stats.stream = stream
+            self.stats.sort_stats("cumulative").print_stats(20)
+            lines.extend(["", stream.getvalue().rstrip()])
+        return "\n".join(lines)
+
+
+# Functions definitions:
+# ======================
+def profile_translations(translator, expressions:Iterable[str], mode:str="cprofile",
+                         interval:float=0.001, sample:bool=False, top:int=10) -> ProfileReport:
+    """ Translate a corpus of expressions under a profiler.
+
+    Arguments:
+    translator : Translator
+        The translator used for the translations.
+    expressions : Iterable[str]
+        The expressions to translate.
+    mode : str
+        'cprofile' for profiling under cProfile, 'sampling' for sampling the
+        call stack every 'interval' seconds.
+    interval : float
+        The sampling interval, in seconds.
+    sample : bool
+        In 'cprofile' mode, also sample the call stack (for the collapsed stacks).
+    top : int
+        The number of slowest expressions reported.
+
+    Return:
+    ProfileReport
+        The timings of the translations and the profiling results.
+
+    Raise:
+    ValueError : When the mode is unknown
+    """
+
+    # Type Check:
+    # -----------
+    if mode not in PROFILING_MODES:
+        raise ValueError(f"The mode must be one of {PROFILING_MODES}, instead I've received '{mode}'")
+
+    # Initialisation:
+    # ---------------
+    timer = StageTimer()
+    translator.observers.append(timer)
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    sampler = SamplingProfiler(interval) if mode == "sampling" or sample else None
+
+    # Translate the expressions:
+    # --------------------------
+    records = list()
+    if sampler is not None:
+        sampler.start()
+    try:
+        for index, expr in enumerate(expressions):
+            error = None
+            if profiler is not None:
+                profiler.enable()
+            try:
+                translator.translate(expr)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+
+            record = {"index": index, "size": len(expr), **timer.records[-1]}
+            if error is not None:
+                record["error"] = error
+            records.append(record)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        translator.observers.remove(timer)
+
+    return ProfileReport(mode, records,
+                         pstats.Stats(profiler) if profiler is not None else None,
+                         sampler.collapsed() if sampler is not None else None,
+                         top)
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Parallel translation of a huge expression
+# ---------------------------------------------------------
+# ./src/parallel_translator.py
+
+""" A class translating a huge expression on several processes.
+
+This module contains a class that splits a text expression in slices,
+translates the slices in a process pool and stitches the results back
+into the root LatexExpression. The expression is split:
+1. at its top-level '+' and '-' operators, the consecutive terms being
+   grouped in chunks of similar size
+2. when a chunk is still too large, inside its outermost groups of
+   parentheses, whose contents are split recursively in the same way
+
+The slices are sent to the workers as text, and come back rendered: the
+LatexExpression of a slice never crosses a process boundary.
+"""
+
+# Import statement:
+# =================
+import bisect
+import multiprocessing
+import os
+import re
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Optional, Union
+
+from py_utils import Logueur
+from py_utils.Logueur import ConsoleLogueurFactory
+from py_utils.Logueur.log_level import LogLevel
+
+from txt2latex.src.baseComponent import latexComponent
+from txt2latex.src.baseComponent.loadOperator import getOperators, _LEVEL0_OPERATORS_DICT, _nullOperator
+from txt2latex.src.parsers import LogicalParser, LatexParser, StructuralIndex
+
+
+# Constant definition:
+# ====================
+MIN_CHUNK_SIZE = 1 << 16
+_PLACEHOLDER = "txlslot"
+
+
+# Worker definition:
+# ==================
+# -*- COMMENT -*-
+#   The parsers of a worker are built once, when the worker starts. The log of
+# the main process isn't sent to the workers, each one builds its own with the
+# same level.
+_worker_parsers:Optional[tuple[LogicalParser,LatexParser]] = None
+
+def _init_worker(log_level:int, functions:Optional[dict[str,latexComponent.LatexDelimitor]]) -> None:
+    global _worker_parsers
+    log = ConsoleLogueurFactory(LogLevel(log_level))
+    _worker_parsers = (LogicalParser(log,functions), LatexParser(log,functions))
+
+def _translate_slice(text:str) -> str:
+    """ Translate a slice of the expression, as if it was a whole expression. """
+    logical_parser, latex_parser = _worker_parsers
+    return str(latex_parser.parse(logical_parser.parse(text)))
+
+
+# Class definition:
+# =================
+class _Leaf():
+    """ A slice translated by a worker. """
+    def __init__(self, text:str) -> None:
+        self.text = text
+        self.future:Optional[Future] = None
+
+class _Split():
+    """ Chunks of terms, stitched as the children of a root LatexExpression. """
+    def __init__(self, chunks:list[tuple[latexComponent.LatexOperator,'_Node']]) -> None:
+        self.chunks = chunks
+
+class _Skeleton():
+    """ A slice translated in the main process, with its largest groups translated apart. """
+    def __init__(self, text:str, groups:list['_Node']) -> None:
+        self.text = text
+        self.groups = groups
+
+_Node = Union[_Leaf,_Split,_Skeleton]
+
+
+class ParallelTranslator():
+    """ ParallelTranslator class
+
+    An instance of this class translates a huge text expression on several
+    processes. The result is identical to the one of a Translator without a
+    renderer (the rendering is done by 'str').
+
+    The stitching relies on the formatting of the operators whose priority is
+    lower or equal to the one of '+' and '-' (the '+', '-', '*' and null
+    operators) being a concatenation. A boundary is only used when the serial
+    parser would give the operator of the boundary to the first term after it:
+    the slices starting with an operator or with an empty group are kept with
+    the previous slice.
+
+    The expressions smaller than two chunks are translated in the main process.
+    The process pool is started with the first parallel translation, and kept
+    for the next ones until 'close' is called (or the 'with' block is exited).
+    """
+
+    def __init__(self, log:Logueur, functions:Optional[dict[str,latexComponent.LatexDelimitor]]=None,
+                 workers:Optional[int]=None, chunk_size:Optional[int]=None, log_level:int=1) -> None:
+        """ Constructor of ParallelTranslator
+
+        Arguments:
+        log : Logueur
+            The log of the main process.
+        functions : dict[str,LatexDelimitor] | None
+            The functions recognized by the parsers.
+        workers : int | None
+            The number of processes, the number of CPUs by default.
+        chunk_size : int | None
+            The size of the slices, by default the size of the expression divided
+            by four times the number of workers (and at least MIN_CHUNK_SIZE).
+        log_level : int
+            The level of the logs of the workers.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if workers is not None and (not isinstance(workers,int) or workers < 1):
+            raise ValueError(f"The number of workers must be a positive int, instead I've received '{workers}'")
+        if chunk_size is not None and (not isinstance(chunk_size,int) or chunk_size < 1):
+            raise ValueError(f"The chunk size must be a positive int, instead I've received '{chunk_size}'")
+
+        # Initialize instance:
+        # --------------------
+        self.log = log
+        self.functions = functions
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.log_level = log_level
+        self.logical_parser = LogicalParser(log,functions)
+        self.latex_parser = LatexParser(log,functions)
+        self._executor:Optional[ProcessPoolExecutor] = None
+
+        # -*- COMMENT -*-
+        #   The patterns for locating the operators, the names and the start of
+        # the first term of a slice.
+        symbols = "".join(re.escape(operator.operator) for operator in getOperators())
+        self._operator_chars = re.compile(f"[{symbols}]")
+        self._term_start = re.compile(r"\s*(?:([A-Za-z0-9_.]+)(\()?|(\())")
+        self._name = re.compile(r"[A-Za-z0-9_.]+")
+
+    # Planning:
+    # ---------
+    def _renders_empty(self, text:str, start:int, end:int) -> bool:
+        """ Whether text[start:end] would be translated to an empty expression.
+
+        It is the case when it doesn't contain any name, except the names of the
+        functions called (a call with an empty argument being dropped).
+        """
+
+        for match in self._name.finditer(text,start,end):
+            name = match.group()
+            if match.end() >= end or text[match.end()] != '(' or '.' in name \
+                    or name not in self.logical_parser.functions:
+                return False
+        return True
+
+    def _has_trailing_operator(self, text:str, index:StructuralIndex, start:int, end:int) -> bool:
+        """ Whether the parse of text[start:end] ends with an unused operator. """
+
+        position = end - 1
+        while position >= start:
+            char = text[position]
+            if char.isspace():
+                position -= 1
+            elif char == ')':
+                # The operator of the last child of the group is the one of the group
+                opening = index.matching(position)
+                if self._renders_empty(text,opening,position+1):
+                    return True
+                start, position = opening + 1, position - 1
+            else:
+                return self._operator_chars.fullmatch(char) is not None
+        return False
+
+    def _starts_term(self, text:str, index:StructuralIndex, start:int, end:int) -> bool:
+        """ Whether the serial parser would give the preceding operator to the first term of text[start:end].
+
+        It doesn't when the text starts with an operator, with an empty group or
+        with a call to a function with an empty argument, those being dropped.
+        """
+
+        match = self._term_start.match(text,start,end)
+        if match is None:
+            return False
+        name = match.group(1)
+        if name is not None:
+            # A name is a term, unless it is the name of a function called
+            if match.group(2) is None or '.' in name or name not in self.logical_parser.functions:
+                return True
+            opening = match.start(2)
+        else:
+            opening = match.start(3)
+        return not self._renders_empty(text,opening,index.matching(opening)+1)
+
+    def _plan(self, text:str, index:StructuralIndex, chunk_size:int) -> _Node:
+        """ Plan the translation of a whole text. """
+
+        # Split at the top-level operators:
+        # ---------------------------------
+        pieces = [(None,0)]
+        for position in index.top_level_operators:
+            if self._starts_term(text,index,position+1,len(text)):
+                pieces.append((_LEVEL0_OPERATORS_DICT[text[position]],position+1))
+        ends = [start-1 for _, start in pieces[1:]] + [len(text)]
+
+        # Group the pieces in chunks:
+        # ---------------------------
+        chunks = list()
+        for (operator, start), end in zip(pieces,ends):
+            if chunks and chunks[-1][2] - chunks[-1][1] < chunk_size:
+                chunks[-1][2] = end
+            else:
+                chunks.append([operator,start,end])
+
+        groups = index.top_level_groups() if any(end - start > chunk_size for _, start, end in chunks) else []
+        if len(chunks) == 1:
+            return self._plan_chunk(text,index,groups,0,len(text),chunk_size)
+        return _Split([(operator or _nullOperator, self._plan_chunk(text,index,groups,start,end,chunk_size))
+                       for operator, start, end in chunks])
+
+    def _plan_chunk(self, text:str, index:StructuralIndex, groups:list[tuple[int,int]],
+                    start:int, end:int, chunk_size:int) -> _Node:
+        """ Plan the translation of a chunk, inside its largest groups if it is too large. """
+
+        if end - start <= chunk_size:
+            return _Leaf(text[start:end])
+
+        first = bisect.bisect_left(groups,(start,))
+        last = bisect.bisect_left(groups,(end,))
+
+        skeleton, contents, previous = list(), list(), start
+        for opening, closing in groups[first:last]:
+            if closing - opening <= chunk_size \
+                    or self._renders_empty(text,opening,closing+1) \
+                    or self._has_trailing_operator(text,index,opening+1,closing):
+                continue
+            skeleton.append(text[previous:opening+1])
+            skeleton.append(f"{_PLACEHOLDER}{len(contents)}")
+            contents.append(text[opening+1:closing])
+            previous = closing
+
+        if not contents:
+            return _Leaf(text[start:end])
+        skeleton.append(text[previous:end])
+
+        return _Skeleton("".join(skeleton),
+                         [self._plan(content,StructuralIndex(content),chunk_size) for content in contents])
+
+    # Execution:
+    # ----------
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """ Return the process pool, starting it if needed. """
+
+        # -*- COMMENT -*-
+        #   The workers are spawned rather than forked: forking a process
+        # running other threads (like the ones of the pool) may deadlock.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers,mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker,initargs=(self.log_level,self.functions))
+        return self._executor
+
+    def close(self) -> None:
+        """ Shut the process pool down. """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    def __enter__(self) -> 'ParallelTranslator':
+        return self
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _submit(self, node:_Node, executor:Executor) -> None:
+        """ Submit the leaves of a plan. """
+        if isinstance(node,_Leaf):
+            node.future = executor.submit(_translate_slice,node.text)
+        elif isinstance(node,_Split):
+            for _, chunk in node.chunks:
+                self._submit(chunk,executor)
+        else:
+            for group in node.groups:
+                self._submit(group,executor)
+
+    def _cancel(self, node:_Node) -> None:
+        """ Cancel the translations of the slices of a plan that aren't started. """
+        if isinstance(node,_Leaf):
+            if node.future is not None:
+                node.future.cancel()
+        elif isinstance(node,_Split):
+            for _, chunk in node.chunks:
+                self._cancel(chunk)
+        else:
+            for group in node.groups:
+                self._cancel(group)
+
+    def _stitch(self, node:_Node) -> str:
+        """ Stitch the translations of the slices of a plan. """
+
+        if isinstance(node,_Leaf):
+            return node.future.result()
+
+        if isinstance(node,_Split):
+            root = latexComponent.LatexExpression(latexComponent.LatexDelimitor())
+            for operator, chunk in node.chunks:
+                rendered = self._stitch(chunk)
+                if rendered:
+                    root.add_children(operator,latexComponent.LatexElement(rendered))
+            return str(root)
+
+        # -*- COMMENT -*-
+        #   The skeleton is translated with a placeholder in each of the groups
+        # translated apart, then the contents of these groups are replaced by
+        # their translation.
+        rendered_groups = {f"{_PLACEHOLDER}{i}":self._stitch(group) for i, group in enumerate(node.groups)}
+        latex_expr = self.latex_parser.parse(self.logical_parser.parse(node.text))
+        stack = [latex_expr]
+        while stack:
+            expression = stack.pop()
+            if len(expression.children) == 1 and isinstance(expression.children[0][1],latexComponent.LatexElement) \
+                    and expression.children[0][1].mainContent in rendered_groups \
+                    and expression.delimitor.openingCaracter:
+                expression.children[0] = (_nullOperator,
+                                          latexComponent.LatexElement(rendered_groups.pop(expression.children[0][1].mainContent)))
+                continue
+            stack.extend(child for _, child in expression.children if isinstance(child,latexComponent.LatexExpression))
+        if rendered_groups:
+            raise RuntimeError(f"The placeholders {list(rendered_groups)} weren't found in the translated skeleton")
+        return str(latex_expr)
+
+    def translate(self, expr:str) -> str:
+        """ Translate a text expression to a latex expression.
+
+        Arguments:
+        expr : str
+            The expression to translate.
+
+        Return:
+        str
+            The rendered latex expression.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        ValueError : When the parentheses of the expression are unbalanced
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(expr,str):
+            raise TypeError(f"The expression to translate must be a string, instead I've received a '{type(expr)}'")
+
+        # Plan:
+        # -----
+        chunk_size = self.chunk_size or max(MIN_CHUNK_SIZE,len(expr)//(4*self.workers))
+        index = StructuralIndex(expr)
+        if len(expr) < 2*chunk_size:
+            self.log.info("Expression too small for a parallel translation, translating it in the main process")
+            return str(self.latex_parser.parse(self.logical_parser.parse(expr,index)))
+
+        if _PLACEHOLDER in expr:
+            self.log.info(f"The expression contains '{_PLACEHOLDER}', translating it in the main process")
+            return str(self.latex_parser.parse(self.logical_parser.parse(expr,index)))
+
+        plan = self._plan(expr,index,chunk_size)
+
+        # Translate the slices:
+        # ---------------------
+        self.log.info(f"Starting the parallel translation on {self.workers} processes")
+        executor = self._get_executor()
+        try:
+            self._submit(plan,executor)
+            return self._stitch(plan)
+        except BaseException:
+            self._cancel(plan)
+            raise
@@ -5,4 +5,11 @@
 # ./src/parsers/__init__.py
 
 from .logical_parser import LogicalParser
-from .latex_parser import LatexParser
\ No newline at end of file
+from .latex_parser import LatexParser
+from .structural_index import StructuralIndex
+from .parse_context import ParseContext, LockedLog
+from .logical_normalizer import LogicalNormalizer
+from .incremental_parser import IncrementalLogicalParser
+from .resource_limits import ResourceLimits, ResourceLimitError, InputTooLongError, NestingTooDeepError, \
+    TooManyNodesError, OutputTooLargeError, TranslationTimeoutError, UnbalancedParenthesesError
+from .ast_parser import AstParser
\ No newline at end of file
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Front-end parsing an expression with the ast module
+# ---------------------------------------------------------
+# ./src/parsers/ast_parser.py
+
+""" A class parsing an expression to a latex one with the parser of CPython.
+
+This module contains a front-end that parses the plain arithmetic
+expressions with 'ast.parse' (the '^' being mapped to '**'), and converts
+the syntax tree straight into a LatexExpression: the tokenisation and the
+nesting of the expression are handled by the C parser of CPython.
+
+The LatexExpression built is the one the LogicalParser and the LatexParser
+would build. The expressions that aren't valid Python, and the constructs
+that the two parsers don't translate like Python (like 'a*-b', an unknown
+function call or a parenthesised exponent), fall back to them.
+"""
+
+# Import statement:
+# =================
+import ast
+import re
+from types import MappingProxyType
+from typing import Mapping, Optional, Union
+
+from py_utils import Logueur
+
+from txt2latex.src.baseComponent import latexComponent
+from txt2latex.src.baseComponent.loadOperator import _nullOperator, _LEVEL0_OPERATORS_DICT, getFunctions
+from txt2latex.src.instrumentation.metrics import METRICS
+from .logical_parser import LogicalParser
+from .latex_parser import LatexParser, _PARENTHESES_DELIMITOR
+from .parse_context import ParseContext, LockedLog
+from .resource_limits import ResourceLimits
+
+
+# Constant definition:
+# ====================
+_BINARY_OPERATORS = MappingProxyType({ast.Add: _LEVEL0_OPERATORS_DICT['+'], ast.Sub: _LEVEL0_OPERATORS_DICT['-'],
+                                      ast.Mult: _LEVEL0_OPERATORS_DICT['*'], ast.Div: _LEVEL0_OPERATORS_DICT['/']})
+_UNARY_OPERATORS = MappingProxyType({ast.USub: _LEVEL0_OPERATORS_DICT['-'], ast.UAdd: _LEVEL0_OPERATORS_DICT['+']})
+# The terms, as split by the LatexParser:
+_NAME = re.compile(r"(?P<mainContent>[a-zA-Z0-9]+)(?:_(?P<subScript>[a-zA-Z0-9_]*))?")
+_NUMBER = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+# The whitespaces are ignored by the parsers, the lines of the expression are joined:
+_WHITESPACES = str.maketrans("\t\n\r\f\v","     ")
+_frontend_counter = METRICS.cache("ast_frontend")
+# -*- COMMENT -*-
+#   The ast module builds its tree recursively, a long sum being as deep as
+# its number of terms: the expression is parsed by chunks of terms of about
+# CHUNK_SIZE caracters, cut at the '+' and '-' outside of any parenthesis.
+CHUNK_SIZE = 1 << 10
+_CHUNK_BOUNDARY = re.compile(r"[()]|(?<=[A-Za-z0-9_.)])\s*([+-])")
+
+
+# Error definition:
+# =================
+class _Unsupported(Exception):
+    """ Raised for a construct that the LatexParser doesn't translate like Python, the expression falling back. """
+
+
+# Class definition:
+# =================
+class AstParser():
+    """ AstParser class
+
+    An instance of this class can translate a text expression to a latex
+    one, with 'ast.parse'. Some configuration is possible when constructing
+    an instance (the functions and the limits, as for the other parsers).
+
+    The expressions that can't be parsed by the ast module fall back to the
+    LogicalParser and the LatexParser: 'try_parse' returns None for them,
+    while 'parse' translates them with the two parsers. The number of
+    expressions parsed by the ast module and of fallbacks is recorded in the
+    metrics, as the hits and misses of the 'ast_frontend' cache.
+
+    An instance holds no state of its parses: it can be used from several
+    threads.
+    """
+
+    def __init__(self, log:Logueur, functions:Optional[Mapping[str,latexComponent.LatexDelimitor]]=None,
+                 limits:Optional[ResourceLimits]=None) -> None:
+        """ Constructor of AstParser """
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if functions is not None and not isinstance(functions,Mapping):
+            raise TypeError(f"The functions must be a dict, instead I've received a '{type(functions)}'")
+        if limits is not None and not isinstance(limits,ResourceLimits):
+            raise TypeError(f"The limits must be a ResourceLimits, instead I've received a '{type(limits)}'")
+
+        self.log = LockedLog(log)
+        self.functions = getFunctions() if functions is None else MappingProxyType(dict(functions))
+        self.limits = limits
+        self.logical_parser = LogicalParser(log,self.functions,limits)
+        self.latex_parser = LatexParser(log,self.functions,limits)
+
+    # Conversion:
+    # -----------
+    def _parentheses(self, source:str, node:ast.AST) -> int:
+        """ Count the parentheses surrounding a node in the source (the ast module drops them). """
+
+        start, end, count = node.col_offset, node.end_col_offset, 0
+        # Most of the nodes follow an operator:
+        if not start or source[start-1] not in "( ":
+            return 0
+        while True:
+            while start > 0 and source[start-1] == ' ':
+                start -= 1
+            while end < len(source) and source[end] == ' ':
+                end += 1
+            if start == 0 or end == len(source) or source[start-1] != '(' or source[end] != ')':
+                return count
+            start, end, count = start - 1, end + 1, count + 1
+
+    def _operand(self, source:str, node:ast.AST, context:ParseContext, skip:int=0) \
+                 -> list[tuple[latexComponent.LatexOperator,Union[latexComponent.LatexElement,latexComponent.LatexExpression]]]:
+        """ Convert an operand to the children it adds to its group.
+
+        A parenthesised operand is a single child, the expression of its group
+        (the 'skip' first parentheses being the ones of a function call), while
+        a chain of operators adds its terms to the group.
+        """
+
+        # Groups:
+        # -------
+        groups = self._parentheses(source,node) - skip
+        if groups > 0:
+            depth = context.depth
+            for _ in range(groups):
+                context.enter()
+            children = self._operand(source,node,context,skip+groups)
+            for _ in range(groups):
+                expression = latexComponent.LatexExpression.from_children(_PARENTHESES_DELIMITOR,children)
+                children = [(_nullOperator,expression)]
+                self._count(context)
+            context.depth = depth
+            return children
+
+        # Terms:
+        # ------
+        node_type = type(node)
+        if node_type is ast.BinOp and type(node.op) is not ast.Pow:
+            return self._sequence(source,node,context,skip)
+        if node_type is ast.UnaryOp and type(node.op) in _UNARY_OPERATORS:
+            children = self._operand(source,node.operand,context)
+            if children[0][0] is not _nullOperator:
+                raise _Unsupported()
+            children[0] = (_UNARY_OPERATORS[type(node.op)],children[0][1])
+            return children
+        if node_type is ast.Call:
+            return [(_nullOperator,self._call(source,node,context))]
+        return [(_nullOperator,self._element(source,node,context))]
+
+    def _sequence(self, source:str, node:ast.AST, context:ParseContext, skip:int=0) \
+                  -> list[tuple[latexComponent.LatexOperator,Union[latexComponent.LatexElement,latexComponent.LatexExpression]]]:
+        """ Convert a chain of binary operators to the terms of a group, in the order of the expression.
+
+        The chain is walked along its left operands (the deep side of the tree of a
+        long sum), without recursion; the right operands are only deeper when they
+        have a higher priority, or are parenthesised. The 'skip' first parentheses
+        of the chain are the ones of its group.
+        """
+
+        operands = list()
+        while type(node) is ast.BinOp and type(node.op) is not ast.Pow and self._parentheses(source,node) == skip:
+            operator = _BINARY_OPERATORS.get(type(node.op))
+            if operator is None:
+                raise _Unsupported()
+            operands.append((operator,node.right))
+            node, skip = node.left, 0
+
+        children = self._operand(source,node,context,skip)
+        for operator, operand in reversed(operands):
+            # Most of the operands are names or numbers following their operator:
+            if (type(operand) is ast.Name or type(operand) is ast.Constant) and source[operand.col_offset-1] not in "( ":
+                children.append((operator,self._element(source,operand,context)))
+                continue
+            terms = self._operand(source,operand,context)
+            if terms[0][0] is not _nullOperator:
+                raise _Unsupported()
+            terms[0] = (operator,terms[0][1])
+            children.extend(terms)
+        return children
+
+    def _call(self, source:str, node:ast.Call, context:ParseContext) -> latexComponent.LatexExpression:
+        """ Convert the call of a known function to the expression delimited by the delimitor of the function. """
+
+        function = node.func
+        if (type(function) is not ast.Name or function.id not in self.functions or len(node.args) != 1 or node.keywords
+                or type(node.args[0]) is ast.Starred or source[function.end_col_offset] != '(' or self._parentheses(source,function)):
+            raise _Unsupported()
+
+        depth = context.depth
+        context.enter()
+        expression = latexComponent.LatexExpression.from_children(self.functions[function.id],
+                                                                  self._operand(source,node.args[0],context,skip=1))
+        context.depth = depth
+        self._count(context)
+        return expression
+
+    def _element(self, source:str, node:ast.AST, context:ParseContext) -> latexComponent.LatexElement:
+        """ Convert a name, a number or a power to the element the LatexParser would build. """
+
+        node_type = type(node)
+        if node_type is ast.Name:
+            match = _NAME.fullmatch(node.id)
+            if match is None:
+                raise _Unsupported()
+            element = latexComponent.LatexElement.from_parts(match['mainContent'],match['subScript'])
+
+        elif node_type is ast.Constant:
+            text = source[node.col_offset:node.end_col_offset]
+            if type(node.value) not in (int,float) or not _NUMBER.fullmatch(text):
+                raise _Unsupported()
+            element = latexComponent.LatexElement.from_parts(text)
+
+        elif node_type is ast.BinOp and type(node.op) is ast.Pow:
+            # The exponent of a term is the text following its '^', up to the next operator:
+            base, exponent = node.left, node.right
+            if (type(exponent) not in (ast.Name,ast.Constant) or self._parentheses(source,base)
+                    or self._parentheses(source,exponent)):
+                raise _Unsupported()
+            if type(base) is ast.Name:
+                match = _NAME.fullmatch(base.id)
+            elif type(base) is ast.Constant and type(base.value) is int:
+                match = _NAME.fullmatch(source[base.col_offset:base.end_col_offset])
+            else:
+                match = None
+            superScript = source[exponent.col_offset:exponent.end_col_offset]
+            if match is None or (type(exponent) is ast.Constant and not _NUMBER.fullmatch(superScript)):
+                raise _Unsupported()
+            element = latexComponent.LatexElement.from_parts(match['mainContent'],match['subScript'],superScript)
+
+        else:
+            raise _Unsupported()
+
+        self._count(context)
+        return element
+
+    def _count(self, context:ParseContext) -> None:
+        if context.limits is not None:
+            context.add_nodes()
+            if not context.nodes & 1023:
+                context.check_time()
+
+    def _chunks(self, source:str) -> list[tuple[Optional[latexComponent.LatexOperator],str]]:
+        """ Cut an expression in chunks of terms, returning each one with the operator preceding it. """
+
+        if len(source) <= CHUNK_SIZE:
+            return [(None,source)]
+
+        chunks, operator, start, depth = list(), None, 0, 0
+        for match in _CHUNK_BOUNDARY.finditer(source):
+            symbol = match.group()
+            if symbol == '(':
+                depth += 1
+            elif symbol == ')':
+                depth -= 1
+            elif not depth and match.start() - start >= CHUNK_SIZE:
+                chunks.append((operator,source[start:match.start()].strip()))
+                operator, start = _LEVEL0_OPERATORS_DICT[match.group(1)], match.end()
+        chunks.append((operator,source[start:].strip()))
+        return chunks
+
+    # Parsing:
+    # --------
+    def try_parse(self, expr:str, context:Optional[ParseContext]=None) -> Optional[latexComponent.LatexExpression]:
+        """ Parse an expression with the ast module.
+
+        Arguments:
+        expr : str
+            The expression to parse.
+        context : ParseContext | None
+            The context of the translation, when it is shared with other stages
+            (built with the limits of the instance if not given).
+
+        Return:
+        LatexExpression | None
+            The resulting latex expression, or None when the expression must be
+            parsed by the LogicalParser and the LatexParser.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        ResourceLimitError : When the parse exceeds one of its limits
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(expr,str):
+            raise TypeError(f"The expression to parse must be a string, instead I've received a '{type(expr)}'")
+        if context is None:
+            context = ParseContext(self.limits)
+        if context.limits is not None:
+            context.limits.check_length(len(expr))
+
+        # -*- COMMENT -*-
+        #   The offsets of the ast module count the bytes of the lines: only the
+        # ASCII expressions are parsed, on a single line. A '**' of the expression
+        # isn't a power for the LatexParser.
+        if not expr.isascii() or "**" in expr:
+            _frontend_counter.misses += 1
+            return None
+        source = expr.translate(_WHITESPACES).strip().replace("^","**")
+
+        # Parse the expression:
+        # ---------------------
+        context.depth, context.nodes = 1, 1
+        try:
+            children = list()
+            for operator, chunk in self._chunks(source):
+                terms = self._operand(chunk,ast.parse(chunk,mode="eval").body,context)
+                if operator is not None:
+                    if terms[0][0] is not _nullOperator:
+                        raise _Unsupported()
+                    terms[0] = (operator,terms[0][1])
+                children.extend(terms)
+            root = latexComponent.LatexExpression.from_children(latexComponent.LatexDelimitor(),children)
+        except (SyntaxError,ValueError,RecursionError,MemoryError,_Unsupported):
+            _frontend_counter.misses += 1
+            self.log.debug("The expression can't be parsed by the ast module, it falls back to the parsers")
+            return None
+        finally:
+            context.depth = 0
+
+        _frontend_counter.hits += 1
+        self.log.info("Expression parsed successfully by the ast module")
+        return root
+
+    def parse(self, expr:str, context:Optional[ParseContext]=None) -> latexComponent.LatexExpression:
+        """ Parse an expression, with the ast module or else with the LogicalParser and the LatexParser.
+
+        Arguments:
+        expr : str
+            The expression to parse.
+        context : ParseContext | None
+            The context of the translation (built with the limits of the instance if not given).
+
+        Return:
+        LatexExpression
+            The resulting latex expression.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        RuntimeError : When one of the term can't be parsed
+        ResourceLimitError : When the parse exceeds one of its limits
+        """
+
+        if context is None:
+            context = ParseContext(self.limits)
+        if (latex_expr := self.try_parse(expr,context)) is not None:
+            return latex_expr
+        return self.latex_parser.parse(self.logical_parser.parse(expr,context=context),context=context)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Incremental parse of an expression to a logical one
+# ---------------------------------------------------------
+# ./src/parsers/incremental_parser.py
+
+""" A class for parsing a text expression arriving in chunks.
+
+This module contains a class that builds the same LogicalBlock as the
+LogicalParser, from an expression given in several chunks (like the
+output of a program read from a pipe), similarly to the XMLPullParser
+of the standard library: the chunks are given to 'feed' as they arrive,
+and 'close' returns the LogicalBlock once the whole expression is fed.
+"""
+
+# Import statement:
+# =================
+import re
+from typing import Mapping, Optional
+
+from py_utils import Logueur
+
+from ..baseComponent import logicalComponent, latexComponent
+from .logical_parser import LogicalParser
+from .parse_context import ParseContext
+from .resource_limits import ResourceLimits, UnbalancedParenthesesError
+
+
+# Constant definition:
+# ====================
+_PARENTHESES = re.compile(r"[()]")
+
+
+# Class definition:
+# =================
+class IncrementalLogicalParser():
+    """ IncrementalLogicalParser class
+
+    An instance of this class parses a single expression, given in chunks.
+    The stack of the open blocks and the text following the last parenthesis
+    are kept between the chunks, so a chunk can end in the middle of an
+    element or of the name of a function. The elements copy their contents
+    from the chunks, which aren't referenced once fed: the memory grows with
+    the LogicalBlock, not with the expression.
+
+    The limits given when constructing the instance are checked while the
+    chunks are fed, the time being counted from the construction.
+
+    Unlike a LogicalParser, an instance holds the state of its parse, so it
+    can't be shared between threads.
+    """
+
+    def __init__(self, log:Logueur, functions:Optional[Mapping[str,latexComponent.LatexDelimitor]]=None,
+                 limits:Optional[ResourceLimits]=None) -> None:
+        """ Constructor of IncrementalLogicalParser
+
+        Arguments:
+        log : Logueur
+            The log of the parser.
+        functions : Mapping[str,LatexDelimitor] | None
+            The functions recognized by the parser.
+        limits : ResourceLimits | None
+            The limits of the parse.
+
+        Raise:
+        ValueError : When the log isn't a Logueur
+        TypeError : When the functions aren't a Mapping, or the limits a ResourceLimits
+        """
+
+        # Initialize instance:
+        # --------------------
+        # The LogicalParser checks the arguments, and splits the names of the functions
+        self._parser = LogicalParser(log,functions,limits)
+        self.log = self._parser.log
+        self.functions = self._parser.functions
+        self.limits = limits
+        self.context = ParseContext(limits)
+        self.context.nodes = 1
+
+        self.root = logicalComponent.LogicalBlock(name='root')
+        self._stack:list[logicalComponent.LogicalBlock] = [self.root]
+        self._openings:list[int] = list()
+        self._pending:list[str] = list()
+        self._position = 0
+        self._closed = False
+
+    def _flush_pending(self, end:Optional[str]=None) -> str:
+        """ Return the text following the last parenthesis, and forget it. """
+        if end:
+            self._pending.append(end)
+        text = "".join(self._pending)
+        self._pending.clear()
+        return text
+
+    def feed(self, chunk:str) -> None:
+        """ Parse the next chunk of the expression.
+
+        Arguments:
+        chunk : str
+            The next caracters of the expression.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        UnbalancedParenthesesError : When a parenthesis closes no parenthesis
+        ResourceLimitError : When the parse exceeds one of its limits
+        RuntimeError : When the parser is already closed
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(chunk,str):
+            raise TypeError(f"The chunk to parse must be a string, instead I've received a '{type(chunk)}'")
+        if self._closed:
+            raise RuntimeError("The parser is closed, it can't be fed anymore")
+        if self.limits is not None:
+            self.limits.check_length(self._position + len(chunk))
+            self.context.check_time()
+
+        # Parse the chunk:
+        # ----------------
+        start = 0
+        for parenthesis in _PARENTHESES.finditer(chunk):
+            position = parenthesis.start()
+            text = self._flush_pending(chunk[start:position])
+
+            if chunk[position] == '(':
+                function, end = self._parser._split_function(text,0,len(text))
+                if end:
+                    self._stack[-1].add_children(logicalComponent.LogicalElement.from_contents(text[:end]))
+                if function:
+                    self.log.debug(f"Function call found: {function}")
+                    self._stack.append(logicalComponent.LogicalBlock(function=function))
+                else:
+                    self._stack.append(logicalComponent.LogicalBlock())
+                self._openings.append(self._position + position)
+                if self.limits is not None:
+                    self.limits.check_depth(len(self._openings))
+                    self.context.add_nodes(2)
+                self.log.debug(f"New children found, recursivity level = {len(self._openings)}")
+
+            else:
+                if not self._openings:
+                    raise UnbalancedParenthesesError(f"Unbalanced parentheses: the ')' at position {self._position + position} doesn't close any '('",
+                                                     self._position + position)
+                if text:
+                    self._stack[-1].add_children(logicalComponent.LogicalElement.from_contents(text))
+                last_block = self._stack.pop(-1)
+                self._stack[-1].add_children(last_block)
+                self._openings.pop(-1)
+                self.log.debug(f"End of children found, recursivity level = {len(self._openings)}")
+
+            start = position + 1
+
+        # The caracters after the last parenthesis may be continued by the next chunk:
+        if start < len(chunk):
+            self._pending.append(chunk[start:])
+        self._position += len(chunk)
+
+    def close(self) -> logicalComponent.LogicalBlock:
+        """ End the parse of the expression.
+
+        Return:
+        LogicalBlock
+            The LogicalBlock representing the expression.
+
+        Raise:
+        UnbalancedParenthesesError : When a parenthesis is never closed
+        RuntimeError : When the parser is already closed
+        """
+
+        if self._closed:
+            raise RuntimeError("The parser is already closed")
+        if self._openings:
+            raise UnbalancedParenthesesError(f"Unbalanced parentheses: the '(' at position {self._openings[0]} is never closed",
+                                             self._openings[0])
+
+        # End of the expression, the remaining caracters are the last children:
+        if text := self._flush_pending():
+            self.root.add_children(logicalComponent.LogicalElement.from_contents(text))
+        self._closed = True
+
+        self.log.info(f"Expression of {self._position} caracters parsed to a logical expression")
+        return self.root
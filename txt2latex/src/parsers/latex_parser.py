@@ -13,15 +13,28 @@ creating the resulting latex expression.
 # Import statement:
 # =================
 import re
-from typing import Union, Optional
-from txt2latex.src.baseComponent import logicalComponent, latexComponent
-from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS, _nullOperator
+import threading
+from types import MappingProxyType
+from typing import Mapping, Union, Optional
+from txt2latex.src.baseComponent import logicalComponent, latexComponent, checks
+from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS, _nullOperator, getFunctions
+from .parse_context import ParseContext, LockedLog
+from .resource_limits import ResourceLimits, NestingTooDeepError
+from txt2latex.src.instrumentation.metrics import METRICS
 from py_utils import Logueur
 
 
 # Constant definition:
 # ====================
 latex_element_pattern = re.compile(r"(?P<mainContent>[a-zA-Z0-9]+)(_(?P<subScript>[a-zA-Z0-9_]*)|)(\^(?P<superScript>.*)|)")
+_term_patterns:dict[tuple,tuple[re.Pattern,Mapping[str,latexComponent.LatexOperator],tuple]] = dict()
+_term_patterns_lock = threading.Lock()
+_term_patterns_counter = METRICS.cache("term_patterns")
+# The expressions read from a file or a pipe may be wrapped on several lines:
+_WHITESPACES = " \t\n\r\f\v"
+_REMOVE_WHITESPACES = str.maketrans("","",_WHITESPACES)
+# The delimitor of the groups, shared by the expressions built:
+_PARENTHESES_DELIMITOR = latexComponent.LatexDelimitor("(",")")
 
 
 # Class definition:
@@ -32,22 +45,39 @@ class LatexParser():
     An instance of this class can translate a logical expression
     to a latex one. Some configuration is possible when constructing
     an instance.
+
+    The LogicalBlock with a 'function' metadata are translated to a
+    LatexExpression delimited by the delimitor of the function.
+
+    The nesting depth, the number of nodes, the size of the terms and the
+    time of the parses are bounded by the ResourceLimits given when
+    constructing the instance, if any.
+
+    An instance holds no state of its parses (see ParseContext), and its
+    tables are read-only: a single instance can be used from several threads.
     """
 
-    def __init__(self, log:Logueur) -> None:
+    def __init__(self, log:Logueur, functions:Optional[Mapping[str,latexComponent.LatexDelimitor]]=None,
+                 limits:Optional[ResourceLimits]=None) -> None:
         """ Constructor of LatexParser """
 
         # Type Check:
         # -----------
         if not isinstance(log,Logueur):
             raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if functions is not None and not isinstance(functions,Mapping):
+            raise TypeError(f"The functions must be a dict, instead I've received a '{type(functions)}'")
+        if limits is not None and not isinstance(limits,ResourceLimits):
+            raise TypeError(f"The limits must be a ResourceLimits, instead I've received a '{type(limits)}'")
         
-        self.log = log
-        self.recursivity_level = 0
+        self.log = LockedLog(log)
+        self.functions = getFunctions() if functions is None else MappingProxyType(dict(functions))
+        self.limits = limits
 
     def _parse_logical_element(self,expr:logicalComponent.LogicalElement, 
                           latex_expr:latexComponent.LatexExpression,
-                          operators:list[latexComponent.LatexOperator]) \
+                          operators:list[latexComponent.LatexOperator],
+                          context:Optional[ParseContext]=None) \
                           -> tuple[latexComponent.LatexExpression,Optional[latexComponent.LatexOperator]]:
         """ Parse a logic element.
 
@@ -77,6 +107,8 @@ class LatexParser():
             The LaTeX expression to which the found LaTeX elements should be added.
         operators : LatexOperators
             The LatexOperators used for parsing the differents elements of the expression.
+        context : ParseContext | None
+            The context of the parse, whose limits are checked for each term.
 
         Return:
         latex_expr : LatexExpression
@@ -86,57 +118,68 @@ class LatexParser():
 
         Raise:
         TypeError : When one of the argument isn't of the correct type
+        RuntimeError : When one of the term can't be parsed
+        ResourceLimitError : When the parse exceeds one of its limits
         """
 
         # Type Check:
         # -----------
-        if not isinstance(expr,logicalComponent.LogicalElement):
-            raise TypeError(f"The expression to parse must be a LogicalElement, instead I've received a '{type(expr)}'")
-        if not isinstance(latex_expr,latexComponent.LatexExpression):
-            raise TypeError(f"The latex expression to complete must be a LatexElement, instead I've received a '{type(expr)}'")
+        # The arguments are given by the parser itself, they are only checked in debug (see 'checks'):
+        trusted = not checks.ENABLED
+        if not trusted:
+            if not isinstance(expr,logicalComponent.LogicalElement):
+                raise TypeError(f"The expression to parse must be a LogicalElement, instead I've received a '{type(expr)}'")
+            if not isinstance(latex_expr,latexComponent.LatexExpression):
+                raise TypeError(f"The latex expression to complete must be a LatexElement, instead I've received a '{type(expr)}'")
 
         # Initialisation:
         # ---------------
-        buff = ""
+        pattern, operators_table = _get_term_pattern(operators)
         currentOperator = _nullOperator
+        limited = context is not None and context.limits is not None
+        children, from_parts = latex_expr.children, latexComponent.LatexElement.from_parts
 
         # Parse expression:
         # -----------------
-        for char in expr.contents:
-
-            # Ignore empty char
-            if char == ' ':
+        # -*- COMMENT -*-
+        #   Each match is either an operator or a whole term, already split in
+        # its main content, subscript and superscript. The operator found is used
+        # for the next term, so if the expression end with an operator it is
+        # returned for the next child of the LogicalBlock parent.
+        for match in pattern.finditer(expr.contents.translate(_REMOVE_WHITESPACES)):
+            operator, number, mainContent, subScript, superScript, invalid = match.groups()
+
+            if operator is not None:
+                currentOperator = operators_table[operator]
                 continue
 
-            # If next element found
-            if operator := _findOperator(char,operators):
-                # The operator found correspond to the next expression !!
-
-                # Ignore case where the expression start with an operator
-                if buff == "":
-                    currentOperator = operator
-                    continue
-
-                latex_expr.add_children(currentOperator,latex_element_factory(buff))
-                currentOperator = operator
-                buff = ""
-
-            # If next element not found, buffering continu
+            if number is not None:
+                latex_element = from_parts(number)
+            elif mainContent is not None:
+                latex_element = from_parts(mainContent,subScript,superScript)
             else:
-                buff += char
+                raise RuntimeError(f"Impossible to parse the following element: '{invalid}'"
+                                   + _position_message(expr,match.start()))
 
-        # End of the expression. If the buffer is still empty, in means that the
-        # expression end with an operator.
-        if buff != "":
-            latex_expr.add_children(currentOperator,latex_element_factory(buff))
+            if trusted:
+                children.append((currentOperator,latex_element))
+            else:
+                latex_expr.add_children(currentOperator,latex_element)
             currentOperator = None
 
+            if limited:
+                context.add_nodes()
+                context.add_output(match.end() - match.start())
+                if not context.nodes & 1023:
+                    context.check_time()
+
         # Return results:
         # ---------------
         return latex_expr, currentOperator
 
     def _parse_recursively(self, logic_expr:logicalComponent.LogicalBlock,
-                                  delimitor:latexComponent.LatexDelimitor) \
+                                  delimitor:latexComponent.LatexDelimitor,
+                                  context:ParseContext) \
                                 -> tuple[latexComponent.LatexExpression, latexComponent.LatexOperator]:
         """ Parse a logical expression by recursive call to itself.
 
@@ -148,6 +191,8 @@ class LatexParser():
             The logical expression to parse.
         delimitor : LatexDelimitor
             The delimitor to use for new LatexExpression
+        context : ParseContext
+            The state of the parse.
 
         Return:
         latex_expr : latexComponent.LatexExpression
@@ -161,20 +206,27 @@ class LatexParser():
 
         # Type Check:
         # -----------
-        if not isinstance(logic_expr,logicalComponent.LogicalBlock):
-            raise TypeError(f"The logical expression to parse must be a LogicalBlock, instead I've received a '{type(logic_expr)}'")
-        if not isinstance(delimitor,latexComponent.LatexDelimitor):
-            raise TypeError(f"The delimitor to use must be a LatexDelimitor, instead I've received a '{type(delimitor)}'")
+        # The arguments are given by 'parse' or by the recursion, they are only checked in debug (see 'checks'):
+        trusted = not checks.ENABLED
+        if not trusted:
+            if not isinstance(logic_expr,logicalComponent.LogicalBlock):
+                raise TypeError(f"The logical expression to parse must be a LogicalBlock, instead I've received a '{type(logic_expr)}'")
+            if not isinstance(delimitor,latexComponent.LatexDelimitor):
+                raise TypeError(f"The delimitor to use must be a LatexDelimitor, instead I've received a '{type(delimitor)}'")
 
         # Constante definition:
         # ---------------------
-        par_delimitor = latexComponent.LatexDelimitor("(",")")
+        _, operators_table = _get_term_pattern(_LEVEL0_OPERATORS)
 
         # Initialization:
         # ---------------
-        latex_expr = latexComponent.LatexExpression(delimitor)
-        self.recursivity_level += 1
-        self.log.debug(f"Starting parsing at recursivity level {self.recursivity_level}")
+        latex_expr = latexComponent.LatexExpression.from_children(delimitor,list())
+        children = latex_expr.children
+        context.enter()
+        if context.limits is not None:
+            context.add_nodes()
+            context.check_time()
+        self.log.debug(f"Starting parsing at recursivity level {context.depth}")
 
         # Start recursive process:
         # ------------------------
@@ -182,28 +234,46 @@ class LatexParser():
         for child in logic_expr.children:
 
             if isinstance(child,logicalComponent.LogicalElement):
-                self.log.debug(f"New logical element found (recursivity level {self.recursivity_level})")
-                latex_expr, nextOperator = self._parse_logical_element(child,latex_expr,_LEVEL0_OPERATORS)
+                self.log.debug(f"New logical element found (recursivity level {context.depth})")
+                latex_expr, nextOperator = self._parse_logical_element(child,latex_expr,_LEVEL0_OPERATORS,context)
                 if not nextOperator:
                     currOperator = _nullOperator
                 else:
-                    self.log.debug(f"Next operator found ({self.recursivity_level}): {nextOperator.operator}")
+                    self.log.debug(f"Next operator found ({context.depth}): {nextOperator.operator}")
                     currOperator = nextOperator
 
             else:
-                self.log.debug(f"New logical expression found (recursivity level {self.recursivity_level})")
-                expression, nextOperator = self._parse_recursively(child,par_delimitor)
+                self.log.debug(f"New logical expression found (recursivity level {context.depth})")
+                if function := child.get_metadata('function'):
+                    child_delimitor = self._function_delimitor(function)
+                else:
+                    child_delimitor = _PARENTHESES_DELIMITOR
+                if operator := child.get_metadata('operator'):
+                    currOperator = operators_table[operator]
+                expression, nextOperator = self._parse_recursively(child,child_delimitor,context)
                 if expression:
-                    latex_expr.add_children(currOperator,expression)
+                    if trusted:
+                        children.append((currOperator,expression))
+                    else:
+                        latex_expr.add_children(currOperator,expression)
                     currOperator = _nullOperator
                 if nextOperator:
-                    self.log.debug(f"Next operator found ({self.recursivity_level}): {nextOperator.operator}")
+                    self.log.debug(f"Next operator found ({context.depth}): {nextOperator.operator}")
                     currOperator = nextOperator
 
-        self.recursivity_level -= 1
+        context.depth -= 1
         return latex_expr, currOperator
     
-    def parse(self,expr:str) -> latexComponent.LatexExpression:
+    def _function_delimitor(self, function:str) -> latexComponent.LatexDelimitor:
+        """ Return the delimitor of a function call.
+
+        The functions unknown to the instance are written with '\\operatorname'.
+        """
+        if delimitor := self.functions.get(function):
+            return delimitor
+        return latexComponent.LatexDelimitor(f"\\operatorname{"{"}{function}{"}"}\\left(","\\right)")
+
+    def parse(self,expr:str,context:Optional[ParseContext]=None) -> latexComponent.LatexExpression:
         """ Parse a logical expression.
 
         Allows parsing a logical expression using a recursive function. This function enables 
@@ -213,6 +283,9 @@ class LatexParser():
         Arguments:
         expr : logicalComponent.LogicalBlock
             The logical element to parse
+        context : ParseContext | None
+            The context of the translation, when it is shared with other stages
+            (built with the limits of the instance if not given).
 
         Return:
         root_expression : LatexExpression
@@ -220,6 +293,7 @@ class LatexParser():
 
         Raise:
         TypeError : When one of the argument isn't of the correct type
+        ResourceLimitError : When the parse exceeds one of its limits
         """
 
         # Type Check:
@@ -230,35 +304,102 @@ class LatexParser():
         # Start process:
         # --------------
         null_delimitor = latexComponent.LatexDelimitor()
+        if context is None:
+            context = ParseContext(self.limits)
+        context.depth, context.nodes, context.size = 0, 0, 0
         self.log.info("Starting to parse logical expression")
-        root_expression, _ = self._parse_recursively(expr,null_delimitor)
+        try:
+            root_expression, _ = self._parse_recursively(expr,null_delimitor,context)
+        except RecursionError:
+            # Without limit, the nesting is bounded by the recursion limit of Python
+            raise NestingTooDeepError(None,context.depth - 1) from None
 
         return root_expression
 
 
 # Functions definitions:
 # ======================
-def _findOperator(char:str,operators:list[latexComponent.LatexOperator]) -> Optional[latexComponent.LatexOperator]:
-    """ Function to associate a caracter to an operator
-
-    Iterate through the given list of operator and return the operator
-    when one match. Return None if no match is found.
+def _get_term_pattern(operators:list[latexComponent.LatexOperator]) \
+                      -> tuple[re.Pattern,Mapping[str,latexComponent.LatexOperator]]:
+    """ Return the pattern splitting an expression in terms for the given operators
+
+    The pattern has one alternative for the operators, one for the numeric
+    literals, one for the terms in the form 'aa_bb^cc' (where 'aa' is a name
+    or a decimal number, like in '2.5^2') and one for the terms that can't be
+    parsed, which don't start with a letter or a digit. As with
+    'latex_element_pattern', the caracters following the main content and
+    the subscript of a term, up to the next operator, are ignored ('x.y'
+    gives 'x'). The patterns are cached for each set of operators.
 
     Arguments:
-    char : str
-        The caracter to search in the operator.
     operators : list[LatexOperator]
-        The list of operator to serach in.
+        The list of operator used to separate the terms.
 
     Return:
-    LatexOperator | None
-        The resulting match, or None if no match was found
+    pattern : re.Pattern
+        The compiled pattern, whose groups are (operator, number, mainContent,
+        subScript, superScript, invalid).
+    operators_table : Mapping[str,LatexOperator]
+        The operators, by their symbol (read-only).
     """
+
+    key = tuple((operator.operator,operator.priority,id(operator)) for operator in operators)
+    if cached := _term_patterns.get(key):
+        _term_patterns_counter.hits += 1
+        return cached[0], cached[1]
+    with _term_patterns_lock:
+        if cached := _term_patterns.get(key):
+            _term_patterns_counter.hits += 1
+            return cached[0], cached[1]
+        _term_patterns_counter.misses += 1
+        return _build_term_pattern(key,operators)
+def _build_term_pattern(key:tuple, operators:list[latexComponent.LatexOperator]) \
+                        -> tuple[re.Pattern,Mapping[str,latexComponent.LatexOperator]]:
+    """ Build and cache the pattern of '_get_term_pattern', under the lock of the cache. """
+
+    # The first operator defined for a symbol is the one used:
+    operators_table:dict[str,latexComponent.LatexOperator] = dict()
     for operator in operators:
-        if char == operator:
-            return operator
-        
-    return None
+        if operator.operator:
+            operators_table.setdefault(operator.operator,operator)
+
+    symbols = sorted(operators_table,key=len,reverse=True)
+    any_operator = "|".join(re.escape(symbol) for symbol in symbols)
+    if all(len(symbol) == 1 for symbol in symbols):
+        not_operator = "[^" + "".join(re.escape(symbol) for symbol in symbols) + "]" if symbols else "."
+    else:
+        not_operator = f"(?:(?!{any_operator}).)"
+    end_of_term = f"(?={any_operator}|$)" if symbols else "$"
+
+    pattern = re.compile(
+        (f"(?P<operator>{any_operator})|" if symbols else "(?P<operator>(?!))|") +
+        f"(?P<number>[0-9]+(?:\\.[0-9]+)?){end_of_term}|"
+        f"(?P<mainContent>[0-9]+\\.[0-9]+|[a-zA-Z0-9]+)(?:_(?P<subScript>[a-zA-Z0-9_]*))?(?:\\^(?P<superScript>{not_operator}*))?{not_operator}*|"
+        f"(?P<invalid>{not_operator}+)",
+        re.DOTALL
+    )
+
+    operators_table = MappingProxyType(operators_table)
+    _term_patterns[key] = (pattern,operators_table,tuple(operators))
+    return pattern, operators_table
+def _position_message(expr:logicalComponent.LogicalElement, index:int) -> str:
+    """ Locate a term of an element in the parsed expression, for the error messages.
+
+    The index is the one of the term in the contents without whitespaces, the
+    whitespaces are counted back for finding its position in the expression. The position is
+    only known for the elements built from a span.
+    """
+
+    if expr.span is None:
+        return ""
+    position = expr.span[0]
+    for char in expr.contents:
+        if char not in _WHITESPACES:
+            if index == 0:
+                break
+            index -= 1
+        position += 1
+    return f" (at position {position} of the expression)"
 def latex_element_factory(element:str) -> latexComponent.LatexElement:
     """ Construct a LatexElement from a string
 
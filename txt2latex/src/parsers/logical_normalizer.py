@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Normalisation of a logical expression
+# ---------------------------------------------------------
+# ./src/parsers/logical_normalizer.py
+
+""" A class collapsing the redundant blocks of a logical expression.
+
+This module contains a class that normalises the LogicalBlock built by the
+LogicalParser, before it is parsed to a latex expression:
+1. the blocks whose single child is a block without function are flattened,
+   like '((a*p^2))'
+2. the parentheses made redundant by the precedence of the operators are
+   dropped, like in 'a + (b - c)' or 'a - (b*c)', the elements around them
+   being merged
+3. the elements containing only an operator, like the '*' between two blocks,
+   are lifted into the 'operator' metadata of the following block
+
+The pass visits each node once. The contents of the merged elements are
+only joined at the end, so merging is done in constant time.
+"""
+
+# Import statement:
+# =================
+from typing import Optional, Union
+
+from py_utils import Logueur
+
+from ..baseComponent import logicalComponent, latexComponent, treeWalker
+from ..baseComponent.loadOperator import getOperators
+from .parse_context import LockedLog
+
+
+# Constant definition:
+# ====================
+# -*- COMMENT -*-
+#   The priorities of the LatexOperator are the ones of the rendering, where
+# '*' is formatted with '+' and '-'. The redundancy of the parentheses is
+# decided with the precedence of the mathematical operators instead. A '*'
+# is rendered as a juxtaposition: the parentheses of a term or a product are
+# only dropped next to a '+', a '-' or the end of the block, for '2*(3)' not
+# being rendered as '23'.
+_SUM_OPERATORS = frozenset("+-")
+_PRODUCT_OPERATORS = frozenset("*/")
+_IMPLICIT = ""
+_DELIMITING = frozenset(("","+","-"))
+
+_ATOM, _PRODUCT, _SUM = "atom", "product", "sum"
+
+
+# Class definition:
+# =================
+class _Text():
+    """ The contents of an element, made of parts joined at the end of the pass.
+
+    The first and last non-space caracters, the operators of the contents and
+    whether it contains a term are kept, for deciding the normalisation without
+    reading the contents. The element of unmerged contents is kept as is.
+    """
+
+    __slots__ = ("parts","first","last","operators","has_term","element")
+
+    def __init__(self, parts:list, first:str, last:str, operators:frozenset, has_term:bool,
+                 element:Optional[logicalComponent.LogicalElement]=None) -> None:
+        self.parts = parts
+        self.first = first
+        self.last = last
+        self.operators = operators
+        self.has_term = has_term
+        self.element = element
+
+    @classmethod
+    def of(cls, element:logicalComponent.LogicalElement, symbols:frozenset) -> '_Text':
+        contents = element.contents
+        stripped = contents.strip()
+        operators = symbols.intersection(contents)
+        has_term = any(char not in symbols for char in stripped) if operators else bool(stripped)
+        return cls([contents], stripped[:1], stripped[-1:], operators, has_term, element)
+
+    def merge(self, other:'_Text') -> '_Text':
+        return _Text([self,other], self.first or other.first, other.last or self.last,
+                     self.operators | other.operators, self.has_term or other.has_term)
+
+    def join(self) -> str:
+        parts, stack = list(), [self]
+        while stack:
+            part = stack.pop()
+            if isinstance(part,_Text):
+                stack.extend(reversed(part.parts))
+            else:
+                parts.append(part)
+        return "".join(parts)
+
+
+class LogicalNormalizer():
+    """ LogicalNormalizer class
+
+    An instance of this class normalises a logical expression in place,
+    with the operators given when constructing the instance (the level 0
+    operators by default). The LatexParser honours the 'operator' metadata
+    of the blocks, so the normalised expression is translated to the same
+    mathematical expression with fewer nodes.
+    """
+
+    def __init__(self, log:Logueur, operators:Optional[list[latexComponent.LatexOperator]]=None) -> None:
+        """ Constructor of LogicalNormalizer """
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+
+        # Initialize instance:
+        # --------------------
+        self.log = LockedLog(log)
+        operators = getOperators() if operators is None else operators
+        self.symbols = frozenset(operator.operator for operator in operators if len(operator.operator) == 1)
+
+    # Classification:
+    # ---------------
+    def _operator_before(self, children:list) -> Optional[str]:
+        """ The operator linking the next child to the children already normalised.
+
+        Return None when it isn't explicit (after a block, the operator left by
+        the block may be used), '' at the start of the block.
+        """
+        if not children:
+            return _IMPLICIT
+        if isinstance(children[-1],_Text) and children[-1].last in self.symbols:
+            return children[-1].last
+        return None
+
+    def _operator_after(self, child:Union[logicalComponent.LogicalBlock,'_Text',None]) -> Optional[str]:
+        """ The operator linking a child to the next one, '' at the end of the block. """
+        if child is None:
+            return _IMPLICIT
+        if isinstance(child,_Text) and child.first in self.symbols:
+            return child.first
+        return None
+
+    def _classify(self, block:logicalComponent.LogicalBlock) -> Optional[str]:
+        """ Classify the contents of a normalised block without function.
+
+        Return _ATOM for a single term, _PRODUCT for a product or quotient,
+        _SUM for a sum, or None when its parentheses can't be dropped: when it
+        starts or ends with an operator, contains an implicit product or an
+        unknown operator.
+        """
+
+        children = block.children
+        if not children:
+            return None
+        if isinstance(children[0],_Text) and children[0].first in self.symbols:
+            return None
+        if isinstance(children[0],logicalComponent.LogicalBlock) and children[0].get_metadata('operator') is not None:
+            return None
+        if isinstance(children[-1],_Text) and children[-1].last in self.symbols:
+            return None
+
+        operators = set()
+        for previous, child in zip(children,children[1:]):
+            if isinstance(child,logicalComponent.LogicalBlock):
+                if child.get_metadata('operator') is not None:
+                    operators.add(child.get_metadata('operator'))
+                elif not (isinstance(previous,_Text) and previous.last in self.symbols):
+                    return None
+            elif isinstance(previous,logicalComponent.LogicalBlock) and child.first not in self.symbols:
+                return None
+        for child in children:
+            if isinstance(child,_Text):
+                operators |= child.operators
+
+        if not operators:
+            return _ATOM if len(children) == 1 else None
+        if operators <= _PRODUCT_OPERATORS:
+            return _PRODUCT
+        if operators <= _PRODUCT_OPERATORS | _SUM_OPERATORS:
+            return _SUM
+        return None
+
+    def _is_redundant(self, kind:Optional[str], before:Optional[str], after:Optional[str]) -> bool:
+        """ Whether the parentheses of a block of the given kind are redundant between two operators. """
+
+        if kind is None or before is None or after is None:
+            return False
+        if kind in (_ATOM,_PRODUCT):
+            return before in _DELIMITING and after in _DELIMITING
+        return before in ('','+') and after in ('','+','-')
+
+    # Normalisation:
+    # --------------
+    def _normalize_block(self, block:logicalComponent.LogicalBlock) -> None:
+        """ Normalise the children of a block, whose blocks are already normalised. """
+
+        children = list()
+        originals = block.children
+        for i, child in enumerate(originals):
+
+            if isinstance(child,logicalComponent.LogicalElement):
+                child = _Text.of(child,self.symbols)
+            if isinstance(child,_Text):
+                if children and isinstance(children[-1],_Text):
+                    children[-1] = children[-1].merge(child)
+                else:
+                    children.append(child)
+                continue
+
+            # Drop the redundant parentheses:
+            # -------------------------------
+            following = originals[i+1] if i+1 < len(originals) else None
+            if isinstance(following,logicalComponent.LogicalElement):
+                following = _Text.of(following,self.symbols)
+                originals[i+1] = following
+            if child.get_metadata('function') is None and child.get_metadata('operator') is None \
+                    and self._is_redundant(self._classify(child),self._operator_before(children),
+                                           self._operator_after(following)):
+                for grandchild in child.children:
+                    if isinstance(grandchild,_Text) and children and isinstance(children[-1],_Text):
+                        children[-1] = children[-1].merge(grandchild)
+                    else:
+                        children.append(grandchild)
+                continue
+
+            # Lift the operator-only element preceding the block:
+            # ---------------------------------------------------
+            if children and isinstance(children[-1],_Text) and children[-1].operators and not children[-1].has_term:
+                child.set_metadata('operator',children.pop().last)
+            children.append(child)
+
+        # Flatten a single block without function:
+        # ----------------------------------------
+        if len(children) == 1 and isinstance(children[0],logicalComponent.LogicalBlock) \
+                and children[0].get_metadata('function') is None and children[0].get_metadata('operator') is None:
+            children = children[0].children
+
+        block.children = children
+
+    def normalize(self, tree:logicalComponent.LogicalBlock) -> logicalComponent.LogicalBlock:
+        """ Normalise a logical expression.
+
+        Arguments:
+        tree : LogicalBlock
+            The logical expression to normalise, modified in place.
+
+        Return:
+        LogicalBlock
+            The normalised logical expression.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(tree,logicalComponent.LogicalBlock):
+            raise TypeError(f"The expression to normalise must be a LogicalBlock, instead I've received a '{type(tree)}'")
+
+        # Normalise the blocks, from the leaves to the root:
+        # --------------------------------------------------
+        self.log.info("Starting normalising the logical expression")
+        blocks = [node for node, _ in treeWalker.walk(tree,"post") if isinstance(node,logicalComponent.LogicalBlock)]
+        for block in blocks:
+            self._normalize_block(block)
+
+        # Join the contents of the elements:
+        # ----------------------------------
+        for block in blocks:
+            for i, child in enumerate(block.children):
+                if isinstance(child,_Text):
+                    if child.element is not None:
+                        block.children[i] = child.element
+                    else:
+                        contents = child.join()
+                        block.children[i] = logicalComponent.LogicalElement.from_span(contents,0,len(contents))
+
+        return tree
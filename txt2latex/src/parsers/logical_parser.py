@@ -13,7 +13,13 @@ and building the logical groups that make it up.
 
 # Import statements:
 # ==================
-from ..baseComponent import logicalComponent
+from types import MappingProxyType
+from typing import Mapping, Optional, Union
+from ..baseComponent import logicalComponent, latexComponent
+from ..baseComponent.loadOperator import getFunctions
+from .structural_index import StructuralIndex
+from .parse_context import ParseContext, LockedLog
+from .resource_limits import ResourceLimits
 from py_utils import Logueur
 
 
@@ -27,21 +33,42 @@ class LogicalParser():
     to a logical expression. Some configuration is possible when
     constructing an instance, like the character used for delimiting
     logical block.
+
+    The function calls (like 'sqrt(x)') are recognized when the name
+    preceding a parenthesis is one of the functions given when constructing
+    the instance. The name is then removed from the preceding element and
+    stored in the 'function' metadata of the LogicalBlock of the call.
+
+    The length, the nesting depth, the number of nodes and the time of the
+    parses are bounded by the ResourceLimits given when constructing the
+    instance, if any.
+
+    The state of a parse is local to the call to 'parse', and the tables of
+    an instance are read-only: a single instance can be used from several
+    threads.
     """
 
-    def __init__(self, log:Logueur) -> None:
+    def __init__(self, log:Logueur, functions:Optional[Mapping[str,latexComponent.LatexDelimitor]]=None,
+                 limits:Optional[ResourceLimits]=None) -> None:
         """ Constructor of LogicalParser """
         
         # Type Check:
         # ===========
         if not isinstance(log,Logueur):
             raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if functions is not None and not isinstance(functions,Mapping):
+            raise TypeError(f"The functions must be a dict, instead I've received a '{type(functions)}'")
+        if limits is not None and not isinstance(limits,ResourceLimits):
+            raise TypeError(f"The limits must be a ResourceLimits, instead I've received a '{type(limits)}'")
         
         # Initialyse instance:
         # --------------------
-        self.log = log
+        self.log = LockedLog(log)
+        self.functions = getFunctions() if functions is None else MappingProxyType(dict(functions))
+        self.limits = limits
 
-    def parse(self, expr:str) -> logicalComponent.LogicalBlock:
+    def parse(self, expr:str, index:Optional[StructuralIndex]=None,
+              context:Optional[ParseContext]=None) -> logicalComponent.LogicalBlock:
         """Parse an expression.
 
         Parse a complex expression and return a LogicalBlock
@@ -50,6 +77,11 @@ class LogicalParser():
         Arguments:
         expr : str
             The expression to parse
+        index : StructuralIndex | None
+            The structural index of the expression, built if not given.
+        context : ParseContext | None
+            The context of the translation, when it is shared with other stages
+            (built with the limits of the instance if not given).
 
         Return:
         logicalBlock.LogicalBlock
@@ -57,45 +89,112 @@ class LogicalParser():
 
         Raise:
         TypeError : When the given argument isn't of the correct type
+        UnbalancedParenthesesError : When the parentheses of the expression are unbalanced
+        ResourceLimitError : When the parse exceeds one of its limits
         """
 
         # Type checking:
         # --------------
         if not isinstance(expr,str):
             raise TypeError(f"The expression to parse must be a string, instead I've received a '{type(expr)}'")
+        if context is None:
+            context = ParseContext(self.limits)
+        limits = context.limits
+        if limits is not None:
+            limits.check_length(len(expr))
+        if index is None:
+            index = StructuralIndex(expr,operators="")
+        elif not isinstance(index,StructuralIndex) or index.expr is not expr:
+            raise TypeError(f"The index must be the StructuralIndex of the expression, instead I've received a '{type(index)}'")
+        if limits is not None:
+            limits.check_depth(index.max_depth)
 
         # Initialisation:
         # ---------------
-        root_block = logicalComponent.LogicalBlock(name='root')
-        stack = list((root_block,))
-        buff = ""
+        # -*- COMMENT -*-
+        #   The children of the open blocks are collected in lists, each block
+        # being built at once by the trusted constructor when it is closed. The
+        # stack holds the children of the parent and the function of each open
+        # block.
+        children:list[Union[logicalComponent.LogicalElement,logicalComponent.LogicalBlock]] = list()
+        stack:list[tuple[list,Optional[str]]] = list()
+        start = 0
+        context.nodes = 1
 
         # Parse the expression:
         # ---------------------
+        # -*- COMMENT -*-
+        #   Only the parentheses located by the structural index are visited, the
+        # caracters between two of them form an element referencing its span in
+        # the expression, so nothing is copied from the expression while parsing.
         recursivity_level = 0
         self.log.info(f"Starting parsing to logical expression of {expr}")
-        for char in expr:
+        for i, position in enumerate(index.parentheses):
 
-            if char == '(':
+            # The nodes are counted by batches of parentheses (each one building a
+            # block or an element, roughly), the clock being read for each batch:
+            if limits is not None and not i & 1023:
+                context.add_nodes(min(1024,len(index.parentheses)-i))
+                context.check_time()
+
+            if expr[position] == '(':
                 recursivity_level += 1
                 self.log.debug(f"New children found, recursivity level = {recursivity_level}")
-                if buff != "":
-                    stack[-1].add_children(logicalComponent.LogicalElement(buff))
-                    self.log.debug(f"Adding the predecessing children {buff}")
-                    buff = ""
-                stack.append(logicalComponent.LogicalBlock())
+                function, end = self._split_function(expr,start,position)
+                if end > start:
+                    children.append(logicalComponent.LogicalElement.from_span(expr,start,end))
+                    self.log.debug(f"Adding the predecessing children at [{start}:{end}]")
+                if function:
+                    self.log.debug(f"Function call found: {function}")
+                stack.append((children,function))
+                children = list()
 
-            elif char == ')':
+            else:
                 recursivity_level -= 1
                 self.log.debug(f"End of children found, recursivity level = {recursivity_level}")
-                if buff != "":
-                    stack[-1].add_children(logicalComponent.LogicalElement(buff))
-                    self.log.debug(f"Adding the predecessing children {buff}")
-                    buff = ""
-                last_block = stack.pop(-1)
-                stack[-1].add_children(last_block)
+                if position > start:
+                    children.append(logicalComponent.LogicalElement.from_span(expr,start,position))
+                    self.log.debug(f"Adding the predecessing children at [{start}:{position}]")
+                parent, function = stack.pop(-1)
+                if function:
+                    parent.append(logicalComponent.LogicalBlock.from_children(children,function=function))
+                else:
+                    parent.append(logicalComponent.LogicalBlock.from_children(children))
+                children = parent
 
-            else:
-                buff += char
+            start = position + 1
+
+        # End of the expression, the remaining caracters are the last children:
+        if len(expr) > start:
+            children.append(logicalComponent.LogicalElement.from_span(expr,start,len(expr)))
+            self.log.debug(f"Adding the last children at [{start}:{len(expr)}]")
+
+        return logicalComponent.LogicalBlock.from_children(children,name='root')
+
+    def _split_function(self, expr:str, start:int, end:int) -> tuple[Optional[str],int]:
+        """ Split the name of a function call from the end of a span.
+
+        The name is the identifier at the end of the span (the caracters
+        preceding an opening parenthesis), it is looked up once in the functions
+        of the instance.
+
+        Arguments:
+        expr : str
+            The parsed expression.
+        start, end : int
+            The bounds of the caracters preceding an opening parenthesis.
+
+        Return:
+        function : str | None
+            The name of the function called, or None if it isn't a function call.
+        end : int
+            The end of the span without the name of the function.
+        """
+
+        name_start = end
+        while name_start > start and (expr[name_start-1].isalnum() or expr[name_start-1] == '_'):
+            name_start -= 1
 
-        return root_block
\ No newline at end of file
+        if name_start == end or expr[name_start:end] not in self.functions:
+            return None, end
+        return expr[name_start:end], name_start
\ No newline at end of file
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# State of a parse
+# ---------------------------------------------------------
+# ./src/parsers/parse_context.py
+
+""" Set of classes making the parsers reentrant.
+
+This module contains the classes that allow a single parser instance to
+serve concurrent parses, from several threads:
+- ParseContext: the state of one parse, created by each call to 'parse'
+  and passed along the recursive calls, instead of being stored in the
+  parser instance
+- LockedLog: a wrapper serialising the calls to a log, which isn't
+  guaranteed to be thread-safe
+"""
+
+# Import statement:
+# =================
+import threading
+import time
+from typing import Optional
+
+from py_utils import Logueur
+
+from .resource_limits import ResourceLimits, NestingTooDeepError, TooManyNodesError, TranslationTimeoutError
+
+
+# Class definition:
+# =================
+class ParseContext():
+    """ ParseContext class
+
+    An instance of this class holds the state of one parse:
+    - depth: the recursivity level of the parse
+    - limits: the ResourceLimits of the parse, if any
+    - nodes: the number of nodes built by the parse
+    - size: the number of caracters of the terms parsed (a lower bound of
+      the size of the latex expression)
+    - deadline: the time (of 'time.perf_counter') at which the translation
+      times out
+
+    A context can be shared by the stages of a translation, which then
+    share its deadline: the number of nodes is counted for each stage.
+    """
+
+    __slots__ = ("depth","limits","nodes","size","deadline")
+
+    def __init__(self, limits:Optional[ResourceLimits]=None) -> None:
+        self.depth:int = 0
+        self.limits = limits
+        self.nodes:int = 0
+        self.size:int = 0
+        self.deadline:Optional[float] = None
+        if limits is not None and limits.timeout is not None:
+            self.deadline = time.perf_counter() + limits.timeout
+
+    # -*- COMMENT -*-
+    #   The checks are cheap, they are done while building the trees: the
+    # clock is only read by 'check_time', which the parsers call every few
+    # nodes.
+    def enter(self) -> None:
+        """ Go one level deeper in the expression, the root block being at depth 1. """
+        self.depth += 1
+        if self.limits is not None and self.limits.max_depth is not None and self.depth - 1 > self.limits.max_depth:
+            raise NestingTooDeepError(self.limits.max_depth,self.depth - 1)
+    def add_nodes(self, count:int=1) -> None:
+        self.nodes += count
+        if self.limits is not None and self.limits.max_nodes is not None and self.nodes > self.limits.max_nodes:
+            raise TooManyNodesError(self.limits.max_nodes,self.nodes)
+    def add_output(self, size:int) -> None:
+        self.size += size
+        if self.limits is not None:
+            self.limits.check_output(self.size)
+    def check_time(self) -> None:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise TranslationTimeoutError(self.limits.timeout)
+
+
+class LockedLog():
+    """ LockedLog class
+
+    An instance of this class wraps a Logueur, and serialises its calls
+    with a lock shared by every LockedLog (the logs usually sharing the
+    same console). The attributes that aren't methods are read directly.
+    The methods are looked up on the log at each call, for following its
+    changes: the lock is taken by every call, even for the messages the
+    log filters out, which is cheap next to formatting a message.
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, log:Logueur) -> None:
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+
+        self.log = log
+
+    def __getattr__(self, name:str):
+        attribute = getattr(self.log,name)
+        if not callable(attribute):
+            return attribute
+
+        def locked(*args, **kwargs):
+            with LockedLog._lock:
+                return attribute(*args,**kwargs)
+        return locked
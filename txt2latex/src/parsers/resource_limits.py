@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Limits of the resources used by a translation
+# ---------------------------------------------------------
+# ./src/parsers/resource_limits.py
+
+""" Set of classes bounding the resources used by a translation.
+
+This module contains the limits that can be given to the parsers and to
+the Translator, and the errors raised when one is exceeded:
+- ResourceLimits: the maximal input length, nesting depth, number of
+  nodes, output size and time of a translation
+- ResourceLimitError: the base class of the errors raised when a limit is
+  exceeded, a RuntimeError like the other errors of the translations
+- UnbalancedParenthesesError: the error raised for unbalanced parentheses,
+  a ValueError
+
+The limits are checked while parsing (see ParseContext), so a translation
+exceeding one stops as soon as it is detected.
+"""
+
+# Import statement:
+# =================
+from typing import Optional
+
+
+# Error definition:
+# =================
+class UnbalancedParenthesesError(ValueError):
+    """ Error raised when a parenthesis closes no parenthesis, or is never closed. """
+
+    def __init__(self, message:str, position:int) -> None:
+        super().__init__(message)
+        self.position = position
+
+
+class ResourceLimitError(RuntimeError):
+    """ Error raised when a translation exceeds one of its limits.
+
+    The name of the limit exceeded, its maximum and the value reached (when
+    known) are stored in the 'limit', 'maximum' and 'value' attributes. The
+    maximum is None when the limit is the one of Python (its recursion limit).
+    """
+
+    limit = ""
+
+    def __init__(self, maximum, value=None) -> None:
+        self.maximum = maximum
+        self.value = value
+        maximum = f": {maximum}" if maximum is not None else ""
+        reached = f" ({value} reached)" if value is not None else ""
+        super().__init__(f"The translation exceeds its limit of {self.limit}{maximum}{reached}")
+
+class InputTooLongError(ResourceLimitError):
+    limit = "input length"
+class NestingTooDeepError(ResourceLimitError):
+    limit = "nesting depth"
+class TooManyNodesError(ResourceLimitError):
+    limit = "nodes"
+class OutputTooLargeError(ResourceLimitError):
+    limit = "output size"
+class TranslationTimeoutError(ResourceLimitError):
+    limit = "time (in seconds)"
+
+
+# Class definition:
+# =================
+class ResourceLimits():
+    """ ResourceLimits class
+
+    An instance of this class holds the limits of a translation, None
+    meaning no limit:
+    - max_length: the number of caracters of the expression
+    - max_depth: the nesting depth of the parentheses
+    - max_nodes: the number of nodes of the tree built by each parser
+    - max_output: the number of caracters of the latex expression
+    - timeout: the time of a translation, in seconds
+
+    An instance can be shared between parsers, threads and processes, the
+    state of a translation being held by its ParseContext.
+    """
+
+    __slots__ = ("max_length","max_depth","max_nodes","max_output","timeout")
+
+    def __init__(self, max_length:Optional[int]=None, max_depth:Optional[int]=None, max_nodes:Optional[int]=None,
+                 max_output:Optional[int]=None, timeout:Optional[float]=None) -> None:
+        """ Constructor of ResourceLimits """
+
+        # Type Check:
+        # -----------
+        for name, value in (("max_length",max_length), ("max_depth",max_depth),
+                            ("max_nodes",max_nodes), ("max_output",max_output)):
+            if value is not None and (not isinstance(value,int) or value < 1):
+                raise ValueError(f"The limit '{name}' must be a positive int, instead I've received '{value}'")
+        if timeout is not None and (not isinstance(timeout,(int,float)) or timeout <= 0):
+            raise ValueError(f"The limit 'timeout' must be a positive number, instead I've received '{timeout}'")
+
+        # Initialize instance:
+        # --------------------
+        self.max_length = max_length
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_output = max_output
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return "ResourceLimits(" + ", ".join(f"{name}={getattr(self,name)}" for name in self.__slots__) + ")"
+
+    def check_length(self, length:int) -> None:
+        if self.max_length is not None and length > self.max_length:
+            raise InputTooLongError(self.max_length,length)
+    def check_depth(self, depth:int) -> None:
+        if self.max_depth is not None and depth > self.max_depth:
+            raise NestingTooDeepError(self.max_depth,depth)
+    def check_output(self, size:int) -> None:
+        if self.max_output is not None and size > self.max_output:
+            raise OutputTooLargeError(self.max_output,size)
+
+
+# Function definition:
+# ====================
+_TEXTTT_ESCAPES = {'\\': r"\textbackslash{}", '{': r"\{", '}': r"\}", '$': r"\$", '&': r"\&", '#': r"\#",
+                   '_': r"\_", '%': r"\%", '^': r"\textasciicircum{}", '~': r"\textasciitilde{}"}
+
+def texttt_fallback(expr:str, max_output:Optional[int]=None) -> str:
+    """ Render an expression as raw text, in '\\texttt{}'.
+
+    Arguments:
+    expr : str
+        The expression that couldn't be translated.
+    max_output : int | None
+        The maximal size of the result, the expression being cut (and followed
+        by '\\ldots') if needed.
+
+    Return:
+    str
+        The expression, with the special caracters of LaTeX escaped, in '\\texttt{}'.
+    """
+
+    opening, closing, ellipsis = r"\texttt{", "}", r"\ldots"
+    budget = None if max_output is None else max_output - len(opening) - len(closing)
+    escaped, size, previous_space = list(), 0, False
+    for char in expr:
+        # The whitespaces are collapsed in a single space
+        if char.isspace():
+            if previous_space:
+                continue
+            char, previous_space = " ", True
+        else:
+            char, previous_space = _TEXTTT_ESCAPES.get(char,char), False
+        if budget is not None and size + len(char) > budget:
+            while escaped and size + len(ellipsis) > budget:
+                size -= len(escaped.pop())
+            if size + len(ellipsis) <= budget:
+                escaped.append(ellipsis)
+            break
+        escaped.append(char)
+        size += len(char)
+    return opening + "".join(escaped) + closing
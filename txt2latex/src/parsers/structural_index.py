@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Structural index of an expression
+# ---------------------------------------------------------
+# ./src/parsers/structural_index.py
+
+""" A class indexing the structure of a text expression.
+
+This module contains a class that locates, in a single pre-pass, the
+parentheses of an expression, the matching pairs of parentheses and the
+operators outside of any parenthesis. An unbalanced expression is detected
+by this pre-pass, before any parsing.
+
+When NumPy is installed (the 'numpy' extra), the pre-pass of the large
+expressions is vectorised: the expression is converted to an array of code
+units, and the depth of each caracter is the cumulative sum of the '('/')'
+deltas. Otherwise, a pure-Python pass is used.
+"""
+
+
+# Import statements:
+# ==================
+import re
+from typing import Optional
+
+from .resource_limits import UnbalancedParenthesesError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Constant definition:
+# ====================
+NUMPY_THRESHOLD = 4096
+_OPENING, _CLOSING = ord('('), ord(')')
+
+
+# Class definition:
+# =================
+class StructuralIndex():
+    """ StructuralIndex class
+
+    An instance of this class indexes the structure of an expression:
+    - parentheses: the positions of the parentheses, in order
+    - pairs: the position of the matching parenthesis, for each parenthesis
+    - top_level_operators: the positions of the operators that are outside
+      of any parenthesis, in order
+    - max_depth: the maximal nesting depth of the expression
+
+    Raise:
+    ValueError : When the parentheses of the expression are unbalanced
+    """
+
+    def __init__(self, expr:str, operators:str="+-", use_numpy:Optional[bool]=None) -> None:
+        """ Constructor of StructuralIndex
+
+        Arguments:
+        expr : str
+            The expression to index.
+        operators : str
+            The caracters of the operators to locate outside of the parentheses.
+        use_numpy : bool | None
+            Whether to use the vectorised pre-pass. By default, it is used when
+            NumPy is installed and the expression is larger than NUMPY_THRESHOLD.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(expr,str):
+            raise TypeError(f"The expression to index must be a string, instead I've received a '{type(expr)}'")
+        if not isinstance(operators,str) or '(' in operators or ')' in operators:
+            raise TypeError(f"The operators must be a string without parenthesis, instead I've received '{operators}'")
+        if use_numpy and np is None:
+            raise ImportError("NumPy isn't installed, install the 'numpy' extra of txt2latex")
+
+        # Initialize instance:
+        # --------------------
+        self.expr = expr
+        self.operators = operators
+        if use_numpy is None:
+            use_numpy = np is not None and len(expr) >= NUMPY_THRESHOLD
+
+        if use_numpy:
+            self._index_numpy()
+        else:
+            self._index_python()
+
+    def _index_python(self) -> None:
+        """ Index the expression in a single pass over its parentheses and operators. """
+
+        self.parentheses:list[int] = list()
+        self.pairs:dict[int,int] = dict()
+        self.top_level_operators:list[int] = list()
+        self.max_depth = 0
+
+        stack = list()
+        pattern = re.compile(f"[(){re.escape(self.operators)}]") if self.operators else re.compile(r"[()]")
+        for match in pattern.finditer(self.expr):
+            position = match.start()
+            char = match.group()
+            if char == '(':
+                stack.append(position)
+                self.parentheses.append(position)
+                self.max_depth = max(self.max_depth,len(stack))
+            elif char == ')':
+                if not stack:
+                    raise UnbalancedParenthesesError(f"Unbalanced parentheses: the ')' at position {position} doesn't close any '('",position)
+                opening = stack.pop()
+                self.pairs[opening] = position
+                self.pairs[position] = opening
+                self.parentheses.append(position)
+            elif not stack:
+                self.top_level_operators.append(position)
+
+        if stack:
+            raise UnbalancedParenthesesError(f"Unbalanced parentheses: the '(' at position {stack[0]} is never closed",stack[0])
+
+    def _index_numpy(self) -> None:
+        """ Index the expression with a vectorised pass over its code units. """
+
+        # -*- COMMENT -*-
+        #   An ASCII expression is viewed as bytes, otherwise each caracter is
+        # a code point, so the positions in the array are the ones in the string.
+        if self.expr.isascii():
+            codes = np.frombuffer(self.expr.encode("ascii"),dtype=np.uint8)
+        else:
+            codes = np.frombuffer(self.expr.encode("utf-32-le"),dtype=np.uint32)
+
+        opening = codes == _OPENING
+        closing = codes == _CLOSING
+        depth = np.cumsum(opening.astype(np.int32) - closing.astype(np.int32))
+
+        # Check the balance:
+        # ------------------
+        if depth.size and depth.min() < 0:
+            position = int(np.argmax(depth < 0))
+            raise UnbalancedParenthesesError(f"Unbalanced parentheses: the ')' at position {position} doesn't close any '('",position)
+        if depth.size and depth[-1] != 0:
+            # The last '(' opened at depth 1 is the outermost one never closed
+            position = int(np.flatnonzero(opening & (depth == 1))[-1])
+            raise UnbalancedParenthesesError(f"Unbalanced parentheses: the '(' at position {position} is never closed",position)
+
+        # Match the pairs:
+        # ----------------
+        # -*- COMMENT -*-
+        #   The level of a '(' is the depth after it, the one of a ')' the depth
+        # before it. Sorted by level then by position, the parentheses of each
+        # level alternate between an opening one and its closing one.
+        positions = np.flatnonzero(opening | closing)
+        levels = depth[positions] + closing[positions]
+        ordered = positions[np.lexsort((positions,levels))].reshape(-1,2)
+
+        self.parentheses = positions.tolist()
+        self.pairs = dict(zip(ordered[:,0].tolist(),ordered[:,1].tolist()))
+        self.pairs.update(zip(ordered[:,1].tolist(),ordered[:,0].tolist()))
+        self.max_depth = int(depth.max()) if depth.size else 0
+
+        # Top level operators:
+        # --------------------
+        is_operator = np.zeros(codes.shape,dtype=bool)
+        for operator in self.operators:
+            is_operator |= codes == ord(operator)
+        self.top_level_operators = np.flatnonzero(is_operator & (depth == 0)).tolist()
+
+    def matching(self, position:int) -> int:
+        """ Return the position of the parenthesis matching the one at 'position'. """
+
+        try:
+            return self.pairs[position]
+        except KeyError:
+            raise ValueError(f"There is no parenthesis at position {position}") from None
+
+    def top_level_groups(self) -> list[tuple[int,int]]:
+        """ Return the (start, end) positions of the outermost pairs of parentheses. """
+
+        groups = list()
+        position_iter = iter(self.parentheses)
+        for opening in position_iter:
+            closing = self.pairs[opening]
+            groups.append((opening,closing))
+            # Skip the parentheses nested in this group:
+            for position in position_iter:
+                if position == closing:
+                    break
+        return groups
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# 
+# ---------------------------------------------------------
+# ./src/renderers/__init__.py
+
+from .abbreviation_renderer import AbbreviationRenderer
+from .line_breaker import LineBreakRenderer
+from .minifier import minify
+from .template_cache import TemplateCache
\ No newline at end of file
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Rendering of a latex expression with abbreviations
+# ---------------------------------------------------------
+# ./src/renderers/abbreviation_renderer.py
+
+""" A class for rendering a latex expression with abbreviations.
+
+This module contains a class that detects the sub-expressions repeated
+in a latex expression, and renders each of them only once, as an
+abbreviation, replacing every occurrence with a short symbol.
+"""
+
+# Import statement:
+# =================
+from typing import Callable, Mapping, Optional, Union
+from txt2latex.src.baseComponent import latexComponent, treeWalker
+from txt2latex.src.baseComponent.loadOperator import _nullOperator
+from txt2latex.src.instrumentation.metrics import METRICS
+from py_utils import Logueur
+
+
+# Constant definition:
+# ====================
+_ABBREVIATION_STYLES = ("where", "newcommand")
+_PARENTHESIS = ("(", ")")
+
+
+# Class definition:
+# =================
+class AbbreviationRenderer():
+    """ AbbreviationRenderer class
+
+    An instance of this class can render a latex expression where the
+    repeated sub-expressions are replaced by abbreviations. Two styles
+    are available:
+    - 'where': the expression is followed by a 'where A_{1} = ...' block
+    - 'newcommand': the expression is preceded by '\\newcommand' definitions
+
+    The sub-expressions are compared structurally (same operators, same
+    elements and same nesting), only the sub-expressions repeated at least
+    twice and containing at least 'min_size' nodes are abbreviated.
+    """
+
+    def __init__(self, log:Logueur, style:str="where", min_size:int=10,
+                 command_prefix:str="txl") -> None:
+        """ Constructor of AbbreviationRenderer """
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if style not in _ABBREVIATION_STYLES:
+            raise ValueError(f"The style must be one of {_ABBREVIATION_STYLES}, instead I've received '{style}'")
+        if not isinstance(min_size,int) or min_size < 1:
+            raise ValueError(f"The minimal size must be a positive int, instead I've received '{min_size}'")
+        if not isinstance(command_prefix,str) or not command_prefix.isalpha():
+            raise ValueError(f"The command prefix must contain only letters, instead I've received '{command_prefix}'")
+
+        self.log = log
+        self.style = style
+        self.min_size = min_size
+        self.command_prefix = command_prefix
+
+    def _hash_structure(self, expr:latexComponent.LatexExpression) -> tuple[dict[int,int],dict[int,int]]:
+        """ Compute the structural identifiers of the sub-expressions.
+
+        Each sub-expression receives the identifier of its contents (its operators
+        and children, without its own delimitor), two sub-expressions having the
+        same identifier being structurally equal. The identifiers are computed
+        bottom-up, in a single post-order traversal, by interning the tuple
+        describing each node.
+
+        Arguments:
+        expr : LatexExpression
+            The root expression.
+
+        Return:
+        contents_ids : dict[int,int]
+            The contents identifier of each LatexExpression, by id of the node.
+        sizes : dict[int,int]
+            The number of nodes of each LatexExpression, by id of the node.
+        """
+
+        interned:dict[tuple,int] = dict()
+        node_ids:dict[int,int] = dict()
+        contents_ids:dict[int,int] = dict()
+        sizes:dict[int,int] = dict()
+
+        for node, _ in treeWalker.walk(expr,"post"):
+            if isinstance(node,latexComponent.LatexElement):
+                key = (node.mainContent, node.subScript, node.superScript)
+                node_ids[id(node)] = interned.setdefault(key,len(interned))
+                continue
+
+            contents_key = tuple((id(operator),node_ids[id(child)]) for operator,child in node.children)
+            contents_id = interned.setdefault(contents_key,len(interned))
+            key = (node.delimitor.openingCaracter, node.delimitor.closingCaracter, contents_id)
+            node_ids[id(node)] = interned.setdefault(key,len(interned))
+            contents_ids[id(node)] = contents_id
+            sizes[id(node)] = 1 + sum(sizes.get(id(child),1) for _,child in node.children)
+
+        # Each element is looked up once, and each expression twice:
+        lookups = len(node_ids) + len(contents_ids)
+        METRICS.record_lookups("abbreviation_interning",lookups - len(interned),len(interned))
+        return contents_ids, sizes
+
+    def _select(self, expr:latexComponent.LatexExpression, candidates:set[int],
+                contents_ids:dict[int,int]) -> tuple[dict[int,int],dict[int,latexComponent.LatexExpression]]:
+        """ Find the occurrences of the candidates that are actually rendered.
+
+        The main expression and the definition of each abbreviation are traversed
+        once, stopping at the occurrences of the candidates (their contents being
+        rendered in their own definition).
+
+        Return:
+        uses : dict[int,int]
+            The number of rendered occurrences of each candidate.
+        first_occurrences : dict[int,LatexExpression]
+            The first occurrence of each candidate, in order of appearance.
+        """
+
+        uses:dict[int,int] = dict()
+        first_occurrences:dict[int,latexComponent.LatexExpression] = dict()
+
+        def enter(node, depth:int) -> bool:
+            if depth == 0 or not isinstance(node,latexComponent.LatexExpression):
+                return True
+            contents_id = contents_ids[id(node)]
+            if contents_id not in candidates:
+                return True
+            uses[contents_id] = uses.get(contents_id,0) + 1
+            if contents_id not in first_occurrences:
+                first_occurrences[contents_id] = node
+                pending.append(node)
+            return False
+
+        pending = [expr]
+        while pending:
+            treeWalker.visit(pending.pop(),enter=enter)
+
+        return uses, first_occurrences
+
+    def _symbol(self, idx:int) -> str:
+        """ Return the symbol of the idx-th abbreviation. """
+
+        if self.style == "where":
+            return f"A_{"{"}{idx+1}{"}"}"
+
+        letters = ""
+        idx += 1
+        while idx:
+            idx, remainder = divmod(idx-1,26)
+            letters = chr(ord('A')+remainder) + letters
+        return f"\\{self.command_prefix}{letters}"
+
+    def _substitute(self, expr:latexComponent.LatexExpression, symbols:dict[int,str],
+                    contents_ids:dict[int,int], delimitor:latexComponent.LatexDelimitor) \
+                    -> latexComponent.LatexExpression:
+        """ Copy an expression, replacing the abbreviated sub-expressions by their symbol.
+
+        The copy is built bottom-up, so the original expression is unchanged. An
+        abbreviated sub-expression keeps its delimitor, unless it is a simple pair
+        of parenthesis (made redundant by the symbol).
+        """
+
+        copies:dict[int,Union[latexComponent.LatexExpression,latexComponent.LatexElement]] = dict()
+
+        def enter(node, depth:int) -> bool:
+            if depth == 0 or not isinstance(node,latexComponent.LatexExpression):
+                return True
+            symbol = symbols.get(contents_ids[id(node)])
+            if symbol is None:
+                return True
+
+            element = latexComponent.LatexElement(symbol if self.style == "where" else "{" + symbol + "}")
+            opening, closing = node.delimitor.openingCaracter, node.delimitor.closingCaracter
+            if (opening, closing) in (_PARENTHESIS, ("","")):
+                copies[id(node)] = element
+            else:
+                wrapper = latexComponent.LatexExpression(node.delimitor)
+                wrapper.add_children(_nullOperator,element)
+                copies[id(node)] = wrapper
+            return False
+
+        def leave(node, depth:int) -> None:
+            if not isinstance(node,latexComponent.LatexExpression):
+                return
+            copy = latexComponent.LatexExpression(delimitor if depth == 0 else node.delimitor)
+            for operator, child in node.children:
+                copy.add_children(operator,copies.pop(id(child),child))
+            copies[id(node)] = copy
+
+        treeWalker.visit(expr,enter=enter,leave=leave)
+        return copies[id(expr)]
+
+    def abbreviate(self, expr:latexComponent.LatexExpression) \
+                   -> tuple[latexComponent.LatexExpression,list[tuple[str,latexComponent.LatexExpression]]]:
+        """ Replace the repeated sub-expressions of an expression by abbreviations.
+
+        Arguments:
+        expr : LatexExpression
+            The expression to abbreviate.
+
+        Return:
+        main_expr : LatexExpression
+            A copy of the expression, with the abbreviated sub-expressions replaced
+            by their symbol.
+        definitions : list[tuple[str,LatexExpression]]
+            The symbol and the contents of each abbreviation, in order of appearance.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(expr,latexComponent.LatexExpression):
+            raise TypeError(f"The expression to abbreviate must be a LatexExpression, instead I've received a '{type(expr)}'")
+
+        # Find the candidates:
+        # --------------------
+        contents_ids, sizes = self._hash_structure(expr)
+        occurrences:dict[int,int] = dict()
+        for node_id, contents_id in contents_ids.items():
+            if node_id != id(expr):
+                occurrences[contents_id] = occurrences.get(contents_id,0) + 1
+        candidates = {contents_id for node_id, contents_id in contents_ids.items()
+                      if sizes[node_id] >= self.min_size and occurrences.get(contents_id,0) > 1}
+
+        # -*- COMMENT -*-
+        #   A sub-expression repeated only inside an other abbreviated sub-expression
+        # is finally rendered only once, in the definition of the latter. So the
+        # candidates used only once are removed until all of them are repeated.
+        while True:
+            uses, first_occurrences = self._select(expr,candidates,contents_ids)
+            unused = {contents_id for contents_id in candidates if uses.get(contents_id,0) < 2}
+            if not unused:
+                break
+            candidates -= unused
+
+        self.log.info(f"Found {len(first_occurrences)} repeated sub-expressions to abbreviate")
+
+        # Build the abbreviated expressions:
+        # ----------------------------------
+        symbols = {contents_id:self._symbol(idx) for idx,contents_id in enumerate(first_occurrences)}
+        null_delimitor = latexComponent.LatexDelimitor()
+        main_expr = self._substitute(expr,symbols,contents_ids,expr.delimitor)
+        definitions = [(symbols[contents_id],self._substitute(node,symbols,contents_ids,null_delimitor))
+                       for contents_id,node in first_occurrences.items()]
+
+        return main_expr, definitions
+
+    def render(self, expr:latexComponent.LatexExpression,
+               operators:Optional[Mapping[str,Callable[[str,str],str]]]=None) -> str:
+        """ Render an expression with its repeated sub-expressions abbreviated.
+
+        Arguments:
+        expr : LatexExpression
+            The expression to render.
+        operators : Mapping[str,Callable] | None
+            The operator set formatting the operators (see LatexExpression.render).
+
+        Return:
+        str
+            The rendered expression, with the definitions of the abbreviations.
+        """
+
+        main_expr, definitions = self.abbreviate(expr)
+        if not definitions:
+            return main_expr.render(operators)
+
+        if self.style == "newcommand":
+            lines = [f"\\newcommand{"{"}{symbol}{"}"}{"{"}{definition.render(operators)}{"}"}"
+                     for symbol,definition in definitions]
+            lines.append(main_expr.render(operators))
+            return "\n".join(lines)
+
+        lines = [main_expr.render(operators)]
+        lines.extend(f"\\quad {symbol} = {definition.render(operators)}" for symbol,definition in definitions)
+        lines[1] = "\\quad\\text{where}" + lines[1]
+        return ",\n".join(lines)
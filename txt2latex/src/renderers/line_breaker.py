@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Rendering of a latex expression on several rows
+# ---------------------------------------------------------
+# ./src/renderers/line_breaker.py
+
+""" A class for rendering a latex expression broken in rows of a target width.
+
+This module contains a class that renders a latex expression as the rows of
+a 'split' or a 'multline' environment, for the expressions too long to be
+laid out on a single line by TeX.
+
+The rows are broken before the '+' and '-' operators: preferably the ones
+at the top level of the expression, then the ones of the sums nested in
+parentheses when a top-level term is longer than a row. The operators in
+a group (a fraction, a square root, a superscript...) or between '\\left'
+and '\\right' are never broken, TeX not allowing a line break there.
+"""
+
+# Import statement:
+# =================
+import re
+from typing import Callable, Mapping, Optional
+
+from txt2latex.src.baseComponent import latexComponent
+from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS_DICT
+from py_utils import Logueur
+
+
+# Constant definition:
+# ====================
+LINE_ENVIRONMENTS = ("split", "multline")
+# The target width of a row, in caracters of the LaTeX source:
+LINE_WIDTH = 100
+# The separator of two rows:
+ROW_BREAK = " \\\\\n"
+# -*- COMMENT -*-
+#   The break points are marked in the rendering of the expression, by the
+# formatting of the '+' and '-' operators, and found by a single scan of the
+# rendering counting the groups, the '\left' delimiters and the parentheses.
+# The delimiter following '\left' and '\right' is consumed with them.
+_BREAK = "\x02"
+_TOKEN = re.compile(r"\\(?:left|right)(?![A-Za-z])(?:\\[A-Za-z]+|\\.|.)?|\\.|[{}()\x02]", re.DOTALL)
+_BREAKABLE_OPERATORS = ("+", "-")
+
+
+# Class definition:
+# =================
+class LineBreakRenderer():
+    """ LineBreakRenderer class
+
+    An instance of this class renders a latex expression in rows of about
+    'width' caracters of LaTeX source, separated by '\\\\'. The rows are
+    formatted for an environment:
+    - 'split': each row is aligned on the left ('&'), the rows following
+      the first one being indented by a '\\quad'
+    - 'multline': the rows are unchanged, the environment laying them out
+
+    A row is longer than the width when there is no break point in it (e.g.
+    a long fraction). An expression shorter than the width is a single row.
+    """
+
+    def __init__(self, log:Logueur, width:int=LINE_WIDTH, environment:str="split") -> None:
+        """ Constructor of LineBreakRenderer """
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if not isinstance(width,int) or width < 1:
+            raise ValueError(f"The width must be a positive int, instead I've received '{width}'")
+        if environment not in LINE_ENVIRONMENTS:
+            raise ValueError(f"The environment must be one of {LINE_ENVIRONMENTS}, instead I've received '{environment}'")
+
+        self.log = log
+        self.width = width
+        self.environment = environment
+
+    def _marking_operators(self, operators:Optional[Mapping[str,Callable[[str,str],str]]]) \
+                           -> dict[str,Callable[[str,str],str]]:
+        """ Return the operator set marking a break point before each '+' and '-' operator. """
+
+        marking = dict(operators or {})
+        for symbol in _BREAKABLE_OPERATORS:
+            formatting = marking.get(symbol) or _LEVEL0_OPERATORS_DICT[symbol].formate
+            marking[symbol] = lambda expr1, expr2, formatting=formatting: formatting(expr1 + _BREAK,expr2)
+        return marking
+
+    def _break_points(self, marked:str) -> list[tuple[int,int]]:
+        """ Find the break points of a marked rendering, with their depth in parentheses.
+
+        The break points in a group or between '\\left' and '\\right' are dropped,
+        as well as the ones with nothing before them in their row.
+        """
+
+        points:list[tuple[int,int]] = list()
+        braces, lefts, parentheses = 0, 0, 0
+        last = 0
+        for match in _TOKEN.finditer(marked):
+            token = match.group()
+            if token == _BREAK:
+                if braces == 0 and lefts == 0 and marked[last:match.start()].strip(" ("):
+                    points.append((match.start(),parentheses))
+                    last = match.end()
+            elif token == "{":
+                braces += 1
+            elif token == "}":
+                braces -= 1
+            elif token.startswith("\\left"):
+                lefts += 1
+            elif token.startswith("\\right"):
+                lefts -= 1
+            elif braces == 0 and lefts == 0:
+                if token == "(":
+                    parentheses += 1
+                elif token == ")":
+                    parentheses -= 1
+        return points
+
+    def rows(self, expr:latexComponent.LatexExpression,
+             operators:Optional[Mapping[str,Callable[[str,str],str]]]=None) -> list[str]:
+        """ Render an expression as rows of about the width of the instance.
+
+        The expression is rendered once, with its break points marked. Each row
+        is then broken at the last break point of the lowest depth in parentheses
+        within the width, or at the first break point after it when there is none.
+
+        Arguments:
+        expr : LatexExpression
+            The expression to render.
+        operators : Mapping[str,Callable] | None
+            The operator set formatting the operators (see LatexExpression.render).
+
+        Return:
+        list[str]
+            The rows of the rendered expression.
+        """
+
+        marked = expr.render(self._marking_operators(operators))
+        points = self._break_points(marked)
+
+        rows:list[str] = list()
+        start, index = 0, 0
+        while len(marked) - start > self.width and index < len(points):
+            best = None
+            while index < len(points) and points[index][0] - start <= self.width:
+                if best is None or points[index][1] <= points[best][1]:
+                    best = index
+                index += 1
+            if best is None:
+                best = index
+            rows.append(marked[start:points[best][0]].replace(_BREAK,"").strip())
+            start, index = points[best][0], best + 1
+        rows.append(marked[start:].replace(_BREAK,"").strip())
+        return rows
+
+    def render(self, expr:latexComponent.LatexExpression,
+               operators:Optional[Mapping[str,Callable[[str,str],str]]]=None) -> str:
+        """ Render an expression in rows, formatted for the environment of the instance.
+
+        Arguments:
+        expr : LatexExpression
+            The expression to render.
+        operators : Mapping[str,Callable] | None
+            The operator set formatting the operators (see LatexExpression.render).
+
+        Return:
+        str
+            The rows separated by 'ROW_BREAK', or the single row of the expression.
+        """
+
+        rows = self.rows(expr,operators)
+        if len(rows) == 1:
+            return rows[0]
+        if self.environment == "split":
+            rows = ["&" + rows[0]] + ["&\\quad " + row for row in rows[1:]]
+        return ROW_BREAK.join(rows)
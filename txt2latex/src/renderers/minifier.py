@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Minification of a rendered latex expression
+# ---------------------------------------------------------
+# ./src/renderers/minifier.py
+
+""" A function minifying a rendered latex expression.
+
+This module contains a function that removes from a latex expression the
+caracters that don't change its meaning, for delivering huge expressions
+to a math renderer in a browser (KaTeX, MathJax):
+- the braces around a single caracter in a subscript or a superscript
+  ('p^{2}' -> 'p^2'), or as the argument of '\\frac', '\\sqrt' and
+  '\\overline' ('\\frac{1}{x}' -> '\\frac1x')
+- the spaces, except the one ending a control word followed by a letter
+  ('a \\cdot b' -> 'a\\cdot b')
+
+The '\\left' and '\\right' delimiters are kept: they size the delimiter to
+its content and change the spacing around it, '(' and ')' aren't the same.
+"""
+
+# Import statement:
+# =================
+import re
+
+
+# Constant definition:
+# ====================
+# -*- COMMENT -*-
+#   The expression is minified by a single substitution. The alternatives are
+# tried in their order at each position: the groups of a single caracter are
+# matched before the control words, and the spaces following a control word
+# are matched with it (the space being kept before a letter).
+_MINIFIABLE = re.compile(r"\\frac\{([A-Za-z0-9])\}\{([A-Za-z0-9])\}"
+                         r"|\\(sqrt|overline)\{([A-Za-z0-9])\}"
+                         r"|([_^])\{([A-Za-z0-9])\}"
+                         r"|(\\[A-Za-z]+) *"
+                         r"| +")
+
+
+# Function definition:
+# ====================
+def _separator(following:str) -> str:
+    """ Return the space separating a control word from the caracter following it, if needed. """
+    return " " if following.isascii() and following.isalpha() else ""
+
+def _minified(match:re.Match) -> str:
+    numerator, denominator, function, argument, script, scripted, command = match.groups()
+    if numerator is not None:
+        return "\\frac" + _separator(numerator) + numerator + denominator
+    if function is not None:
+        return "\\" + function + _separator(argument) + argument
+    if script is not None:
+        return script + scripted
+    if command is not None:
+        end = match.end()
+        return command + _separator(match.string[end:end+1])
+    return ""
+
+def minify(f_expr:str) -> str:
+    """ Minify a rendered latex expression, without changing its meaning.
+
+    Arguments:
+    f_expr : str
+        The rendered latex expression.
+
+    Return:
+    str
+        The minified expression.
+
+    Raise:
+    TypeError : When the argument isn't of the correct type
+    """
+
+    # Type Check:
+    # -----------
+    if not isinstance(f_expr,str):
+        raise TypeError(f"The expression to minify must be a string, instead I've received a '{type(f_expr)}'")
+
+    return _MINIFIABLE.sub(_minified,f_expr)
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Cache of the renderings of the expressions by shape
+# ---------------------------------------------------------
+# ./src/renderers/template_cache.py
+
+""" A cache rendering the expressions of a known shape without parsing them.
+
+This module contains a cache of render plans, keyed by the shape of the
+text expressions: their operators, parentheses, function calls and
+whitespaces, the terms (the names and the numbers) being replaced by a
+placeholder. The expressions 'H_1^2/(s + w_1)' and 'H_2^2/(s + w_2)' have
+the same shape.
+
+The render plan of a shape is the rendering of its expressions with a slot
+for each term. An expression whose shape has a plan is rendered by filling
+the slots with the rendering of its terms: the parsers and the rendering
+by priority of the operators are skipped.
+"""
+
+# Import statement:
+# =================
+import re
+import threading
+from typing import Callable, Mapping, Optional, Union
+
+from txt2latex.src.baseComponent import latexComponent, treeWalker
+from txt2latex.src.baseComponent.loadOperator import _LEVEL0_OPERATORS
+from txt2latex.src.parsers.latex_parser import _get_term_pattern
+from txt2latex.src.instrumentation.metrics import METRICS
+
+
+# Constant definition:
+# ====================
+# The number of shapes (and of rendered terms) kept by default:
+TEMPLATE_CACHE_SIZE = 1 << 12
+# -*- COMMENT -*-
+#   A term is a run of caracters that aren't an operator, a parenthesis or a
+# whitespace. The name preceding an opening parenthesis (a function call) is
+# part of the shape: the possessive run isn't matched before a parenthesis.
+_TERM = re.compile(r"([^\s+\-*/()]++)(?!\()")
+_PLACEHOLDER = "\x00"
+_SLOT = re.compile(r"\x00([0-9]+)\x01")
+# The shapes seen once, and the ones whose terms aren't rendered independently:
+_SEEN = object()
+_UNCACHEABLE = object()
+_templates_counter = METRICS.cache("render_templates")
+
+
+# Class definition:
+# =================
+class Template():
+    """ Template class
+
+    An instance of this class is the shape of an expression that has been
+    seen before without render plan: its plan is compiled from the parse of
+    the expression (see TemplateCache.compile).
+    """
+
+    __slots__ = ("key","terms")
+
+    def __init__(self, key:str, terms:list[str]) -> None:
+        self.key = key
+        self.terms = terms
+
+
+class TemplateCache():
+    """ TemplateCache class
+
+    An instance of this class renders the expressions whose shape is known,
+    with the render plan of the shape. The plan of a shape is compiled when
+    it is seen for the second time, from the parsed expression: the shapes
+    seen once don't cost more than their key. A shape is never cached when
+    its terms aren't rendered one by one (e.g. 'a b', rendered as a single
+    term 'ab').
+
+    At most 'max_size' shapes are kept, the oldest ones being dropped first.
+    The plans depend on the formatting of the operators and on the options
+    of the parse (like the normalisation): a cache must only be used by
+    translators of the same configuration. The hits and misses are recorded
+    in the metrics, as the 'render_templates' cache.
+
+    The lookups don't take a lock, the plans being added under the lock of
+    the instance: an instance can be used from several threads.
+    """
+
+    def __init__(self, max_size:int=TEMPLATE_CACHE_SIZE) -> None:
+        """ Constructor of TemplateCache """
+
+        # Type Check:
+        # -----------
+        if not isinstance(max_size,int) or max_size < 1:
+            raise ValueError(f"The maximal size must be a positive int, instead I've received '{max_size}'")
+
+        self.max_size = max_size
+        self._plans:dict[str,object] = dict()
+        self._terms:dict[str,Optional[str]] = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """ Return the number of shapes with a render plan. """
+        return sum(1 for plan in list(self._plans.values()) if isinstance(plan,str))
+
+    def _term(self, term:str) -> Optional[str]:
+        """ Render a term as the LatexParser would, None when it isn't a single valid term. """
+
+        rendering = self._terms.get(term,False)
+        if rendering is not False:
+            return rendering
+
+        pattern, _ = _get_term_pattern(_LEVEL0_OPERATORS)
+        match = pattern.match(term)
+        rendering = None
+        if match is not None and match.end() == len(term):
+            _, number, mainContent, subScript, superScript, _ = match.groups()
+            if number is not None:
+                rendering = number
+            elif mainContent is not None:
+                rendering = str(latexComponent.LatexElement.from_parts(mainContent,subScript,superScript))
+        if len(self._terms) >= self.max_size:
+            self._terms.clear()
+        self._terms[term] = rendering
+        return rendering
+
+    def _store(self, key:str, plan:object) -> None:
+        with self._lock:
+            if key not in self._plans:
+                while len(self._plans) >= self.max_size:
+                    del self._plans[next(iter(self._plans))]
+            self._plans[key] = plan
+
+    def lookup(self, expr:str) -> Union[str,Template,None]:
+        """ Render an expression with the plan of its shape.
+
+        Arguments:
+        expr : str
+            The expression to render.
+
+        Return:
+        str | Template | None
+            The rendered expression when its shape has a plan; else the Template
+            of the expression when its shape has already been seen, for compiling
+            its plan after parsing it; else None.
+        """
+
+        if _PLACEHOLDER in expr:
+            return None
+        parts = _TERM.split(expr)
+        key, terms = _PLACEHOLDER.join(parts[0::2]), parts[1::2]
+
+        plan = self._plans.get(key)
+        if isinstance(plan,str):
+            renderings = [self._term(term) for term in terms]
+            if None not in renderings:
+                _templates_counter.hits += 1
+                return plan.format(*renderings)
+        _templates_counter.misses += 1
+
+        if plan is None:
+            self._store(key,_SEEN)
+        elif plan is _SEEN:
+            return Template(key,terms)
+        return None
+
+    def compile(self, template:Template, latex_expr:latexComponent.LatexExpression,
+                operators:Optional[Mapping[str,Callable[[str,str],str]]]=None) -> bool:
+        """ Compile and store the render plan of a shape, from an expression of this shape.
+
+        The expression is rendered with a slot in place of each element. The plan
+        is only stored when each slot is rendered once, in the order of the terms
+        of the text, and each element is the rendering of its term.
+
+        Arguments:
+        template : Template
+            The shape of the expression, returned by 'lookup'.
+        latex_expr : LatexExpression
+            The parsed expression.
+        operators : Mapping[str,Callable] | None
+            The operator set of the rendering (see LatexExpression.render).
+
+        Return:
+        bool
+            Whether the shape can be rendered with a plan.
+        """
+
+        # Replace the elements by slots:
+        # ------------------------------
+        elements:list[latexComponent.LatexElement] = list()
+        copies:dict[int,Union[latexComponent.LatexExpression,latexComponent.LatexElement]] = dict()
+
+        def leave(node, depth:int) -> None:
+            if isinstance(node,latexComponent.LatexElement):
+                copies[id(node)] = latexComponent.LatexElement.from_parts(f"\x00{len(elements)}\x01")
+                elements.append(node)
+                return
+            copies[id(node)] = latexComponent.LatexExpression.from_children(
+                node.delimitor,[(operator,copies[id(child)]) for operator, child in node.children])
+
+        treeWalker.visit(latex_expr,leave=leave)
+        parts = _SLOT.split(copies[id(latex_expr)].render(operators))
+
+        # Check the slots:
+        # ----------------
+        valid = (len(elements) == len(template.terms)
+                 and [int(slot) for slot in parts[1::2]] == list(range(len(elements)))
+                 and all(str(element) == self._term(term) for element, term in zip(elements,template.terms)))
+        if not valid:
+            self._store(template.key,_UNCACHEABLE)
+            return False
+        self._store(template.key,"{}".join(part.replace("{","{{").replace("}","}}") for part in parts[0::2]))
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+            self._terms.clear()
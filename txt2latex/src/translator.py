@@ -0,0 +1,594 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Translation of a text expression to a latex expression
+# ---------------------------------------------------------
+# ./src/translator.py
+
+""" A class chaining the parsers for translating an expression.
+
+This module contains a class that translates a text expression to
+a latex one, by chaining the different stages of the translation:
+0. template (optional): the text expression is rendered with the render
+   plan of its shape, skipping the next stages when its shape has one
+0. ast_parse (optional): the text expression is parsed by the ast module
+   to a LatexExpression, skipping the next stages when it succeeds
+1. logical_parse: the text expression is parsed to a LogicalBlock
+2. normalize (optional): the redundant blocks of the LogicalBlock are collapsed
+3. latex_parse: the LogicalBlock is parsed to a LatexExpression
+4. render: the LatexExpression is rendered to a string
+
+An expression can also be parsed once (see Translator.parse) and rendered
+in several styles, by choosing the formatting of its operators when it is
+rendered (see Translator.render).
+
+The expression can also be given in chunks, which are parsed as they
+arrive (see Translator.translate_chunks). The translation of a huge
+expression can be previewed, by translating only the beginning of it
+(see Translator.preview).
+"""
+
+# Import statement:
+# =================
+import bisect
+import functools
+import re
+import time
+from contextlib import ExitStack
+from typing import Callable, Iterable, Mapping, Optional, Union
+
+from txt2latex.src.baseComponent import latexComponent, logicalComponent
+from txt2latex.src.baseComponent.loadOperator import getOperatorSets
+from txt2latex.src.parsers import LogicalParser, LatexParser, LogicalNormalizer, IncrementalLogicalParser, ParseContext, \
+    AstParser, StructuralIndex
+from txt2latex.src.parsers.resource_limits import ResourceLimits, ResourceLimitError, NestingTooDeepError, texttt_fallback
+from txt2latex.src.renderers.template_cache import TemplateCache, Template
+from txt2latex.src.renderers.minifier import minify
+from txt2latex.src.instrumentation import MemoryReport
+from txt2latex.src.instrumentation.metrics import METRICS, MetricsRegistry, utf8_size
+from py_utils import Logueur
+
+
+# Constant definition:
+# ====================
+# -*- COMMENT -*-
+#   A '+' or '-' between two plain terms: the parse of the text preceding it
+# isn't changed by the text following it. A group followed by operators and
+# empty groups may be the numerator of a fraction when one of the operators
+# is a '/': the boundaries inside it aren't used, the parsers deciding how the
+# operators following it are resolved.
+_TERM_BOUNDARY = re.compile(r"(?<=[A-Za-z0-9_.])\s*[+-](?=\s*[A-Za-z0-9_.]+(?![A-Za-z0-9_.(]))")
+_OPERATORS_RUN = re.compile(r"(?:[\s+\-*/]|[A-Za-z0-9_]*\((?:[\s+\-*/]|[A-Za-z0-9_]*\(\s*\))*\))*")
+_OPERATOR_CHARS = frozenset(" \t\n+-*/")
+# The number of caracters of the expression kept in a fallback without 'max_output':
+FALLBACK_SIZE = 1 << 12
+FRONTENDS = ("logical","ast")
+
+
+# Class definition:
+# =================
+class Translator():
+    """ Translator class
+
+    An instance of this class can translate a text expression to a latex
+    one. Some configuration is possible when constructing an instance:
+    - functions: the functions recognized by the parsers
+    - renderer: an object with a 'render' method used instead of 'str'
+      for rendering the LatexExpression (e.g. an AbbreviationRenderer)
+    - memory_report: if True, the memory allocated by each stage of the
+      translation is traced, and the report of the latest translation is
+      stored in the 'last_memory_report' attribute
+    - normalize: if True, the redundant blocks of the logical expression,
+      like the nested or unneeded parentheses, are collapsed before it is
+      parsed to a latex expression
+    - limits: the ResourceLimits of each translation, exceeding one raising
+      a ResourceLimitError
+    - fallback: if True, the expressions exceeding a limit are rendered as
+      raw text in '\\texttt{}' (at most 'max_output' or FALLBACK_SIZE
+      caracters of it) instead of raising an error
+    - metrics: the MetricsRegistry recording the size, the errors and the
+      time of each stage of the translations, METRICS by default (None for
+      not recording them)
+    - frontend: "logical" (by default) for parsing the expressions with the
+      LogicalParser and the LatexParser, or "ast" for parsing them with the
+      ast module first (see AstParser), falling back to the two parsers
+    - operators: the operator set formatting the operators when rendering,
+      given by its name in 'getOperatorSets' or as a mapping from the symbol
+      of an operator to its formatting function (the formatting of the
+      operators themselves by default)
+    - templates: a TemplateCache rendering the expressions of an already
+      translated shape (the same operators, parentheses and functions, with
+      other names and numbers) without parsing them, used for the text
+      expressions given at once; it can't be used with a renderer
+    - minify: if True, the translations are minified (see 'minify'): the
+      braces of the single caracter scripts and arguments and the spaces
+      not needed by a math renderer are removed
+
+    The beginning of the translation of a huge expression can be previewed
+    with the 'preview' method, which only parses the beginning of it.
+
+    The stages of a translation can be observed by objects with a 'stage'
+    method, taking the name of the stage and returning a context manager.
+    The context manager is entered around the stage and returns a dict, in
+    which the result of the stage is stored under the 'result' key. If the
+    observer also has a 'translation' method, the context manager it returns
+    is entered around the whole translation.
+    """
+
+    def __init__(self, log:Logueur, functions:Optional[dict[str,latexComponent.LatexDelimitor]]=None,
+                 renderer=None, memory_report:bool=False, normalize:bool=False,
+                 limits:Optional[ResourceLimits]=None, fallback:bool=False,
+                 metrics:Optional[MetricsRegistry]=METRICS, frontend:str="logical",
+                 operators:Union[str,Mapping[str,Callable[[str,str],str]],None]=None,
+                 templates:Optional[TemplateCache]=None, minify:bool=False) -> None:
+        """ Constructor of Translator """
+
+        # Type Check:
+        # -----------
+        if not isinstance(log,Logueur):
+            raise ValueError(f"The log must be a Logueur, instead I've received a '{type(log)}'")
+        if renderer is not None and not callable(getattr(renderer,"render",None)):
+            raise TypeError(f"The renderer must have a 'render' method, instead I've received a '{type(renderer)}'")
+        if limits is not None and not isinstance(limits,ResourceLimits):
+            raise TypeError(f"The limits must be a ResourceLimits, instead I've received a '{type(limits)}'")
+        if metrics is not None and not isinstance(metrics,MetricsRegistry):
+            raise TypeError(f"The metrics must be a MetricsRegistry, instead I've received a '{type(metrics)}'")
+        if frontend not in FRONTENDS:
+            raise ValueError(f"The front-end must be one of {FRONTENDS}, instead I've received '{frontend}'")
+        if templates is not None and not isinstance(templates,TemplateCache):
+            raise TypeError(f"The templates must be a TemplateCache, instead I've received a '{type(templates)}'")
+        if templates is not None and renderer is not None:
+            raise ValueError("The template cache can't be used with a renderer")
+        if frontend == "ast" and normalize:
+            raise ValueError("The expressions parsed by the ast front-end can't be normalised")
+
+        # Initialize instance:
+        # --------------------
+        self.log = log
+        self.logical_parser = LogicalParser(log,functions,limits)
+        self.latex_parser = LatexParser(log,functions,limits)
+        self.ast_parser = AstParser(log,functions,limits) if frontend == "ast" else None
+        self.limits = limits
+        self.fallback = fallback
+        self.normalizer = LogicalNormalizer(log) if normalize else None
+        self.renderer = renderer
+        self.operators = self._operator_set(operators)
+        self.templates = templates
+        self.minify = minify
+        self.memory_report = memory_report
+        self.last_memory_report:Optional[MemoryReport] = None
+        self.metrics = metrics
+        self.observers:list = list()
+
+    def _stage(self, name:str, func:Callable, arg, observers:list, timings:dict[str,float]):
+        """ Run a stage of the translation under the given observers, storing its time in 'timings'. """
+
+        start = time.perf_counter()
+        if not observers:
+            result = func(arg)
+        else:
+            with ExitStack() as stack:
+                infos = [stack.enter_context(observer.stage(name)) for observer in observers]
+                result = func(arg)
+                for info in infos:
+                    info['result'] = result
+        timings[name] = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _operator_set(operators:Union[str,Mapping[str,Callable[[str,str],str]],None]) \
+                      -> Optional[Mapping[str,Callable[[str,str],str]]]:
+        """ Return the operator set of the given name, or the given mapping (None for the default formatting). """
+
+        if operators is None or isinstance(operators,Mapping):
+            return operators or None
+        if not isinstance(operators,str):
+            raise TypeError(f"The operators must be the name of an operator set or a dict, instead I've received a '{type(operators)}'")
+        operator_sets = getOperatorSets()
+        if operators not in operator_sets:
+            raise ValueError(f"The operator set must be one of {tuple(operator_sets)}, instead I've received '{operators}'")
+        return operator_sets[operators] or None
+
+    def render(self, latex_expr:latexComponent.LatexExpression,
+               operators:Union[str,Mapping[str,Callable[[str,str],str]],None]=None) -> str:
+        """ Render a LatexExpression with the renderer of the instance.
+
+        Arguments:
+        latex_expr : LatexExpression
+            The expression to render, e.g. returned by 'parse'.
+        operators : str | Mapping[str,Callable] | None
+            The operator set formatting the operators, given by its name or as a
+            mapping (the one of the instance if not given).
+
+        Return:
+        str
+            The rendered latex expression.
+        """
+
+        operators = self.operators if operators is None else self._operator_set(operators)
+        if self.renderer is not None:
+            # The renderers without operator set only take the expression:
+            if operators is None:
+                f_expr = self.renderer.render(latex_expr)
+            else:
+                f_expr = self.renderer.render(latex_expr,operators)
+        else:
+            f_expr = latex_expr.render(operators)
+        return minify(f_expr) if self.minify else f_expr
+
+    def parse(self, expr:str) -> latexComponent.LatexExpression:
+        """ Parse a text expression to a latex expression, without rendering it.
+
+        The expression can then be rendered any number of times with 'render', with
+        different operator sets, without being parsed again. The stages aren't
+        observed, nor recorded in the metrics.
+
+        Arguments:
+        expr : str
+            The expression to parse.
+
+        Return:
+        LatexExpression
+            The parsed latex expression.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        ResourceLimitError : When the parse exceeds one of its limits
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(expr,str):
+            raise TypeError(f"The expression to parse must be a string, instead I've received a '{type(expr)}'")
+
+        context = ParseContext(self.limits) if self.limits is not None else None
+        if self.ast_parser is not None and (latex_expr := self.ast_parser.try_parse(expr,context)) is not None:
+            return latex_expr
+        logical_expr = self.logical_parser.parse(expr,context=context)
+        if self.normalizer is not None:
+            logical_expr = self.normalizer.normalize(logical_expr)
+        return self.latex_parser.parse(logical_expr,context=context)
+
+    def _translate(self, parse:Callable, arg, report:Optional[MemoryReport], timings:dict[str,float],
+                   front:Optional[Callable]=None, lookup:Optional[Callable]=None) -> str:
+        """ Run the stages of a translation, the first one being 'parse(arg)', storing their time in 'timings'.
+
+        When given, 'front(arg)' is tried first (the 'ast_parse' stage): the parse
+        stages are skipped when it returns a LatexExpression. Likewise 'lookup(arg)'
+        (the 'template' stage) is tried before all the stages, and returns the
+        rendered expression, or the Template whose plan is compiled at the end.
+        """
+
+        # Observers:
+        # ----------
+        observers = list(self.observers)
+        if report is not None:
+            observers.append(report)
+
+        # Start process:
+        # --------------
+        with ExitStack() as stack:
+            for observer in observers:
+                if hasattr(observer,"translation"):
+                    stack.enter_context(observer.translation())
+
+            template = None
+            if lookup is not None:
+                template = self._stage("template",lookup,arg,observers,timings)
+                if isinstance(template,str):
+                    if self.minify:
+                        template = minify(template)
+                    if self.limits is not None:
+                        self.limits.check_length(len(arg))
+                        self.limits.check_output(len(template))
+                    if report is not None:
+                        self.last_memory_report = report
+                    return template
+
+            # The stages of the translation share the deadline of the context:
+            context = ParseContext(self.limits) if self.limits is not None else None
+            latex_expr = None
+            if front is not None:
+                latex_expr = self._stage("ast_parse",functools.partial(front,context=context),arg,observers,timings)
+
+            if latex_expr is None:
+                logical_expr = self._stage("logical_parse",functools.partial(parse,context=context),arg,observers,timings)
+                self.log.info("Expression translated successfully to a logical expression")
+
+                if self.normalizer is not None:
+                    logical_expr = self._stage("normalize",self.normalizer.normalize,logical_expr,observers,timings)
+                    self.log.info("Logical expression normalised successfully")
+
+                latex_expr = self._stage("latex_parse",functools.partial(self.latex_parser.parse,context=context),
+                                         logical_expr,observers,timings)
+                self.log.info("Logical expression translated successfully to a latex expression")
+
+            try:
+                f_expr = self._stage("render",self.render,latex_expr,observers,timings)
+            except RecursionError:
+                raise NestingTooDeepError(None) from None
+            if self.limits is not None:
+                self.limits.check_output(len(f_expr))
+            if isinstance(template,Template):
+                self.templates.compile(template,latex_expr,self.operators)
+
+        if report is not None:
+            self.last_memory_report = report
+
+        return f_expr
+
+    def translate(self, expr:str) -> str:
+        """ Translate a text expression to a latex expression.
+
+        Arguments:
+        expr : str
+            The expression to translate.
+
+        Return:
+        str
+            The rendered latex expression.
+
+        Raise:
+        TypeError : When the argument isn't of the correct type
+        ResourceLimitError : When the translation exceeds one of its limits, without fallback
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(expr,str):
+            raise TypeError(f"The expression to translate must be a string, instead I've received a '{type(expr)}'")
+
+        report = MemoryReport(utf8_size(expr)) if self.memory_report else None
+        timings:dict[str,float] = dict()
+        try:
+            f_expr = self._translate(self.logical_parser.parse,expr,report,timings,
+                                     self.ast_parser.try_parse if self.ast_parser is not None else None,
+                                     self.templates.lookup if self.templates is not None else None)
+        except Exception as error:
+            return self._failed(expr,error,utf8_size(expr) if self.metrics is not None else 0)
+        if self.metrics is not None:
+            self.metrics.record_translation(utf8_size(expr),utf8_size(f_expr),timings)
+        return f_expr
+
+    def translate_chunks(self, chunks:Iterable[str]) -> str:
+        """ Translate a text expression given in chunks to a latex expression.
+
+        The chunks are parsed as they are iterated (e.g. while they are read from
+        a pipe) by an IncrementalLogicalParser, without joining them.
+
+        Arguments:
+        chunks : Iterable[str]
+            The successive chunks of the expression to translate.
+
+        Return:
+        str
+            The rendered latex expression.
+
+        Raise:
+        TypeError : When a chunk isn't a string
+        ResourceLimitError : When the translation exceeds one of its limits, without fallback
+        """
+
+        report = MemoryReport() if self.memory_report else None
+        timings:dict[str,float] = dict()
+        size = 0
+        # Only the beginning of the expression is kept for the fallback:
+        head, head_size = list(), self._fallback_size() + 1 if self.fallback else 0
+
+        def parse(chunks:Iterable[str], context:Optional[ParseContext]=None) -> logicalComponent.LogicalBlock:
+            nonlocal head_size, size
+            parser = IncrementalLogicalParser(self.log,self.logical_parser.functions,self.limits)
+            for chunk in chunks:
+                if head_size > 0:
+                    head.append(chunk[:head_size])
+                    head_size -= len(head[-1])
+                parser.feed(chunk)
+                size += utf8_size(chunk)
+            if report is not None:
+                report.input_size = size
+            return parser.close()
+
+        try:
+            f_expr = self._translate(parse,chunks,report,timings)
+        except Exception as error:
+            return self._failed("".join(head),error,size)
+        if self.metrics is not None:
+            self.metrics.record_translation(size,utf8_size(f_expr),timings)
+        return f_expr
+
+    def _fallback_size(self) -> int:
+        if self.limits is not None and self.limits.max_output is not None:
+            return self.limits.max_output
+        return FALLBACK_SIZE
+    def _failed(self, expr:str, error:Exception, size:int) -> str:
+        """ Record a failed translation, and fall back to raw text when it exceeds a limit (or raise the error). """
+        if self.metrics is not None:
+            self.metrics.record_error(error,size)
+        if not self.fallback or not isinstance(error,ResourceLimitError):
+            raise error
+        self.log.error(f"{error}, the expression is rendered as raw text")
+        return texttt_fallback(expr,self._fallback_size())
+
+    @staticmethod
+    def _open_group(expr:str, index:StructuralIndex, opening:int, end:int, parent:Optional[tuple]) -> tuple:
+        """ Return the open group of a parenthesis, on top of the open groups 'parent'.
+
+        An open group is a tuple (opening, depth, blocked, parent), 'blocked'
+        being whether the boundaries inside the group aren't usable: a group
+        followed by a '/' (possibly after other operators and empty groups), or
+        ending with a '/' given to the next term, may be the numerator of a
+        fraction.
+        """
+
+        closer = index.pairs[opening]
+        trailing = closer
+        while expr[trailing-1] in _OPERATOR_CHARS:
+            trailing -= 1
+        blocked = '/' in expr[trailing:closer] or '/' in _OPERATORS_RUN.match(expr,closer+1,end).group()
+        if parent is None:
+            return (opening, 1, blocked, None)
+        return (opening, parent[1] + 1, blocked or parent[2], parent)
+
+    def _preview_render(self, prefix:str, placeholder:str, count:int=1) -> Optional[str]:
+        """ Render a prefix ended by placeholders, up to the first one (None when it isn't found 'count' times). """
+
+        f_expr = self.latex_parser.parse(self.logical_parser.parse(prefix)).render(self.operators)
+        if f_expr.count(placeholder) != count:
+            return None
+        return f_expr[:f_expr.index(placeholder)]
+
+    def _preview_numerator(self, expr:str, index:StructuralIndex, start:int, end:int, numerator:tuple,
+                           placeholder:str, max_chars:int) -> Optional[tuple[str,bool]]:
+        """ Preview an expression from the content of a group, the numerator of a fraction.
+
+        The beginning of the translation, up to the content of the group, is
+        rendered by the parsers from a skeleton of the expression: the content of
+        the group is replaced by a placeholder, and the text following the group
+        is kept up to the next term boundary at its level, with placeholders for
+        the contents of its groups. The parsers resolve the operators following
+        the group, the preview of the content following the rendering before the
+        first placeholder.
+
+        Return None when the group can't be previewed this way (its content is
+        shorter than the preview, or a placeholder isn't rendered).
+        """
+
+        opening, parent = numerator[0], numerator[3]
+        closer = index.pairs[opening]
+        level_end = index.pairs[parent[0]] if parent else end
+
+        # Text following the group:
+        # -------------------------
+        parentheses, tail, position = index.parentheses, list(), closer + 1
+        boundary = _TERM_BOUNDARY.search(expr,position,level_end)
+        while True:
+            stop = boundary.start() if boundary else level_end
+            following = bisect.bisect_left(parentheses,position)
+            if following < len(parentheses) and parentheses[following] < stop:
+                group = parentheses[following]
+                tail.append(expr[position:group+1] + placeholder + ")")
+                position = index.pairs[group] + 1
+                if boundary and boundary.start() < position:
+                    boundary = _TERM_BOUNDARY.search(expr,position,level_end)
+                continue
+            tail.append(expr[position:boundary.end()] + placeholder if boundary else expr[position:level_end])
+            break
+
+        prefix = expr[start:opening+1] + placeholder + ")" + "".join(tail) + ")"*(parent[1] if parent else 0)
+        f_expr = self._preview_render(prefix,placeholder,prefix.count(placeholder))
+        if f_expr is None:
+            return None
+        if len(f_expr) >= max_chars:
+            return f_expr[:max_chars], True
+        content, truncated = self._preview(expr,index,opening+1,closer,placeholder,max_chars-len(f_expr))
+        if not truncated:
+            return None
+        return f_expr + content, True
+
+    def _preview(self, expr:str, index:StructuralIndex, start:int, end:int, placeholder:str,
+                 max_chars:int) -> tuple[str,bool]:
+        """ Preview the part of an expression from 'start' to 'end' (see 'preview'). """
+
+        # -*- COMMENT -*-
+        #   The boundaries and the parentheses are walked through once, the open
+        # groups being pushed and popped at each parenthesis. A group whose
+        # boundaries aren't usable is skipped up to its closing parenthesis, found
+        # in the index. The prefix is cut at the last usable boundary before a
+        # length doubled until its translation is long enough: the term following
+        # the boundary is replaced by a placeholder, the translation of the prefix
+        # being the rendering before it.
+        parentheses = index.parentheses
+        position = bisect.bisect_left(parentheses,start)
+        opened, cut, tried, length = None, None, None, 2*max_chars
+        search = start
+        while True:
+            boundary = _TERM_BOUNDARY.search(expr,search,end)
+            stop = boundary.start() if boundary else end
+
+            # Open groups at the boundary:
+            # ----------------------------
+            while position < len(parentheses) and parentheses[position] < stop:
+                parenthesis = parentheses[position]
+                position += 1
+                if expr[parenthesis] == '(':
+                    opened = self._open_group(expr,index,parenthesis,end,opened)
+                    if opened[2]:
+                        break
+                else:
+                    opened = opened[3]
+            numerator = None
+            if opened is not None and opened[2]:
+                numerator = opened
+                while numerator[3] is not None and numerator[3][2]:
+                    numerator = numerator[3]
+
+            # Translate the prefix:
+            # ---------------------
+            if cut is not None and (numerator is not None or boundary is None or stop - start >= length):
+                if cut is not tried:
+                    tried = cut
+                    prefix = expr[start:cut[0]] + placeholder + ")"*(cut[1][1] if cut[1] else 0)
+                    f_expr = self._preview_render(prefix,placeholder)
+                    if f_expr is not None and len(f_expr) >= max_chars:
+                        self.log.info(f"Preview translated from the first {cut[0] - start} caracters of the expression")
+                        return f_expr[:max_chars], True
+                while stop - start >= length:
+                    length *= 2
+
+            # Skip the numerator of a fraction:
+            # ---------------------------------
+            if numerator is not None:
+                if preview := self._preview_numerator(expr,index,start,end,numerator,placeholder,max_chars):
+                    return preview
+                closer = index.pairs[numerator[0]]
+                position = bisect.bisect_right(parentheses,closer)
+                opened, search = numerator[3], closer + 1
+                continue
+            if boundary is None:
+                break
+            cut, search = (boundary.end(), opened), boundary.end()
+
+        f_expr = self.latex_parser.parse(self.logical_parser.parse(expr[start:end])).render(self.operators)
+        return f_expr[:max_chars], len(f_expr) > max_chars
+
+    def preview(self, expr:str, max_chars:int) -> tuple[str,bool]:
+        """ Translate the beginning of an expression, up to 'max_chars' caracters.
+
+        Only a prefix of the expression is parsed: it is cut at a term boundary
+        and its open groups are closed, and is doubled until its translation is
+        long enough. When the prefix would end inside the numerator of a
+        fraction, the beginning of the fraction is rendered on its own and
+        followed by the preview of the numerator. The rendering is done with the
+        operator set of the instance, without renderer nor normalisation, for
+        the preview being the beginning of the translation.
+
+        Arguments:
+        expr : str
+            The expression to preview.
+        max_chars : int
+            The maximal length of the preview.
+
+        Return:
+        str
+            The first 'max_chars' caracters of the translation.
+        bool
+            Whether the translation was truncated.
+
+        Raise:
+        TypeError : When one of the argument isn't of the correct type
+        ValueError : When 'max_chars' isn't positive, or when the parentheses
+            of the expression are unbalanced
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(expr,str):
+            raise TypeError(f"The expression to preview must be a string, instead I've received a '{type(expr)}'")
+        if not isinstance(max_chars,int):
+            raise TypeError(f"The maximal length of the preview must be an int, instead I've received a '{type(max_chars)}'")
+        if max_chars < 1:
+            raise ValueError(f"The maximal length of the preview must be positive, instead I've received '{max_chars}'")
+
+        placeholder = "previewslot"
+        while placeholder in expr:
+            placeholder += "x"
+        return self._preview(expr,StructuralIndex(expr,operators=""),0,len(expr),placeholder,max_chars)
\ No newline at end of file